@@ -45,13 +45,16 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'news.middleware.QueryCountMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'news.identity.AnonymousIdentityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'news.profiling.SamplingProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -155,7 +158,12 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'news.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'news.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [],
 }
@@ -177,7 +185,144 @@ if not MEDIASTACK_API_KEY:
 else:
     logger.info("MEDIASTACK_API_KEY loaded successfully")
 
-MEDIASTACK_BASE_URL = 'http://api.mediastack.com/v1'
+# Point this at the Mediastack simulator (run_mediastack_simulator) for offline load tests
+MEDIASTACK_BASE_URL = os.getenv('MEDIASTACK_BASE_URL', 'http://api.mediastack.com/v1')
+
+# Memory-mapped article feature snapshot, rebuilt after each ingest cycle
+ARTICLE_SNAPSHOT_PATH = BASE_DIR / 'var' / 'article_snapshot.bin'
+ARTICLE_SNAPSHOT_WINDOW_HOURS = 72
+
+# Seconds clients may reuse the bias source catalog before revalidating
+BIAS_SOURCES_MAX_AGE = 3600
+
+# Anonymous visitors are identified by a signed cookie instead of a database session
+ANONYMOUS_ID_COOKIE_NAME = 'news_visitor'
+ANONYMOUS_ID_COOKIE_AGE = 60 * 60 * 24 * 365
+
+# Shared cache (L2 of news.tiered_cache): Redis when REDIS_URL is set, otherwise a
+# file-based cache that all workers on this host share. The file backend is a
+# development fallback: it is not shared across hosts and its add/incr are not
+# atomic, so production deployments need REDIS_URL. Tests use backend.test_settings.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / 'var' / 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Per-process LRU (L1) in front of the shared cache for feed responses
+TIERED_CACHE = {
+    'L1_MAX_ENTRIES': 256,
+    'L1_TIMEOUT': 30,  # seconds; bounds how stale a worker's copy can get
+}
+
+# Post-ingest warming of the most popular article queries (news.warming)
+CACHE_WARMING = {
+    'ON_INGEST': True,
+    'TOP_N': 10,  # combinations per run, including the unfiltered feed
+    'WINDOW_HOURS': 24,  # interactions considered when ranking combinations
+    'LIMIT': 25,  # page size, matching ArticlesView's default
+    'MAX_REQUESTS_PER_MINUTE': 30,  # upstream pacing
+}
+
+# Re-scoring of stored articles after bias rating changes (news.rescoring)
+RESCORING = {
+    'IN_BACKGROUND': True,  # run jobs on a thread after commit; otherwise only via rescore_articles
+    'CHUNK_SIZE': 1000,  # articles per UPDATE
+    'RETRY_DELAY': 1.0,  # seconds before the background runner's first retry; doubles per retry
+    'MAX_RETRY_DELAY': 300.0,
+    'MAX_ATTEMPTS': 5,  # failures (not lock contention) before the runner leaves a job to rescore_articles
+}
+
+# Longest range /api/analytics/bias/ answers in one request
+ANALYTICS_MAX_RANGE_DAYS = 366
+
+# Per-country summaries for the news map (news.country_summary), refreshed after each ingest
+MAP_SUMMARY = {
+    'WINDOWS': [24, 168],  # hours; /api/map/summary/?window= picks one, the first is the default
+    'TOP_N': 5,  # headline ids per country
+    'MAX_AGE': 60,  # seconds clients may reuse a response
+}
+
+# In-process trending engine (news.trending) behind /api/trending/
+TRENDING = {
+    # Score = sum of weight * per-hour interaction rate in each window
+    'WEIGHTS': {'5m': 0.5, '1h': 0.3, '24h': 0.2},
+    'INTERACTION_WEIGHTS': {'view': 1.0, 'click': 1.0, 'save': 2.0, 'like': 2.0, 'share': 3.0, 'dislike': 0.0},
+    'CHECKPOINT_INTERVAL': 60,  # seconds between writing counts to the database and merging other workers'
+    'MAX_ARTICLES': 10000,  # articles tracked per worker
+}
+
+# "Readers also viewed" neighbors (news.recommendations), rebuilt by build_related_articles
+RELATED_ARTICLES = {
+    'TOP_K': 10,  # neighbors stored per article
+    'WINDOW_DAYS': 30,  # interactions considered
+    'MIN_COOCCURRENCE': 2,  # visitors two articles must share
+    'PERSONALIZATION_BOOST': 1,  # personalized feed score added for articles related to ones the visitor read
+    'MAX_AGE': 300,  # seconds clients may reuse /api/articles/<id>/related/
+}
+
+# Composite home feed (news.home) behind /api/home/
+HOME = {
+    # Home requests a process serves at once; the section pool has a thread for each of their
+    # sections (CONCURRENT_REQUESTS * (MAX_RAILS + 1)), and sections beyond that run in the request thread
+    'CONCURRENT_REQUESTS': 4,
+    'TIMEOUTS': {'personalized': 3.0, 'rail': 2.0},  # seconds from the start of the request
+    'RAIL_CATEGORIES': ['general', 'business', 'technology', 'sports'],  # when the visitor picked none
+    'MAX_RAILS': 6,
+    'RAIL_LIMIT': 25,  # matches CACHE_WARMING['LIMIT'], so warmed category pages are cache hits
+}
+
+# Server-Sent Events stream of new articles (news.streaming) behind /api/stream/articles/
+STREAM = {
+    'POLL_INTERVAL': 2.0,  # seconds between checks for articles ingested by other processes; 0 disables
+    'POLL_BATCH_SIZE': 500,
+    'RESCAN_WINDOW': 500,  # ids below the watermark each scan re-checks for late commits from concurrent ingests
+    'HEARTBEAT': 15,  # seconds of silence before a keepalive comment
+    'RETRY_MS': 5000,  # reconnect delay sent to clients
+    'QUEUE_SIZE': 100,  # events a subscriber may fall behind before it is disconnected
+    'REPLAY_LIMIT': 200,  # newest missed articles sent to a resuming client
+    'MAX_SUBSCRIBERS': 5000,  # per process
+}
+
+# Resizing image proxy (news.images) behind /api/img/
+IMAGE_PROXY = {
+    'CACHE_DIR': BASE_DIR / 'var' / 'images',
+    'MAX_CACHE_BYTES': 512 * 1024 * 1024,  # least recently used variants are evicted above this
+    'SIZES': {'card': (640, 400), 'thumb': (160, 160)},  # bounding boxes; images are never upscaled
+    'QUALITY': {'webp': 80, 'jpeg': 82},
+    'MAX_SOURCE_BYTES': 15 * 1024 * 1024,
+    'MAX_PIXELS': 40_000_000,
+    'TIMEOUT': 10,  # seconds per upstream request
+    'FAILURE_TTL': 300,  # seconds a failed image is not re-fetched
+    'MAX_AGE': 60 * 60 * 24 * 365,
+    'ALLOW_PRIVATE_HOSTS': False,  # fetch from loopback/private addresses (tests, local fixtures)
+}
+
+# Seconds a visitor's preferences stay cached (updates invalidate them immediately)
+PREFERENCE_CACHE_TIMEOUT = 600
+
+# Seconds a personalized feed stays cached. Preference updates and interactions
+# invalidate a visitor's feeds immediately, so this can be long. Each visitor's
+# feed generation key expires after the same time.
+PERSONALIZED_CACHE_TIMEOUT = 3600
+
+# On-demand request profiling: requests sending a token from `manage.py profile_token`
+# in the X-Profile header are profiled, plus this fraction of all requests
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_INTERVAL = 0.005  # seconds between stack samples
+PROFILING_TOKEN_MAX_AGE = 3600
+PROFILING_STORAGE_DIR = BASE_DIR / 'var' / 'profiles'
+PROFILING_MAX_STORED = 100
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -0,0 +1,16 @@
+"""
+Settings for the test suite.
+
+The default file-based cache in var/cache is shared with the development
+server, and the tests clear the cache around every test, so they get a cache
+of their own in each test process instead.
+"""
+from .settings import *  # noqa: F401,F403
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
@@ -1,3 +1,24 @@
 from django.contrib import admin
+from .models import BiasSource, RescoreJob, SourceAlias, UnresolvedSource
 
-# Register your models here.
+class SourceAliasInline(admin.TabularInline):
+    model = SourceAlias
+    extra = 1
+
+@admin.register(BiasSource)
+class BiasSourceAdmin(admin.ModelAdmin):
+    list_display = ['source_name', 'bias_rating', 'reliability_score']
+    search_fields = ['source_name', 'aliases__alias']
+    inlines = [SourceAliasInline]
+
+@admin.register(UnresolvedSource)
+class UnresolvedSourceAdmin(admin.ModelAdmin):
+    """Source names seen upstream that no bias source or alias matches; add an alias to resolve one"""
+    list_display = ['source_name', 'occurrences', 'first_seen', 'last_seen']
+    search_fields = ['source_name']
+
+@admin.register(RescoreJob)
+class RescoreJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'updated_count', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['source_ids', 'status', 'linked', 'cursor', 'updated_count', 'error', 'created_at', 'finished_at']
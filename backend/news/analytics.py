@@ -0,0 +1,181 @@
+"""
+Bias and reliability rollups for the analytics endpoint.
+
+``BiasRollup`` rows hold, per (hour, category, country, source), the number
+of articles in each bias rating and the sum and count of their reliability
+scores. Each ingest cycle adds its new articles to the affected rows
+(``add_articles``), so range queries sum a few rollup rows instead of
+scanning ``Article``. ``rebuild_rollups`` recomputes rows from scratch for
+backfills and after articles are re-scored. Category and country are stored
+lowercased (ingest keeps country codes uppercase), which is how queries
+filter them.
+
+Incremental updates lock the rows they touch; two ingests creating the same
+new row at once would conflict on the unique constraint, so ingest cycles are
+expected to run one at a time (as ``ingest_articles`` from cron does).
+"""
+from datetime import datetime
+from django.db import transaction
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce, Lower, TruncDay, TruncHour
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from .models import Article, BiasRollup
+from .services import BIAS_SCORES
+
+logger = logging.getLogger(__name__)
+
+RATING_FIELDS = {rating: f"{rating}_count" for rating in BIAS_SCORES}
+SUM_FIELDS = (
+    'article_count', *RATING_FIELDS.values(), 'unrated_count', 'reliability_sum', 'reliability_count'
+)
+DIMENSIONS = ('category', 'country', 'source')
+GRANULARITIES = {'hour': TruncHour, 'day': TruncDay}
+
+
+def _aggregate(articles):
+    """Rollup rows for an Article queryset, computed in one GROUP BY query"""
+    rating_counts = {
+        field: Count('id', filter=Q(bias_score=BIAS_SCORES[rating])) for rating, field in RATING_FIELDS.items()
+    }
+    return (
+        articles.order_by()
+        .annotate(
+            bucket_start=TruncHour('published_at'),
+            rollup_category=Coalesce(Lower('category'), Value('')),
+            rollup_country=Coalesce(Lower('country'), Value('')),
+        )
+        .values('bucket_start', 'rollup_category', 'rollup_country', 'source')
+        .annotate(
+            article_count=Count('id'),
+            unrated_count=Count('id', filter=Q(bias_score__isnull=True)),
+            reliability_sum=Coalesce(Sum('reliability_score'), Value(0.0)),
+            reliability_count=Count('reliability_score'),
+            **rating_counts,
+        )
+    )
+
+
+def _rollup(row: Dict) -> BiasRollup:
+    return BiasRollup(
+        bucket_start=row['bucket_start'],
+        category=row['rollup_category'],
+        country=row['rollup_country'],
+        source=row['source'],
+        **{field: row[field] for field in SUM_FIELDS},
+    )
+
+
+def add_articles(articles: Iterable[Article]) -> int:
+    """Add newly stored articles to their rollup rows; returns the number of rows touched"""
+    ids = [article.pk for article in articles]
+    if not ids:
+        return 0
+    rows = list(_aggregate(Article.objects.filter(id__in=ids)))
+
+    with transaction.atomic():
+        existing = {
+            (rollup.bucket_start, rollup.category, rollup.country, rollup.source): rollup
+            for rollup in BiasRollup.objects.select_for_update().filter(
+                bucket_start__in={row['bucket_start'] for row in rows},
+                source__in={row['source'] for row in rows},
+            )
+        }
+        created, updated = [], []
+        for row in rows:
+            rollup = existing.get((row['bucket_start'], row['rollup_category'], row['rollup_country'], row['source']))
+            if rollup is None:
+                created.append(_rollup(row))
+                continue
+            for field in SUM_FIELDS:
+                setattr(rollup, field, getattr(rollup, field) + row[field])
+            updated.append(rollup)
+
+        if created:
+            BiasRollup.objects.bulk_create(created)
+        if updated:
+            BiasRollup.objects.bulk_update(updated, SUM_FIELDS)
+    return len(rows)
+
+
+def rebuild_rollups(sources: Optional[Iterable[str]] = None, batch_size: int = 1000) -> int:
+    """
+    Recompute rollup rows from the stored articles, for all sources or only ``sources``
+
+    Returns the number of rows written.
+    """
+    articles = Article.objects.all()
+    rollups = BiasRollup.objects.all()
+    if sources is not None:
+        sources = list(sources)
+        articles = articles.filter(source__in=sources)
+        rollups = rollups.filter(source__in=sources)
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in _aggregate(articles).iterator():
+            batch.append(_rollup(row))
+            if len(batch) >= batch_size:
+                BiasRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            BiasRollup.objects.bulk_create(batch)
+            written += len(batch)
+    logger.info(f"Rebuilt {written} bias rollup rows")
+    return written
+
+
+def _summarize(row: Dict, group_by: List[str]) -> Dict:
+    rated = sum(row[field] for field in RATING_FIELDS.values())
+    bias_total = sum(BIAS_SCORES[rating] * row[field] for rating, field in RATING_FIELDS.items())
+    summary = {'bucket': row['bucket'].isoformat()}
+    summary.update({dimension: row[dimension] or None for dimension in group_by})
+    summary.update({
+        'article_count': row['article_count'],
+        'bias': {
+            **{rating: row[field] for rating, field in RATING_FIELDS.items()},
+            'unrated': row['unrated_count'],
+        },
+        'average_bias': round(bias_total / rated, 4) if rated else None,
+        'average_reliability': (
+            round(row['reliability_sum'] / row['reliability_count'], 4) if row['reliability_count'] else None
+        ),
+    })
+    return summary
+
+
+def query_rollups(
+    start: datetime,
+    end: datetime,
+    granularity: str = 'day',
+    group_by: Iterable[str] = (),
+    categories: Optional[List[str]] = None,
+    countries: Optional[List[str]] = None,
+    sources: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Bias distribution and average reliability per time bucket in [start, end)
+
+    Buckets are hours or days (UTC) and are further split by any of
+    ``DIMENSIONS`` in ``group_by``. Empty buckets are omitted.
+    """
+    group_by = list(group_by)
+    rollups = BiasRollup.objects.filter(bucket_start__gte=start, bucket_start__lt=end)
+    if categories:
+        rollups = rollups.filter(category__in=[category.lower() for category in categories])
+    if countries:
+        rollups = rollups.filter(country__in=[country.lower() for country in countries])
+    if sources:
+        rollups = rollups.filter(source__in=sources)
+
+    rows = (
+        rollups.annotate(bucket=GRANULARITIES[granularity]('bucket_start'))
+        .values('bucket', *group_by)
+        .annotate(**{field: Sum(field) for field in SUM_FIELDS})
+        .order_by('bucket', *group_by)
+    )
+    return [_summarize(row, group_by) for row in rows]
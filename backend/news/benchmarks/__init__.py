@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the news backend.
+
+Run them with ``python manage.py benchmark``; see the command for options.
+"""
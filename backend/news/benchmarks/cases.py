@@ -0,0 +1,188 @@
+"""
+Benchmark cases for the hot backend paths.
+
+Every case runs against the stubbed upstream in ``upstream.py``; the command
+seeds the bias catalog before any case runs.
+"""
+from datetime import datetime, timedelta, timezone
+from django.test import Client
+from django.urls import reverse
+import json
+import pickle
+
+from ..models import Article, UserInteraction
+from ..renderers import FastJSONRenderer
+from ..services import MediastackService, UserPreferenceService
+from ..testing import anonymous_id
+from ..tiered_cache import tiered_cache
+from .harness import register
+from .upstream import recorded_payload
+
+# Interactions seeded for the personalized feed case
+HISTORY_SIZE = 2000
+# Articles per page in the record vs. dict cases
+RECORD_PAGE_SIZE = 1000
+
+
+def _create_articles(count: int):
+    published_at = datetime(2025, 3, 15, 22, 0, tzinfo=timezone.utc)
+    recorded = recorded_payload()['data']
+    articles = []
+    for i in range(count):
+        data = recorded[i % len(recorded)]
+        articles.append(Article(
+            title=data['title'],
+            url=f"{data['url']}?copy={i}",
+            published_at=published_at - timedelta(minutes=i),
+            source=data['source'],
+            category=data['category'],
+            country=data['country'].upper()
+        ))
+    return Article.objects.bulk_create(articles)
+
+
+def _session_id(client: Client) -> str:
+    """Make one request so the client gets an anonymous id, and return it"""
+    client.get(reverse('preferences'))
+    return anonymous_id(client)
+
+
+@register('format_article_data')
+def format_article_data():
+    service = MediastackService()
+    articles = recorded_payload()['data']
+
+    def operation():
+        for article_data in articles:
+            service.format_article_data(article_data)
+    return operation
+
+
+@register('render_articles_payload')
+def render_articles_payload():
+    service = MediastackService()
+    payload = {
+        'articles': [service.format_article_data(a) for a in recorded_payload()['data']],
+        'pagination': {'offset': 0, 'limit': 100, 'total': 100},
+    }
+    renderer = FastJSONRenderer()
+
+    def operation():
+        renderer.render(payload)
+    return operation
+
+
+@register('articles_view_miss')
+def articles_view_miss():
+    client = Client()
+    url = reverse('articles')
+
+    def operation():
+        tiered_cache.clear()
+        response = client.get(url, {'limit': 100})
+        assert response.status_code == 200, response.status_code
+    return operation
+
+
+@register('articles_view_hit')
+def articles_view_hit():
+    client = Client()
+    url = reverse('articles')
+
+    def operation():
+        response = client.get(url, {'limit': 100})
+        assert response.status_code == 200, response.status_code
+    return operation
+
+
+@register('personalized_view_large_history')
+def personalized_view_large_history():
+    client = Client()
+    session_id = _session_id(client)
+    articles = _create_articles(200)
+    interaction_types = [choice[0] for choice in UserInteraction.INTERACTION_TYPES]
+    UserInteraction.objects.bulk_create([
+        UserInteraction(
+            session_id=session_id,
+            article=articles[i % len(articles)],
+            interaction_type=interaction_types[i % len(interaction_types)]
+        )
+        for i in range(HISTORY_SIZE)
+    ])
+    url = reverse('personalized')
+
+    def operation():
+        tiered_cache.clear()
+        response = client.get(url, {'limit': 100})
+        assert response.status_code == 200, response.status_code
+    return operation
+
+
+@register('record_interaction')
+def record_interaction():
+    service = UserPreferenceService()
+    article = _create_articles(1)[0]
+
+    def operation():
+        service.record_interaction(article_id=article.id, interaction_type='view', session_id='benchmark')
+    return operation
+
+
+@register('bias_source_view')
+def bias_source_view():
+    client = Client()
+    url = reverse('bias-sources')
+
+    def operation():
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+    return operation
+
+
+def _formatted_pages(count: int):
+    """
+    ``count`` formatted articles as ArticleRecords and as the plain dicts they
+    replaced, each article decoded from its own JSON like an upstream response
+    """
+    service = MediastackService()
+    recorded = recorded_payload()['data']
+    records, dicts = [], []
+    for i in range(count):
+        raw = json.dumps(recorded[i % len(recorded)])
+        records.append(service.format_article_data(json.loads(raw)))
+        # Without interning every dict holds its own copy of the repeated strings
+        fresh = json.loads(raw)
+        dicts.append(dict(
+            service.format_article_data(fresh).as_dict(),
+            source=fresh['source'],
+            category=fresh['category'],
+            country=fresh['country'].upper() if fresh['country'] else None,
+        ))
+    return records, dicts
+
+
+def _pickle_case(index: int):
+    def setup():
+        page = _formatted_pages(RECORD_PAGE_SIZE)[index]
+
+        def operation():
+            pickle.dumps(page, pickle.HIGHEST_PROTOCOL)
+        return operation
+    return setup
+
+
+def _unpickle_case(index: int):
+    # peak_bytes of loading a pickled page is the memory the page takes per worker
+    def setup():
+        pickled = pickle.dumps(_formatted_pages(RECORD_PAGE_SIZE)[index], pickle.HIGHEST_PROTOCOL)
+
+        def operation():
+            pickle.loads(pickled)
+        return operation
+    return setup
+
+
+register('pickle_article_records_1k')(_pickle_case(0))
+register('pickle_article_dicts_1k')(_pickle_case(1))
+register('unpickle_article_records_1k')(_unpickle_case(0))
+register('unpickle_article_dicts_1k')(_unpickle_case(1))
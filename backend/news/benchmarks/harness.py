@@ -0,0 +1,153 @@
+"""
+Minimal benchmark harness: case registry, measurement and baseline comparison.
+"""
+from typing import Callable, Dict, List
+import gc
+import statistics
+import time
+import tracemalloc
+
+# name -> setup function. A setup function prepares whatever state the case
+# needs and returns the zero-argument operation to time.
+CASES: Dict[str, Callable[[], Callable[[], None]]] = {}
+
+
+def register(name: str):
+    """Register a benchmark case under ``name``"""
+    def decorator(setup):
+        CASES[name] = setup
+        return setup
+    return decorator
+
+
+def _allocations(operation: Callable[[], None]):
+    """Peak extra bytes one call needs and the memory blocks it leaves allocated"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        operation()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_memory
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    return peak_bytes, sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+
+
+def _quartiles(values: List[float]):
+    q1, median, q3 = statistics.quantiles(values, n=4, method='inclusive')
+    return q1, median, q3
+
+
+def _round(operation: Callable[[], None], duration: float, min_iterations: int) -> List[float]:
+    # One untimed call first, in case another case's round disturbed shared state (e.g. cleared the cache)
+    operation()
+    timings = []
+    deadline = time.perf_counter() + duration
+    while len(timings) < min_iterations or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def measure_all(
+    operations: Dict[str, Callable[[], None]],
+    duration: float = 1.0,
+    min_iterations: int = 5,
+    repeats: int = 5
+) -> Dict[str, Dict]:
+    """
+    Time each operation in ``repeats`` rounds of roughly ``duration / repeats``
+    seconds and sample its allocations once per round
+
+    Rounds are interleaved across operations, so a slow stretch of the
+    machine widens every case's spread instead of shifting whichever case
+    happened to run then.
+
+    Returns:
+        Per operation, a dict with the median round's ops/sec and the rounds'
+        quartiles (``ops_per_sec_q1``/``_q3``), mean and median latency over
+        all calls, and tracemalloc statistics for a single call: the median
+        peak extra memory it needed (with quartiles) and the number of memory
+        blocks still allocated after the last sampled call returned
+    """
+    repeats = max(repeats, 2)
+    samples = {name: {'timings': [], 'rates': [], 'peaks': []} for name in operations}
+    for _ in range(repeats):
+        for name, operation in operations.items():
+            timings = _round(operation, duration / repeats, min_iterations)
+            peak_bytes, retained_blocks = _allocations(operation)
+            sample = samples[name]
+            sample['timings'].extend(timings)
+            sample['rates'].append(len(timings) / sum(timings))
+            sample['peaks'].append(peak_bytes)
+            sample['retained_blocks'] = retained_blocks
+
+    results = {}
+    for name, sample in samples.items():
+        timings = sample['timings']
+        total = sum(timings)
+        ops_q1, ops_median, ops_q3 = _quartiles(sample['rates'])
+        peak_q1, peak_median, peak_q3 = _quartiles(sample['peaks'])
+        results[name] = {
+            'iterations': len(timings),
+            'ops_per_sec': ops_median,
+            'ops_per_sec_q1': ops_q1,
+            'ops_per_sec_q3': ops_q3,
+            'mean_ms': total / len(timings) * 1000,
+            'median_ms': statistics.median(timings) * 1000,
+            'peak_bytes': peak_median,
+            'peak_bytes_q1': peak_q1,
+            'peak_bytes_q3': peak_q3,
+            'retained_blocks': sample['retained_blocks'],
+        }
+    return results
+
+
+def measure(operation: Callable[[], None], duration: float = 1.0, min_iterations: int = 5, repeats: int = 5) -> Dict:
+    """``measure_all`` for a single operation"""
+    return measure_all({'operation': operation}, duration, min_iterations, repeats)['operation']
+
+
+def compare_results(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compare a run against a baseline
+
+    Differences inside the run-to-run noise are not regressions: a case
+    regresses when even its upper throughput quartile is more than
+    ``threshold`` (a fraction, e.g. 0.1 for 10%) below the baseline's lower
+    quartile, or its lower peak memory quartile is more than ``threshold``
+    above the baseline's upper one. Results without quartiles (older
+    baselines) count as a single round. Cases missing from either side are
+    ignored.
+
+    Returns:
+        Human-readable descriptions of each regression
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+
+        current_fast = current.get('ops_per_sec_q3', current['ops_per_sec'])
+        previous_slow = previous.get('ops_per_sec_q1', previous['ops_per_sec'])
+        if current_fast < previous_slow * (1 - threshold):
+            change = 1 - current['ops_per_sec'] / previous['ops_per_sec']
+            regressions.append(
+                f"{name}: {current['ops_per_sec']:.1f} ops/sec is {change:.0%} slower "
+                f"than baseline {previous['ops_per_sec']:.1f} (quartiles do not overlap)"
+            )
+
+        current_low = current.get('peak_bytes_q1', current['peak_bytes'])
+        previous_high = previous.get('peak_bytes_q3', previous['peak_bytes'])
+        # Ignore tiny absolute changes; they are dominated by noise
+        if current_low > previous_high * (1 + threshold) and current_low - previous_high > 4096:
+            regressions.append(
+                f"{name}: peak memory {current['peak_bytes']:.0f} bytes is more than {threshold:.0%} "
+                f"above baseline {previous['peak_bytes']:.0f}"
+            )
+    return regressions
@@ -0,0 +1,64 @@
+"""
+Stand-in for the Mediastack API that replays a recorded ``/v1/news`` payload.
+"""
+from pathlib import Path
+from unittest.mock import patch
+import copy
+import json
+
+FIXTURE_PATH = Path(__file__).resolve().parent / 'fixtures' / 'mediastack_news.json'
+
+
+def recorded_payload() -> dict:
+    """The recorded ``/v1/news`` response (100 articles)"""
+    with open(FIXTURE_PATH) as f:
+        return json.load(f)
+
+
+class StubResponse:
+    def __init__(self, payload):
+        self._payload = payload
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        # Callers may mutate the result, so hand out a fresh copy like a real response would
+        return copy.deepcopy(self._payload)
+
+
+class StubUpstream:
+    """
+    Context manager that answers ``requests.get`` calls made by MediastackService
+
+    Honors ``limit`` and ``offset`` against the recorded articles and counts calls.
+    """
+
+    def __init__(self, payload=None):
+        self.payload = payload or recorded_payload()
+        self.calls = 0
+        self._patcher = patch('news.services.requests.get', side_effect=self.get)
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        params = params or {}
+        limit = int(params.get('limit', 25))
+        offset = int(params.get('offset', 0))
+        articles = self.payload['data'][offset:offset + limit]
+        return StubResponse({
+            'pagination': {
+                'limit': limit,
+                'offset': offset,
+                'count': len(articles),
+                'total': self.payload['pagination']['total'],
+            },
+            'data': articles,
+        })
+
+    def __enter__(self):
+        self._patcher.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._patcher.stop()
@@ -0,0 +1,257 @@
+"""
+Bulk loading of media-bias catalogs into ``BiasSource``.
+
+Catalog files are CSV (header row), JSON Lines, or a JSON array of objects,
+with the fields ``source_name`` (required), ``bias_rating``,
+``reliability_score``, ``description`` and ``aliases`` (a list, or a
+``;``-separated string in CSV). Files are parsed as a stream and loaded in
+chunks: each chunk costs one SELECT to diff against the stored rows and one
+``INSERT ... ON CONFLICT DO UPDATE`` for the new and changed sources, plus
+one SELECT for their ids. Stored articles of new and changed sources are
+re-scored by a ``RescoreJob`` (``news.rescoring``) after commit.
+"""
+from dataclasses import dataclass, field
+from django.db import transaction
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+import csv
+import json
+import os
+
+from .models import BiasSource, SourceAlias
+from .rescoring import enqueue_rescore
+from .sources import invalidate_resolver, normalize_source_name
+
+COMPARED_FIELDS = ('normalized_key', 'bias_rating', 'reliability_score', 'description')
+SCORE_FIELDS = ('bias_rating', 'reliability_score')
+
+# Accept rating keys ("center_left") as well as labels ("Center Left", "center-left")
+RATINGS = {}
+for _key, _label in BiasSource.BIAS_CHOICES:
+    RATINGS[_key] = _key
+    RATINGS[_label.lower()] = _key
+    RATINGS[_label.lower().replace(' ', '-')] = _key
+
+
+class CatalogError(ValueError):
+    """A catalog record failed validation"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"record {line}: {message}")
+        self.line = line
+
+
+@dataclass
+class LoadReport:
+    created: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    # Ids of the new sources and those whose rating or reliability changed
+    rescore_ids: List[int] = field(default_factory=list)
+    unchanged: int = 0
+    aliases: int = 0
+    errors: List[CatalogError] = field(default_factory=list)
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    formats = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'json'}
+    if extension not in formats:
+        raise ValueError(f"Cannot tell the catalog format of {path}; use --format")
+    return formats[extension]
+
+
+def iter_json_array(f: IO[str], buffer_size: int = 65536) -> Iterator[Dict]:
+    """Yield the elements of a top-level JSON array without reading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+    while True:
+        # Skip whitespace and separators between elements
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = buffer[position:] + f.read(buffer_size), 0
+            eof = position == len(buffer)
+        if position >= len(buffer):
+            raise ValueError('Unexpected end of JSON catalog')
+
+        if not started:
+            if buffer[position] != '[':
+                raise ValueError('JSON catalog must be an array of objects')
+            started = True
+            position += 1
+            continue
+        if buffer[position] == ']':
+            return
+
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The element continues past the buffer
+            chunk = f.read(buffer_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield element
+        position = end
+
+
+def iter_records(f: IO[str], fmt: str) -> Iterator[Dict]:
+    if fmt == 'csv':
+        yield from csv.DictReader(f)
+    elif fmt == 'jsonl':
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == 'json':
+        yield from iter_json_array(f)
+    else:
+        raise ValueError(f"Unknown catalog format: {fmt}")
+
+
+def clean_record(record, line: int) -> Tuple[Dict, List[str]]:
+    """Validate one catalog record; returns (BiasSource field values, aliases)"""
+    if not isinstance(record, dict):
+        raise CatalogError(line, 'expected an object')
+
+    source_name = (record.get('source_name') or '').strip()
+    if not source_name:
+        raise CatalogError(line, 'source_name is required')
+    if len(source_name) > 200:
+        raise CatalogError(line, 'source_name is longer than 200 characters')
+
+    bias_rating = record.get('bias_rating')
+    if bias_rating in (None, ''):
+        bias_rating = None
+    else:
+        bias_rating = RATINGS.get(str(bias_rating).strip().lower())
+        if bias_rating is None:
+            raise CatalogError(
+                line, f"invalid bias_rating {record.get('bias_rating')!r} for {source_name}; "
+                      f"expected one of {', '.join(key for key, _ in BiasSource.BIAS_CHOICES)}"
+            )
+
+    reliability_score = record.get('reliability_score')
+    if reliability_score in (None, ''):
+        reliability_score = None
+    else:
+        try:
+            reliability_score = float(reliability_score)
+        except (TypeError, ValueError):
+            raise CatalogError(line, f"invalid reliability_score {reliability_score!r} for {source_name}")
+        if not 0.0 <= reliability_score <= 1.0:
+            raise CatalogError(line, f"reliability_score for {source_name} must be between 0 and 1")
+
+    aliases = record.get('aliases') or []
+    if isinstance(aliases, str):
+        aliases = aliases.split(';')
+    aliases = [alias.strip() for alias in aliases if isinstance(alias, str) and alias.strip()]
+
+    return {
+        'source_name': source_name,
+        'normalized_key': normalize_source_name(source_name),
+        'bias_rating': bias_rating,
+        'reliability_score': reliability_score,
+        'description': record.get('description') or None,
+    }, aliases
+
+
+def _load_chunk(chunk: Dict[str, Tuple[Dict, List[str]]], report: LoadReport) -> None:
+    existing = {source.source_name: source for source in BiasSource.objects.filter(source_name__in=list(chunk))}
+
+    changed = []
+    rescore_names = set()
+    for source_name, (values, _) in chunk.items():
+        current = existing.get(source_name)
+        if current is None:
+            report.created.append(source_name)
+            rescore_names.add(source_name)
+        elif any(getattr(current, name) != values[name] for name in COMPARED_FIELDS):
+            report.updated.append(source_name)
+            if any(getattr(current, name) != values[name] for name in SCORE_FIELDS):
+                rescore_names.add(source_name)
+        else:
+            report.unchanged += 1
+            continue
+        changed.append(BiasSource(**values))
+
+    if changed:
+        BiasSource.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['source_name'],
+            update_fields=list(COMPARED_FIELDS),
+        )
+
+    alias_names = {alias: source_name for source_name, (_, aliases) in chunk.items() for alias in aliases}
+    if rescore_names or alias_names:
+        # bulk_create doesn't set primary keys on upserted rows
+        ids = dict(
+            BiasSource.objects.filter(source_name__in=rescore_names | set(alias_names.values()))
+            .values_list('source_name', 'id')
+        )
+        report.rescore_ids.extend(ids[name] for name in rescore_names)
+
+    if alias_names:
+        by_key = {}
+        for alias, source_name in alias_names.items():
+            key = normalize_source_name(alias)
+            if key and key != normalize_source_name(source_name):
+                by_key[key] = SourceAlias(alias=alias, alias_key=key, bias_source_id=ids[source_name])
+        if by_key:
+            SourceAlias.objects.bulk_create(
+                list(by_key.values()),
+                update_conflicts=True,
+                unique_fields=['alias_key'],
+                update_fields=['alias', 'bias_source'],
+            )
+            report.aliases += len(by_key)
+
+
+def load_catalog(
+    f: IO[str],
+    fmt: str,
+    chunk_size: int = 1000,
+    skip_invalid: bool = False,
+    dry_run: bool = False
+) -> LoadReport:
+    """
+    Upsert a catalog into BiasSource in a single transaction
+
+    Invalid records abort the load (nothing is written) unless
+    ``skip_invalid`` is set, in which case they are reported and skipped.
+    With ``dry_run`` the diff is computed and the transaction rolled back.
+    """
+    report = LoadReport()
+    with transaction.atomic():
+        chunk = {}
+        for line, record in enumerate(iter_records(f, fmt), 1):
+            try:
+                values, aliases = clean_record(record, line)
+            except CatalogError as e:
+                if not skip_invalid:
+                    raise
+                report.errors.append(e)
+                continue
+            # A later record for the same source wins
+            chunk.pop(values['source_name'], None)
+            chunk[values['source_name']] = (values, aliases)
+            if len(chunk) >= chunk_size:
+                _load_chunk(chunk, report)
+                chunk = {}
+        if chunk:
+            _load_chunk(chunk, report)
+
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            # bulk_create sends no post_save signals
+            transaction.on_commit(invalidate_resolver)
+            if report.rescore_ids:
+                enqueue_rescore(report.rescore_ids)
+    return report
@@ -0,0 +1,107 @@
+"""
+Precomputed per-country summaries for the news map.
+
+For each window in ``MAP_SUMMARY['WINDOWS']`` (hours), ``CountrySummary``
+holds every country's article count, average bias and the ids of its
+``TOP_N`` most engaged-with articles (interactions within the window, then
+recency). The table is rebuilt after each ingest cycle and after re-scoring,
+so ``/api/map/summary/`` reads a few small rows instead of one article query
+per country.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, OuterRef, Subquery, Value, Window
+from django.db.models.functions import Coalesce, Lower, RowNumber
+from django.utils import timezone
+from typing import Dict, List
+import logging
+
+from .models import Article, CountrySummary, UserInteraction
+
+logger = logging.getLogger(__name__)
+
+
+def _top_article_ids(articles, since, top_n: int) -> Dict[str, List[int]]:
+    """Ids of each country's ``top_n`` articles, ranked in one query with ROW_NUMBER()"""
+    engagement = (
+        UserInteraction.objects.filter(article=OuterRef('pk'), timestamp__gte=since)
+        .order_by()
+        .values('article')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    ranked = (
+        articles.annotate(engagement=Coalesce(Subquery(engagement), Value(0)))
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=[F('country_code')],
+            order_by=[F('engagement').desc(), F('published_at').desc(), F('id').desc()],
+        ))
+        .filter(rank__lte=top_n)
+        .order_by('country_code', 'rank')
+        .values_list('country_code', 'id')
+    )
+    top_ids = {}
+    for country, article_id in ranked:
+        top_ids.setdefault(country, []).append(article_id)
+    return top_ids
+
+
+def compute_summaries(window_hours: int, top_n: int, now=None) -> List[CountrySummary]:
+    """Unsaved summaries for every country with articles published in the last ``window_hours``"""
+    now = now or timezone.now()
+    since = now - timedelta(hours=window_hours)
+    articles = (
+        Article.objects.filter(published_at__gte=since)
+        .exclude(country__isnull=True)
+        .exclude(country='')
+        .annotate(country_code=Lower('country'))
+        .order_by()
+    )
+    top_ids = _top_article_ids(articles, since, top_n)
+    stats = articles.values('country_code').annotate(article_count=Count('id'), average_bias=Avg('bias_score'))
+    return [
+        CountrySummary(
+            window_hours=window_hours,
+            country=row['country_code'],
+            article_count=row['article_count'],
+            average_bias=round(row['average_bias'], 4) if row['average_bias'] is not None else None,
+            top_article_ids=top_ids.get(row['country_code'], []),
+            refreshed_at=now,
+        )
+        for row in stats
+    ]
+
+
+def refresh_summaries(now=None) -> int:
+    """Replace the summaries of every configured window; returns the number of rows written"""
+    config = settings.MAP_SUMMARY
+    now = now or timezone.now()
+    summaries = []
+    for window_hours in config['WINDOWS']:
+        summaries.extend(compute_summaries(window_hours, config['TOP_N'], now=now))
+
+    # Readers see either the previous or the new summaries, never a mix
+    with transaction.atomic():
+        CountrySummary.objects.all().delete()
+        CountrySummary.objects.bulk_create(summaries)
+    logger.info(f"Refreshed {len(summaries)} country summaries")
+    return len(summaries)
+
+
+def get_summary(window_hours: int) -> Dict:
+    """The map payload for a window; ``refreshed_at`` is None while it has no countries"""
+    summaries = list(CountrySummary.objects.filter(window_hours=window_hours))
+    return {
+        'window_hours': window_hours,
+        'refreshed_at': summaries[0].refreshed_at.isoformat() if summaries else None,
+        'countries': {
+            summary.country: {
+                'article_count': summary.article_count,
+                'average_bias': summary.average_bias,
+                'top_article_ids': summary.top_article_ids,
+            }
+            for summary in summaries
+        },
+    }
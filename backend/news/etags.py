@@ -0,0 +1,49 @@
+"""
+Helpers for conditional GET support.
+
+ETags are strong validators derived from a hash of the JSON body the client
+would receive, so equal ETags always mean byte-identical responses.
+"""
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+import hashlib
+
+from .renderers import FastJSONRenderer
+
+
+def compute_etag(data) -> str:
+    """Strong ETag for the JSON representation of ``data``"""
+    body = FastJSONRenderer().render(data)
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches ``etag``"""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+    candidates = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(if_none_match)]
+    return '*' in candidates or etag in candidates
+
+
+def conditional_response(request, data, etag: str = None, cache_control: str = None) -> Response:
+    """
+    Build a response for ``data``, answering 304 when the client already has it
+
+    Pass ``etag`` when it was computed earlier (e.g. stored next to a cached
+    payload) to skip hashing the body again.
+    """
+    if etag is None:
+        etag = compute_etag(data)
+
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, content_type='application/json')
+
+    response['ETag'] = etag
+    if cache_control:
+        response['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,129 @@
+"""
+Concurrent sections for the composite home feed.
+
+``/api/home/`` (``HomeView``) returns the visitor's preferences, personalized
+feed, category rails and the bias entries they need in one response. The feed
+and each rail are independent upstream fetches, so ``run_sections`` runs them
+on a shared thread pool and the response takes as long as the slowest section
+instead of their sum. The pool has a thread for every section of
+``HOME['CONCURRENT_REQUESTS']`` simultaneous requests (``MAX_RAILS`` rails and
+the feed each). Sections that would have to queue behind a full pool run in
+the request thread instead, so a burst of requests makes responses slower
+rather than returning sections that timed out waiting for a thread.
+
+Every section has a deadline measured from the start of the request. A
+section that fails or misses its deadline comes back as None and is named in
+the returned errors, and the caller serves the rest. Python threads cannot be
+cancelled, so a late section keeps running in the background; whatever it
+fetches still lands in the feed caches for the next request.
+"""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from django.conf import settings
+from django.db import close_old_connections
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+Section = Tuple[Callable[[], Any], float]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_size = 0
+# Sections submitted to the pool and not yet finished or cancelled
+_pending = 0
+_executor_lock = threading.Lock()
+
+
+def pool_size() -> int:
+    config = settings.HOME
+    return config['CONCURRENT_REQUESTS'] * (config['MAX_RAILS'] + 1)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """This process's section pool, created on first use"""
+    global _executor, _executor_size
+    with _executor_lock:
+        if _executor is None:
+            _executor_size = pool_size()
+            _executor = ThreadPoolExecutor(max_workers=_executor_size, thread_name_prefix='home-section')
+        return _executor
+
+
+def _section_done(future) -> None:
+    global _pending
+    with _executor_lock:
+        _pending -= 1
+
+
+def _submit(executor: ThreadPoolExecutor, funcs: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """Futures for as many of ``funcs`` as the pool has idle threads for, in order"""
+    global _pending
+    futures = {}
+    with _executor_lock:
+        for name, func in funcs.items():
+            if _pending >= _executor_size:
+                break
+            _pending += 1
+            futures[name] = executor.submit(_run_section, func)
+    for future in futures.values():
+        future.add_done_callback(_section_done)
+    return futures
+
+
+def _run_section(func: Callable[[], Any]) -> Any:
+    try:
+        return func()
+    finally:
+        # Pool threads never see request_finished; release their connections like a request would
+        close_old_connections()
+
+
+def run_sections(sections: Dict[str, Section]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Run ``{name: (func, timeout in seconds)}`` concurrently
+
+    Sections the pool has no idle thread for run one by one in the calling
+    thread while the others run on the pool; those are only skipped if their
+    deadline has passed before they start.
+
+    Returns:
+        (results, errors): results maps every name to its value, or None when
+        the section failed ('error') or missed its deadline ('timeout') as
+        recorded in errors
+    """
+    started = time.monotonic()
+    futures = _submit(get_executor(), {name: func for name, (func, _) in sections.items()})
+
+    results, errors = {}, {}
+    for name, (func, timeout) in sections.items():
+        if name in futures:
+            continue
+        if time.monotonic() - started >= timeout:
+            logger.warning(f"Home section {name} timed out after {timeout}s waiting for a thread")
+            results[name] = None
+            errors[name] = 'timeout'
+            continue
+        try:
+            results[name] = func()
+        except Exception as e:
+            logger.error(f"Home section {name} failed: {str(e)}")
+            results[name] = None
+            errors[name] = 'error'
+
+    for name, future in futures.items():
+        timeout = sections[name][1]
+        try:
+            results[name] = future.result(timeout=max(started + timeout - time.monotonic(), 0))
+        except FutureTimeout:
+            # Drops the section if it hasn't started yet; a running one finishes in the background
+            future.cancel()
+            logger.warning(f"Home section {name} timed out after {timeout}s")
+            results[name] = None
+            errors[name] = 'timeout'
+        except Exception as e:
+            logger.error(f"Home section {name} failed: {str(e)}")
+            results[name] = None
+            errors[name] = 'error'
+    return {name: results[name] for name in sections}, errors
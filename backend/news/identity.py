@@ -0,0 +1,74 @@
+"""
+Anonymous visitor identity.
+
+Visitors get a random id in a signed cookie, so identifying them doesn't
+touch the session table. Visitors who still have a Django session cookie
+from before the switch get their old id moved to the signed cookie the first
+time they come back. That one read keeps existing ``UserPreference.session_id``
+and ``UserInteraction.session_id`` rows working.
+"""
+from django.conf import settings
+from django.core import signing
+from typing import Optional
+import uuid
+
+COOKIE_SALT = 'news.identity'
+MAX_ID_LENGTH = 100  # UserPreference.session_id / UserInteraction.session_id max_length
+
+
+def _http_request(request):
+    # DRF requests wrap the Django HttpRequest that the middleware sees
+    return getattr(request, '_request', request)
+
+
+def read_anonymous_id(cookie_value: Optional[str]) -> Optional[str]:
+    """Anonymous id from a signed cookie value, or None if missing or tampered with"""
+    if not cookie_value:
+        return None
+    try:
+        anonymous_id = signing.get_cookie_signer(salt=COOKIE_SALT).unsign(
+            cookie_value, max_age=settings.ANONYMOUS_ID_COOKIE_AGE
+        )
+    except signing.BadSignature:
+        return None
+    return anonymous_id if 0 < len(anonymous_id) <= MAX_ID_LENGTH else None
+
+
+def get_anonymous_id(request) -> str:
+    """Get or create the anonymous id of the visitor making ``request``"""
+    request = _http_request(request)
+    anonymous_id = getattr(request, 'anonymous_id', None)
+    if anonymous_id:
+        return anonymous_id
+
+    anonymous_id = read_anonymous_id(request.COOKIES.get(settings.ANONYMOUS_ID_COOKIE_NAME))
+    if anonymous_id is None:
+        # Legacy visitors only: loading the session is a database read
+        if settings.SESSION_COOKIE_NAME in request.COOKIES and hasattr(request, 'session'):
+            anonymous_id = request.session.get('session_id')
+        if not anonymous_id:
+            anonymous_id = str(uuid.uuid4())
+        request.set_anonymous_id_cookie = True
+
+    request.anonymous_id = anonymous_id
+    return anonymous_id
+
+
+class AnonymousIdentityMiddleware:
+    """Set the signed anonymous id cookie on responses that created or migrated an id"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if getattr(request, 'set_anonymous_id_cookie', False):
+            response.set_cookie(
+                settings.ANONYMOUS_ID_COOKIE_NAME,
+                signing.get_cookie_signer(salt=COOKIE_SALT).sign(request.anonymous_id),
+                max_age=settings.ANONYMOUS_ID_COOKIE_AGE,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        return response
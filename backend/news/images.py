@@ -0,0 +1,337 @@
+"""
+Resizing image proxy behind ``/api/img/``.
+
+Article images are publishers' originals, often several megabytes. The
+proxy fetches an image once, renders every size in ``IMAGE_PROXY['SIZES']``
+as WebP and JPEG, and keeps the results in ``ImageCache``, so cards download
+a few tens of kilobytes from us instead.
+
+``ImageCache`` is content addressed: variant bytes are stored under their
+SHA-256 (identical images from different URLs share one file), and a small
+ref file per (url, size, format) names the digest. Reads touch both files'
+mtimes. Each process keeps a running total of the bytes it has written; once
+that passes ``IMAGE_PROXY['MAX_CACHE_BYTES']`` the directory is walked and the
+least recently used files are evicted down to ``LOW_WATER_MARK`` of the bound.
+A ref whose blob was evicted is a miss. The digest doubles as the response's
+ETag, and responses are marked immutable because a URL's variants never change.
+
+The proxy is not open: a URL is only fetched if it carries the backend's
+signature (``sign_url``) or is the image of a stored article. Feed articles
+carry their signed proxy path (``proxy_url``) as ``image_proxy``. Fetches only
+follow http(s) URLs on public addresses (unless ``ALLOW_PRIVATE_HOSTS``), and
+connect to the address that was checked rather than resolving the host again,
+so DNS can't swap in a private address between the check and the request.
+Every redirect is re-checked, and bodies over ``MAX_SOURCE_BYTES`` or images
+over ``MAX_PIXELS`` are refused. Failures are remembered for ``FAILURE_TTL``
+seconds so a broken image is not re-fetched for every card.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from io import BytesIO
+from PIL import Image, ImageOps, UnidentifiedImageError
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+import certifi
+import hashlib
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import urllib3
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'webp': ('WEBP', 'image/webp'), 'jpeg': ('JPEG', 'image/jpeg')}
+MAX_REDIRECTS = 3
+# Fraction of the size bound an eviction pass brings the cache down to
+LOW_WATER_MARK = 0.9
+SIGNATURE_SALT = 'news.images.sign_url'
+
+
+class ImageProxyError(Exception):
+    """An image that can't be proxied: upstream or decoding failure"""
+
+
+class ImageURLError(ImageProxyError):
+    """A URL the proxy won't fetch: not http(s), malformed or on a non-public host"""
+
+
+class ImageNotAllowedError(ImageURLError):
+    """A URL that is neither signed by the backend nor an article's image"""
+
+
+def sign_url(url: str) -> str:
+    """Signature that lets ``url`` through the proxy, passed as its ``sig`` parameter"""
+    return salted_hmac(SIGNATURE_SALT, url).hexdigest()
+
+
+def proxy_url(url: str) -> str:
+    """Signed ``/api/img/`` path for ``url``; clients add ``size`` and ``format`` as needed"""
+    return f"{reverse('image-proxy')}?{urlencode({'url': url, 'sig': sign_url(url)})}"
+
+
+def is_allowed(url: str, signature: Optional[str] = None) -> bool:
+    """Whether the proxy may fetch ``url``: signed by us or a stored article's image"""
+    if signature and constant_time_compare(signature, sign_url(url)):
+        return True
+    from .models import Article
+    return Article.objects.filter(image=url).exists()
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+class ImageCache:
+    """Content-addressed variants on disk, bounded to ``max_bytes`` by least recent use"""
+
+    def __init__(self, directory=None, max_bytes: Optional[int] = None):
+        config = settings.IMAGE_PROXY
+        self.directory = os.fspath(directory or config['CACHE_DIR'])
+        self.max_bytes = max_bytes if max_bytes is not None else config['MAX_CACHE_BYTES']
+
+    def _ref_path(self, key: str, size: str, fmt: str) -> str:
+        return os.path.join(self.directory, 'refs', key[:2], f"{key}-{size}.{fmt}")
+
+    def _blob_path(self, digest: str, fmt: str) -> str:
+        return os.path.join(self.directory, 'blobs', digest[:2], f"{digest}.{fmt}")
+
+    def get(self, key: str, size: str, fmt: str) -> Optional[Tuple[str, str]]:
+        """(digest, blob path) of a cached variant, or None"""
+        ref_path = self._ref_path(key, size, fmt)
+        try:
+            with open(ref_path) as f:
+                digest = f.read().strip()
+            blob_path = self._blob_path(digest, fmt)
+            os.utime(blob_path)
+            os.utime(ref_path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return digest, blob_path
+
+    def put(self, key: str, variants: Dict[Tuple[str, str], bytes]) -> None:
+        """Store ``{(size, format): bytes}`` for one source URL, then evict down to the size bound"""
+        for (size, fmt), data in variants.items():
+            digest = hashlib.sha256(data).hexdigest()
+            blob_path = self._blob_path(digest, fmt)
+            if os.path.exists(blob_path):
+                os.utime(blob_path)
+            else:
+                self._write(blob_path, data)
+            self._write(self._ref_path(key, size, fmt), digest.encode())
+        with _sizes_lock:
+            total = _sizes.get(self.directory)
+        if total is None or total > self.max_bytes:
+            self._evict()
+
+    def _write(self, path: str, data: bytes) -> None:
+        # Readers never see a partial file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with _sizes_lock:
+            if self.directory in _sizes:
+                _sizes[self.directory] += len(data)
+
+    def _files(self):
+        for kind in ('refs', 'blobs'):
+            for root, _, names in os.walk(os.path.join(self.directory, kind)):
+                for name in names:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime_ns, stat.st_size, path
+
+    def _evict(self) -> int:
+        """Walk the directory, resync the running total and evict if it is over the bound"""
+        files = list(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * LOW_WATER_MARK if total > self.max_bytes else total
+        evicted = 0
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with _sizes_lock:
+            _sizes[self.directory] = total
+        return evicted
+
+
+# Estimated bytes per cache directory: the last walk plus this process's writes since.
+# Other processes' writes only show up at the next walk, so the bound is approximate.
+_sizes: Dict[str, int] = {}
+_sizes_lock = threading.Lock()
+
+
+def check_url(url: str) -> str:
+    """
+    Address to connect to for ``url``
+
+    Raises ImageURLError unless ``url`` is http(s) on a host the proxy may
+    contact. Callers connect to the returned address rather than resolving the
+    host again, so the check can't be bypassed by DNS rebinding.
+    """
+    try:
+        parts = urlsplit(url)
+        parts.port  # raises ValueError for an invalid port
+    except ValueError:
+        raise ImageURLError('Invalid image URL')
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ImageURLError('Only http and https image URLs can be proxied')
+    try:
+        addresses = socket.getaddrinfo(parts.hostname, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        raise ImageURLError(f"Unknown image host {parts.hostname}")
+    if not settings.IMAGE_PROXY['ALLOW_PRIVATE_HOSTS']:
+        for *_, sockaddr in addresses:
+            if not ipaddress.ip_address(sockaddr[0]).is_global:
+                raise ImageURLError(f"Image host {parts.hostname} is not public")
+    return addresses[0][4][0]
+
+
+def _connect(url: str, address: str, timeout: float) -> urllib3.HTTPConnectionPool:
+    """Connection pool for ``url``'s origin that connects to ``address``"""
+    parts = urlsplit(url)
+    if parts.scheme == 'https':
+        # Certificates are still verified against the hostname, not the address
+        return urllib3.HTTPSConnectionPool(
+            address, parts.port or 443, timeout=timeout, retries=False,
+            server_hostname=parts.hostname, assert_hostname=parts.hostname,
+            cert_reqs='CERT_REQUIRED', ca_certs=certifi.where(),
+        )
+    return urllib3.HTTPConnectionPool(address, parts.port or 80, timeout=timeout, retries=False)
+
+
+def fetch(url: str) -> bytes:
+    """Download an image from the checked address, re-checking the host of every redirect"""
+    config = settings.IMAGE_PROXY
+    for _ in range(MAX_REDIRECTS + 1):
+        address = check_url(url)
+        parts = urlsplit(url)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        pool = _connect(url, address, config['TIMEOUT'])
+        try:
+            response = pool.urlopen(
+                'GET', path, redirect=False, preload_content=False, assert_same_host=False,
+                headers={'Host': parts.netloc.rpartition('@')[2], 'Accept': 'image/*'},
+            )
+            try:
+                location = response.get_redirect_location()
+                if location:
+                    url = urljoin(url, location)
+                    continue
+                if response.status != 200:
+                    raise ImageProxyError(f"Image upstream answered {response.status}")
+                body = BytesIO()
+                for chunk in response.stream(64 * 1024):
+                    body.write(chunk)
+                    if body.tell() > config['MAX_SOURCE_BYTES']:
+                        raise ImageProxyError('Image is too large')
+                return body.getvalue()
+            finally:
+                response.release_conn()
+        except urllib3.exceptions.HTTPError as e:
+            raise ImageProxyError(f"Failed to fetch image: {str(e)}")
+        finally:
+            pool.close()
+    raise ImageProxyError('Too many redirects')
+
+
+def render_variants(source: bytes) -> Dict[Tuple[str, str], bytes]:
+    """Every configured size in every format, from one decode of ``source``"""
+    config = settings.IMAGE_PROXY
+    try:
+        image = Image.open(BytesIO(source))
+        if image.width * image.height > config['MAX_PIXELS']:
+            raise ImageProxyError('Image has too many pixels')
+        # Let the JPEG decoder downscale by up to 8x while decoding; square, as EXIF may rotate it
+        largest = max(max(box) for box in config['SIZES'].values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageProxyError(f"Image could not be decoded: {str(e)}")
+
+    variants = {}
+    # Largest first, so each size is resampled from the previous one
+    for size, box in sorted(config['SIZES'].items(), key=lambda item: item[1], reverse=True):
+        image = image.copy()
+        image.thumbnail(box, Image.LANCZOS)
+        for fmt, (pil_format, _) in FORMATS.items():
+            frame = image
+            if pil_format == 'JPEG' and image.mode == 'RGBA':
+                frame = Image.new('RGB', image.size, (255, 255, 255))
+                frame.paste(image, mask=image.getchannel('A'))
+            out = BytesIO()
+            frame.save(out, pil_format, quality=config['QUALITY'][fmt], optimize=pil_format == 'JPEG')
+            variants[(size, fmt)] = out.getvalue()
+    return variants
+
+
+# URL key -> [lock, number of requests holding or waiting for it]. An entry lives until its
+# last request is done, so every concurrent miss for a URL queues on the same lock.
+_inflight: Dict[str, List] = {}
+_inflight_lock = threading.Lock()
+
+
+def get_variant(
+    url: str, size: str, fmt: str, image_cache: Optional[ImageCache] = None, signature: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    (digest, path) of a variant, fetching and rendering the source on a miss
+
+    Misses raise ImageNotAllowedError unless ``signature`` is ``sign_url(url)``
+    or ``url`` is an article's image. Concurrent misses for the same URL in
+    this process share one fetch.
+    """
+    image_cache = image_cache or ImageCache()
+    key = url_key(url)
+    cached = image_cache.get(key, size, fmt)
+    if cached is not None:
+        return cached
+    if not is_allowed(url, signature):
+        raise ImageNotAllowedError('Image URL is not signed and is not an article image')
+
+    failure_key = f"image_failed_{key}"
+    with _inflight_lock:
+        entry = _inflight.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            cached = image_cache.get(key, size, fmt)
+            if cached is not None:
+                return cached
+            failure = cache.get(failure_key)
+            if failure is not None:
+                raise ImageProxyError(failure)
+            try:
+                image_cache.put(key, render_variants(fetch(url)))
+            except ImageURLError:
+                raise
+            except ImageProxyError as e:
+                cache.set(failure_key, str(e), timeout=settings.IMAGE_PROXY['FAILURE_TTL'])
+                raise
+    finally:
+        with _inflight_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _inflight[key]
+
+    cached = image_cache.get(key, size, fmt)
+    if cached is None:
+        # Evicted right away: the cache is smaller than one image's variants
+        raise ImageProxyError('Image cache is too small to hold this image')
+    return cached
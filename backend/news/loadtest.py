@@ -0,0 +1,196 @@
+"""
+Closed-loop load generator for the news API.
+
+Each virtual user owns a ``requests.Session`` (so the anonymous session cookie
+behind ``get_session_id`` is kept) and issues requests back to back, picking
+the endpoint from a weighted traffic mix. Concurrency is ramped in steps; for
+every step we report throughput, latency percentiles and error rates per
+endpoint, plus the number of upstream calls when the Mediastack simulator's
+``/__stats__`` endpoint is available.
+"""
+from typing import Dict, List, Optional, Sequence
+import math
+import random
+import threading
+import time
+
+import requests
+
+# Relative weights of each endpoint in the traffic mix
+DEFAULT_MIX = {
+    'articles': 50,
+    'personalized': 25,
+    'interaction': 15,
+    'preferences': 10,
+}
+
+CATEGORIES = ['general', 'business', 'entertainment', 'health', 'science', 'sports', 'technology']
+COUNTRIES = ['us', 'gb', 'de', 'fr', 'ca']
+INTERACTION_TYPES = ['view', 'click', 'save', 'like', 'dislike', 'share']
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class VirtualUser:
+    """One simulated browser: its own cookie jar, issuing requests in a closed loop"""
+
+    def __init__(self, base_url: str, mix: Dict[str, int], article_ids: Sequence[int], rng: random.Random, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.endpoints = list(mix)
+        self.weights = [mix[name] for name in self.endpoints]
+        self.article_ids = article_ids
+        self.rng = rng
+        self.timeout = timeout
+
+    def request(self, endpoint: str) -> requests.Response:
+        rng = self.rng
+        if endpoint == 'articles':
+            params = {'limit': rng.choice([10, 25])}
+            if rng.random() < 0.7:
+                params['categories'] = rng.choice(CATEGORIES)
+            if rng.random() < 0.3:
+                params['countries'] = rng.choice(COUNTRIES)
+            if rng.random() < 0.2:
+                params['offset'] = rng.choice([25, 50])
+            return self.session.get(f"{self.base_url}/api/articles/", params=params, timeout=self.timeout)
+        if endpoint == 'personalized':
+            return self.session.get(f"{self.base_url}/api/personalized/", params={'limit': 25}, timeout=self.timeout)
+        if endpoint == 'interaction':
+            return self.session.post(f"{self.base_url}/api/interaction/", json={
+                'article_id': rng.choice(self.article_ids),
+                'interaction_type': rng.choice(INTERACTION_TYPES),
+            }, timeout=self.timeout)
+        if endpoint == 'preferences':
+            if rng.random() < 0.2:
+                return self.session.post(f"{self.base_url}/api/preferences/", json={
+                    'preferred_categories': rng.sample(CATEGORIES, 2),
+                }, timeout=self.timeout)
+            return self.session.get(f"{self.base_url}/api/preferences/", timeout=self.timeout)
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+    def run(self, deadline: float, samples: List, lock: threading.Lock):
+        local = []
+        while time.perf_counter() < deadline:
+            endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = self.request(endpoint).status_code < 400
+            except requests.RequestException:
+                ok = False
+            local.append((endpoint, time.perf_counter() - start, ok))
+        with lock:
+            samples.extend(local)
+
+
+def upstream_calls(stats_url: Optional[str]) -> Optional[int]:
+    """Upstream request counter from the Mediastack simulator, if reachable"""
+    if not stats_url:
+        return None
+    try:
+        return requests.get(stats_url, timeout=5).json()['requests']
+    except (requests.RequestException, ValueError, KeyError):
+        return None
+
+
+def summarize(samples: List, elapsed: float) -> Dict:
+    """Throughput, error rate and latency percentiles (ms) for a list of (endpoint, seconds, ok) samples"""
+    latencies = sorted(seconds * 1000 for _, seconds, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if latencies else None,
+    }
+
+
+def run_step(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, int],
+    article_ids: Sequence[int],
+    seed: int = 0,
+    timeout: float = 30.0,
+    upstream_stats_url: Optional[str] = None
+) -> Dict:
+    """Run ``concurrency`` virtual users for ``duration`` seconds and summarize the step"""
+    samples = []
+    lock = threading.Lock()
+    users = [
+        VirtualUser(base_url, mix, article_ids, random.Random(seed * 1000 + i), timeout)
+        for i in range(concurrency)
+    ]
+
+    upstream_before = upstream_calls(upstream_stats_url)
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [threading.Thread(target=user.run, args=(deadline, samples, lock), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    upstream_after = upstream_calls(upstream_stats_url)
+
+    for user in users:
+        user.session.close()
+
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample[0], []).append(sample)
+
+    return {
+        'concurrency': concurrency,
+        'duration': elapsed,
+        'overall': summarize(samples, elapsed),
+        'endpoints': {name: summarize(by_endpoint[name], elapsed) for name in sorted(by_endpoint)},
+        'upstream_calls': (
+            upstream_after - upstream_before
+            if upstream_before is not None and upstream_after is not None else None
+        ),
+    }
+
+
+def run_load_test(
+    base_url: str,
+    steps: Sequence[int],
+    duration: float,
+    mix: Optional[Dict[str, int]] = None,
+    article_ids: Sequence[int] = (),
+    seed: int = 0,
+    upstream_stats_url: Optional[str] = None,
+    on_step=None
+) -> Dict:
+    """Ramp through ``steps`` concurrency levels and collect per-step results"""
+    mix = dict(mix or DEFAULT_MIX)
+    if not article_ids:
+        # Interactions need existing article ids
+        mix.pop('interaction', None)
+
+    results = {
+        'base_url': base_url,
+        'mix': mix,
+        'step_duration': duration,
+        'steps': [],
+    }
+    for index, concurrency in enumerate(steps):
+        step = run_step(
+            base_url, concurrency, duration, mix, article_ids,
+            seed=seed + index, upstream_stats_url=upstream_stats_url
+        )
+        results['steps'].append(step)
+        if on_step:
+            on_step(step)
+    return results
@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from news.benchmarks import cases  # noqa: F401  (registers the cases)
+from news.benchmarks.harness import CASES, compare_results, measure_all
+from news.benchmarks.upstream import StubUpstream
+from datetime import datetime, timezone
+import io
+import json
+import platform
+import tempfile
+import django
+
+BENCHMARK_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'OPTIONS': {'MAX_ENTRIES': 10000},
+}
+
+class Command(BaseCommand):
+    help = (
+        'Run backend performance benchmarks against a stubbed Mediastack upstream '
+        'in a throwaway test database, optionally comparing with a JSON baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('cases', nargs='*', help=f"Cases to run (default: all of {', '.join(CASES)})")
+        parser.add_argument('--duration', type=float, default=1.0, help='Seconds to time each case')
+        parser.add_argument(
+            '--repeats', type=int, default=5,
+            help='Rounds each case\'s duration is split into, interleaved across cases; comparisons use their quartiles'
+        )
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--baseline', help='Compare against results previously written with --output')
+        parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help=(
+                'Fail when a case is this fraction slower (or uses this much more memory) than the baseline, '
+                'beyond the spread between both runs\' quartiles'
+            )
+        )
+
+    def handle(self, *args, **options):
+        names = options['cases'] or list(CASES)
+        unknown = [name for name in names if name not in CASES]
+        if unknown:
+            raise CommandError(f"Unknown benchmark cases: {', '.join(unknown)}")
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+
+        results = self._run(names, options['duration'], options['repeats'])
+
+        report = {
+            'meta': {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'machine': platform.machine(),
+                'duration': options['duration'],
+                'repeats': options['repeats'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = compare_results(results, baseline, options['threshold'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f"{len(regressions)} benchmark regression(s) beyond {options['threshold']:.0%}")
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def _run(self, names, duration, repeats):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Cases clear the feed cache; give them a file cache of their own, not the shared one
+            with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+                MEDIASTACK_API_KEY=settings.MEDIASTACK_API_KEY or 'benchmark',
+                CACHES={'default': {**BENCHMARK_CACHE, 'LOCATION': cache_dir}},
+                # No re-scoring thread competing with the cases for the database and the CPU
+                RESCORING={**settings.RESCORING, 'IN_BACKGROUND': False},
+            ):
+                call_command('initialize_bias_data', stdout=io.StringIO())
+                with StubUpstream():
+                    operations = {name: CASES[name]() for name in names}
+                    results = measure_all(operations, duration=duration, repeats=repeats)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:>32}: {result['ops_per_sec']:10.1f} ops/sec "
+                f"(IQR {result['ops_per_sec_q3'] - result['ops_per_sec_q1']:7.1f})  "
+                f"{result['median_ms']:8.2f} ms median  "
+                f"{result['peak_bytes'] / 1024:8.1f} KiB peak  "
+                f"{result['retained_blocks']:6d} blocks retained"
+            )
+        return results
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from news.renderers import FastJSONRenderer
+from datetime import datetime, timedelta, timezone
+import time
+
+class Command(BaseCommand):
+    help = 'Compare JSON encode throughput of the stock and orjson-backed renderers on article payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=100, help='Articles per payload (default: 100)')
+        parser.add_argument('--duration', type=float, default=2.0, help='Seconds to run each renderer')
+
+    def handle(self, *args, **options):
+        payload = self._article_payload(options['articles'])
+        size = len(JSONRenderer().render(payload))
+        self.stdout.write(f"Payload: {options['articles']} articles, {size} bytes")
+
+        results = {}
+        for name, renderer in (('JSONRenderer', JSONRenderer()), ('FastJSONRenderer', FastJSONRenderer())):
+            ops_per_sec = self._measure(renderer, payload, options['duration'])
+            results[name] = ops_per_sec
+            self.stdout.write(
+                f"{name:>18}: {ops_per_sec:10.1f} ops/sec  {ops_per_sec * size / 1e6:8.1f} MB/s"
+            )
+
+        speedup = results['FastJSONRenderer'] / results['JSONRenderer']
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {speedup:.2f}x"))
+
+    def _measure(self, renderer, payload, duration):
+        # Warm up, then count whole renders within the time budget
+        renderer.render(payload)
+        iterations = 0
+        start = time.perf_counter()
+        deadline = start + duration
+        while time.perf_counter() < deadline:
+            renderer.render(payload)
+            iterations += 1
+        return iterations / (time.perf_counter() - start)
+
+    def _article_payload(self, count):
+        published_at = datetime(2025, 3, 15, 22, 0, tzinfo=timezone.utc)
+        articles = []
+        for i in range(count):
+            articles.append({
+                'title': f'Article headline number {i} about something newsworthy',
+                'description': 'A two sentence summary of the article. ' * 4,
+                'url': f'https://example.com/news/2025/03/15/article-{i}',
+                'image': f'https://cdn.example.com/images/{i}.jpg',
+                'published_at': published_at - timedelta(minutes=i),
+                'source': ('BBC', 'Reuters', 'CNN', 'Fox News')[i % 4],
+                'category': ('general', 'business', 'technology')[i % 3],
+                'country': ('US', 'GB')[i % 2],
+                'bias_score': (-0.3, 0.0, 0.6, None)[i % 4],
+                'reliability_score': (0.7, 0.95, 0.5, None)[i % 4],
+            })
+        return {'articles': articles, 'pagination': {'offset': 0, 'limit': count, 'total': count}}
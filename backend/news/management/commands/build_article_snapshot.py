@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from news.snapshot import rebuild_snapshot
+from django.conf import settings
+
+class Command(BaseCommand):
+    help = 'Rebuild the memory-mapped article feature snapshot used for ranking'
+
+    def handle(self, *args, **options):
+        count = rebuild_snapshot()
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote {count} articles to {settings.ARTICLE_SNAPSHOT_PATH}')
+        )
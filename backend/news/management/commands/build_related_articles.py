@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from news.recommendations import build_related_articles
+
+class Command(BaseCommand):
+    help = 'Rebuild the "readers also viewed" neighbors from recent interactions'
+
+    def add_arguments(self, parser):
+        config = settings.RELATED_ARTICLES
+        parser.add_argument('--top-k', type=int, default=config['TOP_K'], help='Neighbors stored per article')
+        parser.add_argument('--window-days', type=int, default=config['WINDOW_DAYS'], help='Days of interactions to use')
+        parser.add_argument(
+            '--min-cooccurrence', type=int, default=config['MIN_COOCCURRENCE'],
+            help='Visitors two articles must share to be related'
+        )
+
+    def handle(self, *args, **options):
+        written = build_related_articles(
+            top_k=options['top_k'],
+            window_days=options['window_days'],
+            min_cooccurrence=options['min_cooccurrence']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} related articles"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from news.services import ArticleIngestService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Fetch the newest articles from Mediastack and store the ones not seen yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', help='Comma-separated list of categories')
+        parser.add_argument('--countries', help='Comma-separated list of country codes')
+        parser.add_argument('--limit', type=int, default=100, help='Number of articles to fetch (max 100)')
+
+    def handle(self, *args, **options):
+        categories = options['categories'].split(',') if options['categories'] else None
+        countries = options['countries'].split(',') if options['countries'] else None
+
+        try:
+            created = ArticleIngestService().ingest(
+                categories=categories,
+                countries=countries,
+                limit=options['limit']
+            )
+        except Exception as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully ingested {len(created)} new articles')
+        )
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
-from news.models import BiasSource
+from news.models import BiasSource, SourceAlias
+from news.rescoring import batched_rescoring, run_job
+from news.sources import normalize_source_name
 import logging
 
 logger = logging.getLogger(__name__)
@@ -133,25 +135,56 @@ class Command(BaseCommand):
             }
         ]
 
+        # Names the sources appear under upstream that normalization alone doesn't match
+        # (case, punctuation, "The", ".com" and suffixes like "News" are handled already)
+        aliases = {
+            'CNN': ['CNN Wire'],
+            'Fox News': ['foxnews', 'Fox Business'],
+            'Associated Press': ['AP', 'apnews'],
+            'The New York Times': ['nytimes', 'NYT'],
+            'The Washington Post': ['washpost', 'WaPo'],
+            'The Wall Street Journal': ['WSJ'],
+            'HuffPost': ['Huffington Post', 'HuffPo'],
+            'The Guardian': ['theguardian'],
+            'NPR': ['National Public Radio'],
+            'The Daily Beast': ['thedailybeast'],
+            'Newsmax': ['Newsmax TV'],
+            'The Hill': ['thehill'],
+        }
+
         # Create or update BiasSource objects
         created_count = 0
         updated_count = 0
 
-        for source_data in sources_data:
-            bias_source, created = BiasSource.objects.update_or_create(
-                source_name=source_data['source_name'],
-                defaults={
-                    'bias_rating': source_data['bias_rating'],
-                    'reliability_score': source_data['reliability_score'],
-                    'description': source_data['description']
-                }
-            )
+        # One re-scoring job for all sources, run here once seeding is done rather than
+        # on the background runner while the sources are still being written
+        with batched_rescoring() as batch:
+            for source_data in sources_data:
+                bias_source, created = BiasSource.objects.update_or_create(
+                    source_name=source_data['source_name'],
+                    defaults={
+                        'bias_rating': source_data['bias_rating'],
+                        'reliability_score': source_data['reliability_score'],
+                        'description': source_data['description']
+                    }
+                )
             
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
-        
+                if created:
+                    created_count += 1
+                else:
+                    updated_count += 1
+
+                for alias in aliases.get(source_data['source_name'], []):
+                    SourceAlias.objects.update_or_create(
+                        alias_key=normalize_source_name(alias),
+                        defaults={'alias': alias, 'bias_source': bias_source}
+                    )
+
+        if batch.job is not None:
+            job = run_job(batch.job)
+            if job.status != 'done':
+                self.stderr.write(f"Re-scoring job {job.id} is {job.status}; run rescore_articles to finish it")
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully initialized bias data: {created_count} created, {updated_count} updated'
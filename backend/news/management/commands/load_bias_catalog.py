@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from news.catalog import CatalogError, detect_format, load_catalog
+
+class Command(BaseCommand):
+    help = 'Bulk load a media-bias catalog (CSV, JSON Lines or JSON array) into the bias sources'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file')
+        parser.add_argument('--format', choices=['csv', 'jsonl', 'json'], help='Catalog format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Sources upserted per statement')
+        parser.add_argument('--skip-invalid', action='store_true', help='Report and skip invalid records instead of aborting')
+        parser.add_argument('--dry-run', action='store_true', help='Report the diff without writing anything')
+
+    def handle(self, *args, **options):
+        try:
+            fmt = options['format'] or detect_format(options['path'])
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                report = load_catalog(
+                    f, fmt,
+                    chunk_size=options['chunk_size'],
+                    skip_invalid=options['skip_invalid'],
+                    dry_run=options['dry_run']
+                )
+        except CatalogError as e:
+            raise CommandError(f"Invalid catalog, nothing was loaded: {str(e)}")
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report.errors:
+            self.stderr.write(f"Skipped {str(error)}")
+        if options['verbosity'] > 1:
+            for source_name in report.created:
+                self.stdout.write(f"+ {source_name}")
+            for source_name in report.updated:
+                self.stdout.write(f"~ {source_name}")
+
+        summary = (
+            f"{len(report.created)} created, {len(report.updated)} updated, {report.unchanged} unchanged, "
+            f"{len(report.errors)} skipped, {report.aliases} aliases"
+        )
+        if options['dry_run']:
+            self.stdout.write(f"Dry run, nothing was written: {summary}")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Loaded bias catalog: {summary}"))
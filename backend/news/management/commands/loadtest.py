@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from news.loadtest import DEFAULT_MIX, run_load_test
+from news.models import Article
+from datetime import datetime, timezone
+import json
+
+class Command(BaseCommand):
+    help = (
+        'Drive the API with a closed-loop traffic mix, ramping concurrency in steps, and report '
+        'throughput, latency percentiles, error rates and upstream calls per step'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Backend under test')
+        parser.add_argument('--steps', default='1,4,16', help='Comma-separated concurrency levels')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds per step')
+        parser.add_argument(
+            '--mix', default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+            help='Traffic mix as endpoint=weight pairs'
+        )
+        parser.add_argument(
+            '--upstream-stats-url', default='http://127.0.0.1:8765/__stats__',
+            help="Mediastack simulator stats URL used to count upstream calls ('' to disable)"
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write machine-readable results as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            steps = [int(step) for step in options['steps'].split(',')]
+            mix = {}
+            for pair in options['mix'].split(','):
+                name, weight = pair.split('=')
+                if name not in DEFAULT_MIX:
+                    raise ValueError(f"unknown endpoint '{name}'")
+                mix[name] = int(weight)
+        except ValueError as e:
+            raise CommandError(f"Invalid --steps or --mix: {e}")
+
+        # Interactions must reference stored articles; sample ids from the same database
+        article_ids = list(Article.objects.order_by('-published_at').values_list('id', flat=True)[:1000])
+        if not article_ids and mix.get('interaction'):
+            self.stderr.write('No stored articles; interaction traffic disabled (run ingest_articles first)')
+
+        results = run_load_test(
+            options['base_url'],
+            steps,
+            options['duration'],
+            mix=mix,
+            article_ids=article_ids,
+            seed=options['seed'],
+            upstream_stats_url=options['upstream_stats_url'] or None,
+            on_step=self._print_step
+        )
+        results['created_at'] = datetime.now(timezone.utc).isoformat()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _print_step(self, step):
+        upstream = step['upstream_calls']
+        self.stdout.write(
+            f"concurrency={step['concurrency']} throughput={step['overall']['throughput']:.1f} req/s "
+            f"errors={step['overall']['error_rate']:.1%} "
+            f"upstream_calls={upstream if upstream is not None else 'n/a'}"
+        )
+        for name, stats in step['endpoints'].items():
+            self.stdout.write(
+                f"  {name:>13}: {stats['requests']:6d} req  {stats['throughput']:7.1f} req/s  "
+                f"p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms  "
+                f"errors={stats['error_rate']:.1%}"
+            )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from news.profiling import make_token
+
+class Command(BaseCommand):
+    help = 'Print a signed token that enables profiling for requests sending it in the X-Profile header'
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
+        self.stderr.write(f'Valid for {settings.PROFILING_TOKEN_MAX_AGE} seconds')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from news.analytics import rebuild_rollups
+
+class Command(BaseCommand):
+    help = 'Recompute the bias analytics rollups from the stored articles (e.g. after a backfill)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', action='append', dest='sources', help='Only rebuild this source (repeatable)')
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(sources=options['sources'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} bias rollup rows"))
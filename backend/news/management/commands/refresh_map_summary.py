@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from news.country_summary import refresh_summaries
+
+class Command(BaseCommand):
+    help = 'Recompute the per-country summaries served to the news map'
+
+    def handle(self, *args, **options):
+        written = refresh_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {written} country summaries"))
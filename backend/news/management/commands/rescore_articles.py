@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from news.models import BiasSource, RescoreJob
+from news.rescoring import run_pending_jobs
+
+class Command(BaseCommand):
+    help = 'Run unfinished article re-scoring jobs (resuming interrupted ones), or re-score every bias source'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Queue a job for every bias source first')
+        parser.add_argument('--chunk-size', type=int, default=settings.RESCORING['CHUNK_SIZE'], help='Articles per UPDATE')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            # Not enqueue_rescore: this command runs the job itself, not the background runner
+            RescoreJob.objects.create(source_ids=list(BiasSource.objects.values_list('id', flat=True)))
+
+        jobs = run_pending_jobs(chunk_size=options['chunk_size'])
+        for job in jobs:
+            if job.status == 'failed':
+                self.stderr.write(f"Job {job.id} failed: {job.error}")
+            else:
+                self.stdout.write(f"Job {job.id}: re-scored {job.updated_count} articles of {len(job.source_ids)} sources")
+        self.stdout.write(self.style.SUCCESS(f"Ran {len(jobs)} re-scoring jobs"))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from news.simulator import LatencyModel, MediastackSimulator, make_server
+
+class Command(BaseCommand):
+    help = 'Serve a local Mediastack /v1/news simulator for offline benchmarks and load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--total', type=int, default=10000, help='Number of synthetic articles')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic articles')
+        parser.add_argument(
+            '--latency', default='fixed:0',
+            help='Latency in ms: fixed:50, uniform:20:200, normal:100:30 or lognormal:80:0.5'
+        )
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+        parser.add_argument('--quota', type=int, help='Answer usage_limit_reached after this many requests')
+        parser.add_argument('--access-key', help='Only accept this access key (default: accept any)')
+
+    def handle(self, *args, **options):
+        try:
+            LatencyModel(options['latency'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        app = MediastackSimulator(
+            total=options['total'],
+            seed=options['seed'],
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            quota=options['quota'],
+            access_key=options['access_key']
+        )
+        server = make_server(options['host'], options['port'], app)
+        base_url = f"http://{options['host']}:{server.server_port}/v1"
+        self.stdout.write(self.style.SUCCESS(f'Mediastack simulator listening, set MEDIASTACK_BASE_URL={base_url}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
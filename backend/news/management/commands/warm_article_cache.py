@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from news.warming import hot_combinations, warm_cache
+
+class Command(BaseCommand):
+    help = 'Cache the first page of the most popular category/country article queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=settings.CACHE_WARMING['TOP_N'], help='Number of combinations to warm')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the combinations')
+
+    def handle(self, *args, **options):
+        combinations = hot_combinations(options['top'], settings.CACHE_WARMING['WINDOW_HOURS'])
+        if options['dry_run']:
+            for category, country in combinations:
+                self.stdout.write(f"category={category or '-'} country={country or '-'}")
+            return
+
+        stats = warm_cache(combinations)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {stats['warmed']} queries ({stats['skipped']} already cached, {stats['failed']} failed)"
+            )
+        )
@@ -0,0 +1,47 @@
+"""
+Tiny in-process metrics registry.
+
+Counters and timing summaries are kept per worker process; ``snapshot()``
+returns a copy, which admins can read from ``/api/metrics/`` (``MetricsView``).
+"""
+from collections import defaultdict
+from typing import Dict
+import threading
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_summaries: Dict[str, Dict[str, float]] = {}
+
+
+def increment(name: str, value: float = 1) -> None:
+    """Add ``value`` to counter ``name``"""
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float) -> None:
+    """Record one observation (e.g. a duration or a count) for summary ``name``"""
+    with _lock:
+        summary = _summaries.get(name)
+        if summary is None:
+            _summaries[name] = {'count': 1, 'sum': value, 'max': value}
+        else:
+            summary['count'] += 1
+            summary['sum'] += value
+            if value > summary['max']:
+                summary['max'] = value
+
+
+def snapshot() -> Dict:
+    """Copy of all counters and summaries"""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'summaries': {name: dict(summary) for name, summary in _summaries.items()},
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import connections
+from contextlib import ExitStack
+import time
+
+from . import metrics
+
+
+class QueryCounter:
+    """``execute_wrapper`` that counts queries and their total duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class QueryCountMiddleware:
+    """
+    Record the number of SQL queries and the total SQL time per request
+
+    Both are recorded as ``db.queries.<url name>`` and ``db.time_ms.<url name>``
+    metrics, which admins can read from ``/api/metrics/``; in DEBUG they are also returned as ``X-DB-Query-Count`` and
+    ``X-DB-Query-Time-Ms`` response headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.url_name if match and match.url_name else 'unmatched'
+        duration_ms = counter.duration * 1000
+        metrics.observe(f'db.queries.{view_name}', counter.count)
+        metrics.observe(f'db.time_ms.{view_name}', duration_ms)
+
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(counter.count)
+            response['X-DB-Query-Time-Ms'] = f'{duration_ms:.2f}'
+        return response
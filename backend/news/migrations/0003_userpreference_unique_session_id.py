@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-19 17:27
+
+from django.db import migrations, models
+
+
+def dedupe_session_preferences(apps, schema_editor):
+    """Keep the most recently updated preference per session_id before adding the unique index"""
+    UserPreference = apps.get_model("news", "UserPreference")
+    duplicated = (
+        UserPreference.objects.exclude(session_id__isnull=True)
+        .values("session_id")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .values_list("session_id", flat=True)
+    )
+    for session_id in duplicated:
+        preferences = UserPreference.objects.filter(session_id=session_id).order_by("-updated_at", "-id")
+        keep = preferences.first()
+        preferences.exclude(id=keep.id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0002_biassource_userinteraction_userpreference_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_session_preferences, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="userpreference",
+            name="session_id",
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.20 on 2026-10-19 17:33
+
+import django.db.models.deletion
+import re
+import unicodedata
+from django.db import migrations, models
+
+# A frozen copy of news.sources.normalize_source_name as of this migration, so later
+# changes to the live function don't change what this migration writes
+DOMAIN_SUFFIX = re.compile(r"\.(com|co\.uk|org|net|news|co|uk|us)$")
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+SUFFIX_WORDS = {
+    "news", "international", "online", "digital", "com", "live", "edition", "english",
+    "channel", "network", "us", "uk", "usa", "world",
+}
+
+
+def normalize_source_name(name):
+    if not name:
+        return ""
+    key = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").casefold().strip()
+    key = re.sub(r"^https?://", "", key)
+    key = re.sub(r"^www\.", "", key).rstrip("/")
+    key = DOMAIN_SUFFIX.sub("", key)
+    words = NON_ALPHANUMERIC.sub(" ", key).split()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in SUFFIX_WORDS:
+        words = words[:-1]
+    return "".join(words)
+
+
+def populate_normalized_keys(apps, schema_editor):
+    BiasSource = apps.get_model("news", "BiasSource")
+    bias_sources = list(BiasSource.objects.all())
+    for bias_source in bias_sources:
+        bias_source.normalized_key = normalize_source_name(bias_source.source_name)
+    BiasSource.objects.bulk_update(bias_sources, ["normalized_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0003_userpreference_unique_session_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="biassource",
+            name="normalized_key",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=200),
+        ),
+        migrations.RunPython(populate_normalized_keys, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="SourceAlias",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("alias", models.CharField(max_length=200)),
+                ("alias_key", models.CharField(editable=False, max_length=200, unique=True)),
+                (
+                    "bias_source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="aliases",
+                        to="news.biassource",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "source aliases",
+            },
+        ),
+        migrations.CreateModel(
+            name="UnresolvedSource",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source_name", models.CharField(max_length=200, unique=True)),
+                ("normalized_key", models.CharField(db_index=True, max_length=200)),
+                ("occurrences", models.PositiveIntegerField(default=0)),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-occurrences"],
+            },
+        ),
+    ]
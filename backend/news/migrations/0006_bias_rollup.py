@@ -0,0 +1,51 @@
+# Generated by Django 4.2.20 on 2026-10-19 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0005_rescoring"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BiasRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("category", models.CharField(blank=True, default="", max_length=100)),
+                ("country", models.CharField(blank=True, default="", max_length=2)),
+                ("source", models.CharField(max_length=200)),
+                ("article_count", models.PositiveIntegerField(default=0)),
+                ("far_left_count", models.PositiveIntegerField(default=0)),
+                ("left_count", models.PositiveIntegerField(default=0)),
+                ("center_left_count", models.PositiveIntegerField(default=0)),
+                ("center_count", models.PositiveIntegerField(default=0)),
+                ("center_right_count", models.PositiveIntegerField(default=0)),
+                ("right_count", models.PositiveIntegerField(default=0)),
+                ("far_right_count", models.PositiveIntegerField(default=0)),
+                ("unrated_count", models.PositiveIntegerField(default=0)),
+                ("reliability_sum", models.FloatField(default=0.0)),
+                ("reliability_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["source"], name="news_biasro_source_f549c4_idx")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("bucket_start", "category", "country", "source"),
+                        name="bias_rollup_unique_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
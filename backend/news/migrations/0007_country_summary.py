@@ -0,0 +1,43 @@
+# Generated by Django 4.2.20 on 2026-10-19 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0006_bias_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CountrySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("window_hours", models.PositiveIntegerField()),
+                ("country", models.CharField(max_length=2)),
+                ("article_count", models.PositiveIntegerField(default=0)),
+                ("average_bias", models.FloatField(blank=True, null=True)),
+                ("top_article_ids", models.JSONField(default=list)),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name_plural": "country summaries",
+                "ordering": ["window_hours", "country"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("window_hours", "country"),
+                        name="country_summary_unique_window",
+                    )
+                ],
+            },
+        ),
+    ]
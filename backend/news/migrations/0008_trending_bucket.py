@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-19 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0007_country_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("article_id", models.BigIntegerField()),
+                ("minute", models.DateTimeField(db_index=True)),
+                ("count", models.FloatField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.20 on 2026-10-19 17:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0008_trending_bucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedArticle",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_articles",
+                        to="news.article",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="news.article",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["article", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("article", "rank"),
+                        name="related_article_unique_rank",
+                    )
+                ],
+            },
+        ),
+    ]
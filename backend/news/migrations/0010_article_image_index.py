@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0009_related_article"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="article",
+            name="image",
+            field=models.URLField(blank=True, db_index=True, null=True),
+        ),
+    ]
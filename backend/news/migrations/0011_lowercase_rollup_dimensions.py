@@ -0,0 +1,40 @@
+# Generated by Django 4.2.20 on 2026-10-20 09:12
+
+from django.db import migrations
+
+DIMENSIONS = ("bucket_start", "category", "country", "source")
+
+
+def lowercase_dimensions(apps, schema_editor):
+    """Fold rollup rows stored with uppercase category or country into their lowercase row"""
+    BiasRollup = apps.get_model("news", "BiasRollup")
+    sum_fields = [
+        field.name for field in BiasRollup._meta.concrete_fields
+        if not field.primary_key and field.name not in DIMENSIONS
+    ]
+    for rollup in BiasRollup.objects.order_by("id"):
+        category, country = rollup.category.lower(), rollup.country.lower()
+        if (category, country) == (rollup.category, rollup.country):
+            continue
+        target = BiasRollup.objects.filter(
+            bucket_start=rollup.bucket_start, category=category, country=country, source=rollup.source
+        ).first()
+        if target is None:
+            rollup.category, rollup.country = category, country
+            rollup.save(update_fields=["category", "country"])
+            continue
+        for field in sum_fields:
+            setattr(target, field, getattr(target, field) + getattr(rollup, field))
+        target.save(update_fields=sum_fields)
+        rollup.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0010_article_image_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_dimensions, migrations.RunPython.noop),
+    ]
@@ -1,17 +1,22 @@
 from django.db import models
 from django.contrib.auth.models import User
+from .sources import normalize_source_name
 
 class Article(models.Model):
     title = models.CharField(max_length=500)
     description = models.TextField(null=True, blank=True)
     url = models.URLField()
-    image = models.URLField(null=True, blank=True)
+    image = models.URLField(null=True, blank=True, db_index=True)
     published_at = models.DateTimeField()
     source = models.CharField(max_length=200, db_index=True)
     category = models.CharField(max_length=100, null=True, blank=True, db_index=True)
     country = models.CharField(max_length=2, null=True, blank=True, db_index=True)
     bias_score = models.FloatField(null=True, blank=True)
     reliability_score = models.FloatField(null=True, blank=True)
+    # The bias source ``source`` resolved to; bias_score and reliability_score are copied from it
+    bias_source = models.ForeignKey(
+        'BiasSource', on_delete=models.SET_NULL, null=True, blank=True, related_name='articles'
+    )
     
     class Meta:
         ordering = ['-published_at']
@@ -24,7 +29,7 @@ class Article(models.Model):
 
 class UserPreference(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
-    session_id = models.CharField(max_length=100, null=True, blank=True)
+    session_id = models.CharField(max_length=100, null=True, blank=True, unique=True)
     interests = models.JSONField(default=list)
     preferred_categories = models.JSONField(default=list)
     preferred_sources = models.JSONField(default=list)
@@ -87,9 +92,163 @@ class BiasSource(models.Model):
     )
     
     source_name = models.CharField(max_length=200, unique=True)
+    # normalize_source_name(source_name); set on save, bulk writers must set it themselves
+    normalized_key = models.CharField(max_length=200, db_index=True, editable=False, default='')
     bias_rating = models.CharField(max_length=20, choices=BIAS_CHOICES, null=True, blank=True)
     reliability_score = models.FloatField(null=True, blank=True)
     description = models.TextField(null=True, blank=True)
     
+    def save(self, *args, **kwargs):
+        self.normalized_key = normalize_source_name(self.source_name)
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.source_name} ({self.get_bias_rating_display() if self.bias_rating else 'Unknown'})"
+
+class SourceAlias(models.Model):
+    """Another name a bias source appears under upstream (e.g. "nytimes" for The New York Times)"""
+    alias = models.CharField(max_length=200)
+    alias_key = models.CharField(max_length=200, unique=True, editable=False)
+    bias_source = models.ForeignKey(BiasSource, on_delete=models.CASCADE, related_name='aliases')
+    
+    class Meta:
+        verbose_name_plural = 'source aliases'
+    
+    def save(self, *args, **kwargs):
+        self.alias_key = normalize_source_name(self.alias)
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return f"{self.alias} -> {self.bias_source.source_name}"
+
+class UnresolvedSource(models.Model):
+    """Review queue of upstream source names that matched no bias source or alias"""
+    source_name = models.CharField(max_length=200, unique=True)
+    normalized_key = models.CharField(max_length=200, db_index=True)
+    occurrences = models.PositiveIntegerField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-occurrences']
+    
+    def __str__(self):
+        return f"{self.source_name} ({self.occurrences})"
+
+class RescoreJob(models.Model):
+    """
+    Re-score the stored articles of some bias sources after their ratings changed
+
+    Jobs are resumable: ``cursor`` is the highest Article id already re-scored,
+    so a job interrupted part-way continues from there (see ``news.rescoring``).
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    source_ids = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    # Whether articles with no bias source yet have been linked to these sources
+    linked = models.BooleanField(default=False)
+    cursor = models.BigIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"Rescore {len(self.source_ids)} sources ({self.status})"
+
+class BiasRollup(models.Model):
+    """
+    Hourly article counts per bias rating and reliability totals for one
+    (hour, category, country, source); maintained by ``news.analytics``
+    """
+    bucket_start = models.DateTimeField()
+    # '' when the articles have no category or country
+    category = models.CharField(max_length=100, default='', blank=True)
+    country = models.CharField(max_length=2, default='', blank=True)
+    source = models.CharField(max_length=200)
+    article_count = models.PositiveIntegerField(default=0)
+    far_left_count = models.PositiveIntegerField(default=0)
+    left_count = models.PositiveIntegerField(default=0)
+    center_left_count = models.PositiveIntegerField(default=0)
+    center_count = models.PositiveIntegerField(default=0)
+    center_right_count = models.PositiveIntegerField(default=0)
+    right_count = models.PositiveIntegerField(default=0)
+    far_right_count = models.PositiveIntegerField(default=0)
+    unrated_count = models.PositiveIntegerField(default=0)
+    # Over the articles that have a reliability score
+    reliability_sum = models.FloatField(default=0.0)
+    reliability_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['bucket_start', 'category', 'country', 'source'],
+                name='bias_rollup_unique_bucket'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['source']),
+        ]
+    
+    def __str__(self):
+        return f"{self.bucket_start:%Y-%m-%d %H:00} {self.category or '-'}/{self.country or '-'}/{self.source}"
+
+class CountrySummary(models.Model):
+    """Per-country article stats over the last ``window_hours``, precomputed for the news map"""
+    window_hours = models.PositiveIntegerField()
+    country = models.CharField(max_length=2)
+    article_count = models.PositiveIntegerField(default=0)
+    average_bias = models.FloatField(null=True, blank=True)
+    # Ids of the most engaged-with articles, best first
+    top_article_ids = models.JSONField(default=list)
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['window_hours', 'country']
+        constraints = [
+            models.UniqueConstraint(fields=['window_hours', 'country'], name='country_summary_unique_window')
+        ]
+        verbose_name_plural = 'country summaries'
+    
+    def __str__(self):
+        return f"{self.country} ({self.window_hours}h): {self.article_count} articles"
+
+class TrendingBucket(models.Model):
+    """
+    Interaction weight recorded for an article in one minute, written by the
+    trending engine's checkpoints (``news.trending``). Workers only insert
+    their own deltas, so one article and minute can have several rows.
+    """
+    # Not a foreign key: checkpoints must not fail for articles deleted since they were counted
+    article_id = models.BigIntegerField()
+    minute = models.DateTimeField(db_index=True)
+    count = models.FloatField()
+    
+    def __str__(self):
+        return f"Article {self.article_id} at {self.minute:%Y-%m-%d %H:%M}: {self.count}"
+
+class RelatedArticle(models.Model):
+    """One of an article's top-k "readers also viewed" neighbors, built by ``news.recommendations``"""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_articles')
+    related = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    # Cosine similarity of the two articles' visitor sets
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['article', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'rank'], name='related_article_unique_rank')
+        ]
+    
+    def __str__(self):
+        return f"{self.article_id} -> {self.related_id} ({self.score:.3f})"
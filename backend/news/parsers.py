@@ -0,0 +1,44 @@
+"""
+orjson-backed drop-in replacement for DRF's JSONParser.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import json
+from django.conf import settings
+import codecs
+import re
+
+from .renderers import FastJSONRenderer, orjson
+
+# orjson decodes integers that do not fit in 64 bits as floats; send bodies
+# that might contain one to the stdlib parser instead
+LONG_NUMBER = re.compile(rb'\d{19,}')
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser that decodes UTF-8 bodies with orjson
+
+    Bodies orjson rejects, and bodies with very long numbers, are parsed with
+    the stdlib so results and error messages match JSONParser.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+
+        try:
+            return json.loads(body.decode(encoding))
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,174 @@
+"""
+On-demand statistical profiling of live requests.
+
+When a request carries a valid signed ``X-Profile`` token (see the
+``profile_token`` command), or is picked by ``PROFILING_SAMPLE_RATE``, a
+background thread samples the request thread's stack every
+``PROFILING_INTERVAL`` seconds while the view runs. Samples are stored in the
+collapsed-stack format understood by flamegraph.pl and speedscope, keyed by a
+request id returned in the ``X-Profile-Id`` header. Requests that are not
+profiled only pay for one header lookup.
+"""
+from collections import Counter
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'news.profiling'
+REQUEST_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def make_token() -> str:
+    """Signed token that enables profiling for requests sending it in ``X-Profile``"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def token_is_valid(token: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+        return True
+    except signing.BadSignature:
+        return False
+
+
+class SamplingProfiler:
+    """Samples one thread's call stack at a fixed interval from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            # Collapsed stacks are listed root first
+            self.samples[';'.join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Profiles on disk, keeping only the newest ``PROFILING_MAX_STORED``"""
+
+    def __init__(self, directory=None, max_stored: Optional[int] = None):
+        self.directory = os.fspath(directory or settings.PROFILING_STORAGE_DIR)
+        self.max_stored = max_stored if max_stored is not None else settings.PROFILING_MAX_STORED
+
+    def _path(self, request_id: str, extension: str) -> str:
+        if not REQUEST_ID_PATTERN.match(request_id):
+            raise ValueError(f"Invalid profile id: {request_id}")
+        return os.path.join(self.directory, f"{request_id}.{extension}")
+
+    def save(self, request_id: str, samples: Counter, meta: Dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(request_id, 'folded'), 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(self._path(request_id, 'json'), 'w') as f:
+            json.dump(dict(meta, request_id=request_id), f)
+        self._enforce_retention()
+
+    def list(self) -> List[Dict]:
+        """Metadata of stored profiles, newest first"""
+        profiles = []
+        for path in self._meta_paths():
+            try:
+                with open(path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def folded_path(self, request_id: str) -> Optional[str]:
+        path = self._path(request_id, 'folded')
+        return path if os.path.exists(path) else None
+
+    def _meta_paths(self) -> List[str]:
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+        except FileNotFoundError:
+            return []
+        paths = [os.path.join(self.directory, name) for name in names]
+        return sorted(paths, key=lambda path: os.stat(path).st_mtime_ns, reverse=True)
+
+    def _enforce_retention(self):
+        for path in self._meta_paths()[self.max_stored:]:
+            request_id = os.path.basename(path)[:-len('.json')]
+            for extension in ('json', 'folded'):
+                try:
+                    os.remove(self._path(request_id, extension))
+                except (FileNotFoundError, ValueError):
+                    pass
+
+
+class SamplingProfilerMiddleware:
+    """Profile requests that ask for it with a signed token, or a random sample of all requests"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.META.get('HTTP_X_PROFILE')
+        if token is None:
+            sample_rate = settings.PROFILING_SAMPLE_RATE
+            if not sample_rate or random.random() >= sample_rate:
+                return self.get_response(request)
+            trigger = 'sample'
+        elif token_is_valid(token):
+            trigger = 'token'
+        else:
+            return self.get_response(request)
+
+        request_id = uuid.uuid4().hex
+        profiler = SamplingProfiler(threading.get_ident(), settings.PROFILING_INTERVAL)
+        started_at = timezone.now()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            samples = profiler.stop()
+            duration_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            ProfileStore().save(request_id, samples, {
+                'path': request.path,
+                'method': request.method,
+                'status': response.status_code,
+                'trigger': trigger,
+                'started_at': started_at.isoformat(),
+                'duration_ms': round(duration_ms, 2),
+                'samples': sum(samples.values()),
+            })
+            response['X-Profile-Id'] = request_id
+        except Exception as e:
+            logger.error(f"Error storing profile {request_id}: {str(e)}")
+        return response
@@ -0,0 +1,103 @@
+"""
+"Readers also viewed" neighbors from item-item co-occurrence.
+
+``build_related_articles`` runs offline (``manage.py build_related_articles``):
+it turns the recent interactions into a sparse binary visitor x article matrix
+X, computes the co-occurrence counts C = X^T X in one sparse product and
+scales them to cosine similarity C_ij / sqrt(C_ii * C_jj). Each article's
+``TOP_K`` most similar articles that share at least ``MIN_COOCCURRENCE``
+visitors replace the ``RelatedArticle`` table. Serving only reads that table.
+
+Dislikes are not counted as views. Visitors are users, or anonymous session
+ids when there is no user.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+import logging
+import numpy as np
+
+from .models import RelatedArticle, UserInteraction
+
+logger = logging.getLogger(__name__)
+
+
+def interaction_matrix(since):
+    """Binary CSR visitor x article matrix of the interactions since ``since``, and its article ids"""
+    rows = (
+        UserInteraction.objects.filter(timestamp__gte=since)
+        .exclude(interaction_type='dislike')
+        .order_by()
+        .values_list('user_id', 'session_id', 'article_id')
+        .distinct()
+    )
+    visitors, articles = {}, {}
+    row_indices, col_indices = [], []
+    for user_id, session_id, article_id in rows.iterator():
+        visitor = ('user', user_id) if user_id is not None else ('session', session_id)
+        row_indices.append(visitors.setdefault(visitor, len(visitors)))
+        col_indices.append(articles.setdefault(article_id, len(articles)))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(row_indices), dtype=np.float32), (row_indices, col_indices)),
+        shape=(len(visitors), len(articles)),
+    )
+    # A visitor may reach the same article as a user and as a session; count it once
+    matrix.data[:] = 1
+    return matrix, np.array(list(articles), dtype=np.int64)
+
+
+def top_neighbors(matrix, top_k: int, min_cooccurrence: int):
+    """
+    Yield (article index, neighbor index, cosine similarity, rank) for each
+    article's ``top_k`` most similar articles
+    """
+    cooccurrence = (matrix.T @ matrix).tocsr()
+    views = cooccurrence.diagonal()
+    cooccurrence.setdiag(0)
+    cooccurrence.data[cooccurrence.data < min_cooccurrence] = 0
+    cooccurrence.eliminate_zeros()
+
+    norms = np.sqrt(views)
+    for i in range(cooccurrence.shape[0]):
+        start, end = cooccurrence.indptr[i], cooccurrence.indptr[i + 1]
+        if start == end:
+            continue
+        neighbors = cooccurrence.indices[start:end]
+        similarity = cooccurrence.data[start:end] / (norms[i] * norms[neighbors])
+        if len(neighbors) > top_k:
+            best = np.argpartition(-similarity, top_k - 1)[:top_k]
+            neighbors, similarity = neighbors[best], similarity[best]
+        # Highest similarity first, then the lower index for stable ranks
+        order = np.lexsort((neighbors, -similarity))
+        for rank, j in enumerate(order, 1):
+            yield i, neighbors[j], float(similarity[j]), rank
+
+
+def build_related_articles(top_k: int = None, window_days: int = None, min_cooccurrence: int = None) -> int:
+    """Rebuild the ``RelatedArticle`` table; returns the number of rows written"""
+    config = settings.RELATED_ARTICLES
+    top_k = top_k or config['TOP_K']
+    window_days = window_days or config['WINDOW_DAYS']
+    min_cooccurrence = min_cooccurrence or config['MIN_COOCCURRENCE']
+
+    matrix, article_ids = interaction_matrix(timezone.now() - timedelta(days=window_days))
+    related = [
+        RelatedArticle(
+            article_id=int(article_ids[i]),
+            related_id=int(article_ids[j]),
+            rank=rank,
+            score=round(score, 6),
+        )
+        for i, j, score, rank in top_neighbors(matrix, top_k, min_cooccurrence)
+    ]
+
+    with transaction.atomic():
+        RelatedArticle.objects.all().delete()
+        RelatedArticle.objects.bulk_create(related, batch_size=1000)
+    logger.info(
+        f"Built {len(related)} related-article rows from {matrix.shape[0]} visitors and {matrix.shape[1]} articles"
+    )
+    return len(related)
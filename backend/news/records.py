@@ -0,0 +1,104 @@
+"""
+Compact in-memory article records.
+
+Formatted articles used to be dicts with ten keys each: a hash table per
+article, plus a separate copy of every repeated source, category and country
+string. ``ArticleRecord`` stores the same fields in ``__slots__`` and interns
+those three strings, so a page of articles shares one copy of "BBC" or "us".
+
+Records are read-only ``Mapping``s, so code written against the formatted
+dicts (``article.get('source')``, ``article['url']``, DRF serializers) keeps
+working. They pickle as the class and a tuple of values; interned strings are
+written to a pickle only once. ``FastJSONRenderer`` encodes them through
+``as_dict`` instead of DRF's generic Mapping fallback.
+
+``image_proxy`` is the signed ``/api/img/`` path of ``image`` (see
+``news.images.proxy_url``), set by ``format_article_data``.
+"""
+from collections.abc import Mapping
+from sys import intern
+from typing import Any, Dict, Iterator
+
+FIELDS = (
+    'title', 'description', 'url', 'image', 'published_at', 'source',
+    'category', 'country', 'bias_score', 'reliability_score', 'image_proxy',
+)
+INTERNED_FIELDS = ('source', 'category', 'country')
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _intern(value):
+    return intern(value) if type(value) is str else value
+
+
+class ArticleRecord(Mapping):
+    """One formatted article; a read-only mapping of ``FIELDS``"""
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        title=None,
+        description=None,
+        url=None,
+        image=None,
+        published_at=None,
+        source=None,
+        category=None,
+        country=None,
+        bias_score=None,
+        reliability_score=None,
+        image_proxy=None
+    ):
+        self.title = title
+        self.description = description
+        self.url = url
+        self.image = image
+        self.published_at = published_at
+        self.source = _intern(source)
+        self.category = _intern(category)
+        self.country = _intern(country)
+        self.bias_score = bias_score
+        self.reliability_score = reliability_score
+        self.image_proxy = image_proxy
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> 'ArticleRecord':
+        """Record of the ``FIELDS`` in ``data``; other keys are dropped"""
+        return cls(**{field: data.get(field) for field in FIELDS})
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __contains__(self, key) -> bool:
+        return key in _FIELD_SET
+
+    def get(self, key: str, default=None) -> Any:
+        if key not in _FIELD_SET:
+            return default
+        return getattr(self, key)
+
+    def values_tuple(self) -> tuple:
+        return (
+            self.title, self.description, self.url, self.image, self.published_at, self.source,
+            self.category, self.country, self.bias_score, self.reliability_score, self.image_proxy,
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(FIELDS, self.values_tuple()))
+
+    def __reduce__(self):
+        return (ArticleRecord, (
+            self.title, self.description, self.url, self.image, self.published_at, self.source,
+            self.category, self.country, self.bias_score, self.reliability_score, self.image_proxy,
+        ))
+
+    def __repr__(self) -> str:
+        return f"ArticleRecord({self.as_dict()!r})"
@@ -0,0 +1,69 @@
+"""
+orjson-backed drop-in replacement for DRF's JSONRenderer.
+
+The output is byte-identical to ``rest_framework.renderers.JSONRenderer`` for
+the payloads this API produces. Anything orjson cannot encode the same way is
+handed back to the stock renderer:
+
+- indented output (``Accept: application/json; indent=4``, browsable API)
+- non-compact, ASCII-only or non-strict ``REST_FRAMEWORK`` settings
+- values orjson rejects (non-string dict keys, integers over 64 bits,
+  lone surrogates)
+
+Datetimes are encoded natively with ``Z`` for UTC, matching DRF's encoder;
+other types orjson does not know (``Decimal``, lazy strings, querysets) go
+through DRF's encoder as ``default``. Known differences: floats that ``repr``
+writes in exponent form (``abs(x) < 1e-4`` or ``>= 1e16``) are written as
+``0.00001`` / ``1e16``, NaN/Infinity become ``null`` instead of raising, and
+UTC offsets with a seconds component are rounded to the minute. Article
+payloads never contain such values.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from .records import ArticleRecord
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when the output would be identical"""
+
+    @staticmethod
+    def _default_for(encoder):
+        def default(obj):
+            # Feed articles; skips the encoder's generic Mapping fallback
+            if type(obj) is ArticleRecord:
+                return obj.as_dict()
+            return encoder.default(obj)
+        return default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self._default_for(self.encoder_class()),
+                option=orjson.OPT_UTC_Z
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Match JSONRenderer, which escapes \u2028 and \u2029 so the output is
+        # a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,322 @@
+"""
+Set-based re-scoring of stored articles when bias ratings change.
+
+Articles copy ``bias_score`` and ``reliability_score`` from their bias source
+when they are ingested. When a source's rating or reliability changes, a
+``RescoreJob`` brings its stored articles up to date:
+
+1. Link: articles with no ``bias_source`` yet (stored before the source or
+   one of its aliases existed) are linked by resolving each distinct source
+   name once, then one UPDATE per matching source.
+2. Re-score: articles of the job's sources are updated in id ranges of
+   ``RESCORING['CHUNK_SIZE']``, one ``UPDATE ... SET bias_score = (SELECT ...)``
+   per range, correlated on ``bias_source_id``. After each range the job's
+   cursor is saved in the same transaction, so an interrupted job resumes
+   where it stopped and re-running a range is harmless.
+3. Cached feeds tagged with the job's sources are invalidated, and the ranking
+   snapshot, the sources' analytics rollups and the country summaries are
+   rebuilt.
+
+Jobs are created by the ``BiasSource`` save signal and the catalog loader and
+run after commit on a background thread (``RESCORING['IN_BACKGROUND']``), or
+by ``manage.py rescore_articles``. Bulk seeding wraps its writes in
+``batched_rescoring`` to get one job and no runner racing the writes.
+
+A job that hits a locked database (e.g. SQLite while another connection
+writes) goes back to ``pending`` with its cursor kept; other errors mark it
+``failed``. The runner retries both with exponential backoff between
+``RESCORING['RETRY_DELAY']`` and ``MAX_RETRY_DELAY`` seconds, and gives up on
+a job after ``MAX_ATTEMPTS`` failures (lock contention doesn't count), leaving
+it for ``rescore_articles``.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import Case, FloatField, Max, OuterRef, Subquery, Value, When
+from django.utils import timezone
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+import threading
+
+from .models import Article, BiasSource, RescoreJob
+from .services import BIAS_SCORES
+from .sources import get_resolver
+from .tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED = ('pending', 'running', 'failed')
+# Messages of OperationalErrors raised while another connection holds a lock
+LOCK_ERRORS = ('locked', 'lock timeout', 'could not obtain lock', 'deadlock detected')
+
+_runner = None
+_runner_lock = threading.Lock()
+_wakeup = threading.Event()
+_batch = threading.local()
+
+
+def source_tag(source_id: int) -> str:
+    """Cache tag for entries containing articles of a bias source"""
+    return f"bias_source_{source_id}"
+
+
+def feed_tags(articles: Iterable[Dict]) -> Set[str]:
+    """Cache tags for the bias sources of a page of formatted articles"""
+    resolver = get_resolver()
+    tags = set()
+    for article in articles:
+        bias_source = resolver.resolve(article.get('source'))
+        if bias_source is not None:
+            tags.add(source_tag(bias_source.id))
+    return tags
+
+
+def bias_score_expression():
+    """SQL expression mapping a BiasSource's ``bias_rating`` to its score"""
+    return Case(
+        *[When(bias_rating=rating, then=Value(score)) for rating, score in BIAS_SCORES.items()],
+        default=Value(None),
+        output_field=FloatField(),
+    )
+
+
+def is_lock_contention(error: Exception) -> bool:
+    """Whether ``error`` means the database was busy rather than that the job is broken"""
+    return isinstance(error, OperationalError) and any(message in str(error).lower() for message in LOCK_ERRORS)
+
+
+def enqueue_rescore(source_ids: Iterable[int]) -> Optional[RescoreJob]:
+    """
+    Create a job for ``source_ids`` and start it once the current transaction commits
+
+    Inside ``batched_rescoring`` the ids are only collected, and None is returned.
+    """
+    batch = getattr(_batch, 'current', None)
+    if batch is not None:
+        batch.source_ids.update(source_ids)
+        return None
+    job = RescoreJob.objects.create(source_ids=sorted(set(source_ids)))
+    if settings.RESCORING['IN_BACKGROUND']:
+        transaction.on_commit(start_background_runner)
+    return job
+
+
+class RescoreBatch:
+    """Source ids enqueued inside ``batched_rescoring``; ``job`` is their combined job after it exits"""
+
+    def __init__(self):
+        self.source_ids: Set[int] = set()
+        self.job: Optional[RescoreJob] = None
+
+
+@contextmanager
+def batched_rescoring():
+    """
+    Collect the jobs enqueued in this thread inside the block into one job
+
+    The job is created when the block exits but not started; the caller runs
+    it (``run_job``) or leaves it to ``rescore_articles``.
+    """
+    batch = RescoreBatch()
+    _batch.current = batch
+    try:
+        yield batch
+    finally:
+        _batch.current = None
+    if batch.source_ids:
+        batch.job = RescoreJob.objects.create(source_ids=sorted(batch.source_ids))
+
+
+def link_articles(source_ids: Iterable[int]) -> int:
+    """Link unlinked articles whose source name resolves to one of ``source_ids``"""
+    wanted = set(source_ids)
+    resolver = get_resolver()
+    names = (
+        Article.objects.filter(bias_source__isnull=True)
+        .exclude(source='')
+        .order_by()
+        .values_list('source', flat=True)
+        .distinct()
+    )
+    names_by_source = defaultdict(list)
+    for name in names:
+        bias_source = resolver.resolve(name)
+        if bias_source is not None and bias_source.id in wanted:
+            names_by_source[bias_source.id].append(name)
+
+    linked = 0
+    for source_id, source_names in names_by_source.items():
+        linked += Article.objects.filter(bias_source__isnull=True, source__in=source_names).update(
+            bias_source_id=source_id
+        )
+    return linked
+
+
+def _next_upper_bound(pending, chunk_size: int):
+    """Highest id of the next ``chunk_size`` pending articles, or None when there are none"""
+    bound = list(pending[chunk_size - 1:chunk_size])
+    if bound:
+        return bound[0]
+    return pending.aggregate(upper=Max('id'))['upper']
+
+
+def run_job(job: RescoreJob, chunk_size: int = None) -> RescoreJob:
+    """
+    Run (or resume) a job; failures are recorded on the job rather than raised
+
+    On lock contention the job is left ``pending`` to be retried.
+    """
+    chunk_size = chunk_size or settings.RESCORING['CHUNK_SIZE']
+    try:
+        job.status = 'running'
+        job.error = None
+        job.save(update_fields=['status', 'error'])
+
+        if not job.linked:
+            linked = link_articles(job.source_ids)
+            job.linked = True
+            job.save(update_fields=['linked'])
+            logger.info(f"Rescore job {job.id}: linked {linked} articles")
+
+        source = BiasSource.objects.filter(pk=OuterRef('bias_source_id'))
+        scores = {
+            'bias_score': Subquery(source.annotate(score=bias_score_expression()).values('score')[:1]),
+            'reliability_score': Subquery(source.values('reliability_score')[:1]),
+        }
+        articles = Article.objects.filter(bias_source_id__in=job.source_ids)
+        while True:
+            pending = articles.filter(id__gt=job.cursor).order_by('id').values_list('id', flat=True)
+            upper = _next_upper_bound(pending, chunk_size)
+            if upper is None:
+                break
+            with transaction.atomic():
+                updated = articles.filter(id__gt=job.cursor, id__lte=upper).update(**scores)
+                job.cursor = upper
+                job.updated_count += updated
+                job.save(update_fields=['cursor', 'updated_count'])
+
+        _refresh_after_rescore(job, articles)
+
+        job.status = 'done'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at'])
+    except Exception as e:
+        # Progress up to the last saved chunk is kept either way
+        if is_lock_contention(e):
+            logger.warning(f"Rescore job {job.id} deferred, the database is busy: {str(e)}")
+            _record_outcome(job, 'pending', None)
+        else:
+            logger.error(f"Rescore job {job.id} failed: {str(e)}")
+            _record_outcome(job, 'failed', str(e))
+        return job
+
+    logger.info(
+        f"Rescore job {job.id}: updated {job.updated_count} articles, "
+        f"invalidated the cached feeds of {len(job.source_ids)} sources"
+    )
+    return job
+
+
+def _record_outcome(job: RescoreJob, status: str, error: Optional[str]) -> None:
+    job.status = status
+    job.error = error
+    try:
+        job.save(update_fields=['status', 'error'])
+    except Exception as e:
+        # Still stored as running, which is retried like pending
+        logger.warning(f"Could not record status of rescore job {job.id}: {str(e)}")
+
+
+def _refresh_after_rescore(job: RescoreJob, articles) -> None:
+    tiered_cache.invalidate_tags([source_tag(source_id) for source_id in job.source_ids])
+    try:
+        from .snapshot import rebuild_snapshot
+        rebuild_snapshot()
+    except Exception as e:
+        logger.error(f"Error rebuilding article snapshot after rescore: {str(e)}")
+    try:
+        from .analytics import rebuild_rollups
+        rebuild_rollups(sources=articles.order_by().values_list('source', flat=True).distinct())
+    except Exception as e:
+        logger.error(f"Error rebuilding bias rollups after rescore: {str(e)}")
+    try:
+        from .country_summary import refresh_summaries
+        refresh_summaries()
+    except Exception as e:
+        logger.error(f"Error refreshing country summaries after rescore: {str(e)}")
+
+
+def run_pending_jobs(chunk_size: int = None) -> List[RescoreJob]:
+    """
+    Run every unfinished job, oldest first
+
+    ``running`` jobs are included: a job only stays running when its worker
+    died, and re-running a range is harmless.
+    """
+    return [run_job(job, chunk_size) for job in RescoreJob.objects.filter(status__in=UNFINISHED)]
+
+
+def _retry_delay(attempt: int) -> float:
+    config = settings.RESCORING
+    return min(config['RETRY_DELAY'] * 2 ** attempt, config['MAX_RETRY_DELAY'])
+
+
+def _run_retryable_jobs(failures: Counter) -> bool:
+    """Run unfinished jobs that haven't used up their attempts; returns whether any is left to retry"""
+    max_attempts = settings.RESCORING['MAX_ATTEMPTS']
+    exhausted = [job_id for job_id, count in failures.items() if count >= max_attempts]
+    retry = False
+    for job in RescoreJob.objects.filter(status__in=UNFINISHED).exclude(id__in=exhausted):
+        run_job(job)
+        if job.status == 'failed':
+            failures[job.id] += 1
+            if failures[job.id] >= max_attempts:
+                logger.error(f"Rescore job {job.id} failed {failures[job.id]} times; run rescore_articles to retry")
+                continue
+        if job.status != 'done':
+            retry = True
+    return retry
+
+
+def _run_in_background() -> None:
+    global _runner
+    failures = Counter()
+    attempt = 0
+    retry = False
+    try:
+        while True:
+            if retry:
+                # New jobs wake the runner early
+                _wakeup.wait(_retry_delay(attempt))
+                attempt += 1
+            with _runner_lock:
+                if not _wakeup.is_set() and not retry:
+                    _runner = None
+                    return
+                _wakeup.clear()
+            try:
+                retry = _run_retryable_jobs(failures)
+            except Exception as e:
+                # Even listing the jobs can find the database locked
+                if not is_lock_contention(e):
+                    logger.error(f"Error running rescore jobs: {str(e)}")
+                retry = True
+            if not retry:
+                attempt = 0
+    except Exception as e:
+        logger.error(f"Background rescoring stopped: {str(e)}")
+        with _runner_lock:
+            _runner = None
+    finally:
+        connection.close()
+
+
+def start_background_runner() -> None:
+    """Run pending jobs on this process's background thread, starting it if needed"""
+    global _runner
+    with _runner_lock:
+        _wakeup.set()
+        if _runner is None:
+            _runner = threading.Thread(target=_run_in_background, name='rescore-runner', daemon=True)
+            _runner.start()
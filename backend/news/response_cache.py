@@ -0,0 +1,123 @@
+"""
+Pre-rendered, pre-compressed response payloads.
+
+Feed views cache the final JSON bytes instead of Python dicts, together with
+gzip and brotli variants produced once when the entry is filled. A cache hit
+then only has to pick the variant the client accepts and copy the bytes out.
+"""
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+from typing import Dict, Optional
+import gzip
+import hashlib
+import json
+
+from .etags import etag_matches
+from .renderers import FastJSONRenderer, orjson
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+
+class CachedPayload:
+    """Encoded JSON body plus its compressed variants, keyed by content coding"""
+    __slots__ = ('etag', 'variants')
+
+    def __init__(self, etag: str, variants: Dict[str, bytes]):
+        self.etag = etag
+        self.variants = variants
+
+    def etag_for(self, encoding: str) -> str:
+        # Each content coding is a different representation, so it gets its own strong ETag
+        if encoding == 'identity':
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+def build_payload(data) -> CachedPayload:
+    """Render ``data`` to JSON once and precompute its compressed variants"""
+    body = FastJSONRenderer().render(data)
+    variants = {'identity': body}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        variants['gzip'] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if brotli is not None:
+            variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return CachedPayload(etag, variants)
+
+
+def payload_data(payload: CachedPayload):
+    """Decode a payload back into the data it was built from (datetimes come back as strings)"""
+    body = payload.variants['identity']
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def negotiate_encoding(request, payload: CachedPayload) -> str:
+    """Pick the best content coding the client accepts, preferring brotli over gzip"""
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if not accept_encoding:
+        return 'identity'
+
+    accepted = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    wildcard = accepted.get('*', 0.0)
+    for encoding in ('br', 'gzip'):
+        if encoding in payload.variants and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return 'identity'
+
+
+class PrerenderedResponse(Response):
+    """DRF response whose body was encoded ahead of time"""
+
+    def __init__(self, content: bytes, data=None, **kwargs):
+        super().__init__(data=data, **kwargs)
+        self.prerendered_content = content
+
+    @property
+    def rendered_content(self):
+        self['Content-Type'] = 'application/json'
+        return self.prerendered_content
+
+
+def payload_response(request, payload: CachedPayload, data=None, cache_control: Optional[str] = None) -> Response:
+    """
+    Serve a cached payload, answering 304 when the client already has it
+
+    ``data`` is only attached for callers (and tests) that want ``response.data``;
+    it is never re-rendered.
+    """
+    encoding = negotiate_encoding(request, payload)
+    etag = payload.etag_for(encoding)
+
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = PrerenderedResponse(payload.variants[encoding], data=data)
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    if len(payload.variants) > 1:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if cache_control:
+        response['Cache-Control'] = cache_control
+    return response
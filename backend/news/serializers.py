@@ -12,6 +12,7 @@ class ArticleSerializer(serializers.Serializer):
     country = serializers.CharField(max_length=2, allow_null=True, allow_blank=True)
     bias_score = serializers.FloatField(allow_null=True)
     reliability_score = serializers.FloatField(allow_null=True)
+    image_proxy = serializers.CharField(max_length=4000, allow_null=True, required=False)
     
     class Meta:
         model = Article
@@ -40,3 +41,12 @@ class BiasSourceSerializer(serializers.ModelSerializer):
         model = BiasSource
         fields = ['id', 'source_name', 'bias_rating', 'bias_rating_display', 'reliability_score', 'description']
         read_only_fields = ['id']
+
+class StoredArticleSerializer(serializers.ModelSerializer):
+    """Articles stored by ingest, with their id"""
+    class Meta:
+        model = Article
+        fields = [
+            'id', 'title', 'description', 'url', 'image', 'published_at', 'source',
+            'category', 'country', 'bias_score', 'reliability_score'
+        ]
@@ -1,15 +1,35 @@
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from django.conf import settings
-from django.db.models import Count, Q, F, Value
-from django.db.models.functions import Coalesce
-from typing import Dict, List, Optional, Union, Any
+from django.core.cache import cache
+from django.db.models import Count
+from typing import Dict, List, Optional, Tuple
 import logging
-import random
-from .models import Article, UserPreference, UserInteraction, BiasSource
+import time
+from .models import Article, UserPreference, UserInteraction, BiasSource, RelatedArticle
+from .images import proxy_url
+from .records import ArticleRecord
+from .sources import flush_unresolved, get_resolver, record_unresolved
+from . import trending
+
+try:
+    from .snapshot import MISSING, get_snapshot
+except ImportError:  # NumPy is optional; preferences are then counted in the database
+    get_snapshot = None
 
 logger = logging.getLogger(__name__)
 
+# Numerical bias score between -1 and 1 for each BiasSource.bias_rating
+BIAS_SCORES = {
+    'far_left': -1.0,
+    'left': -0.6,
+    'center_left': -0.3,
+    'center': 0.0,
+    'center_right': 0.3,
+    'right': 0.6,
+    'far_right': 1.0
+}
+
 class MediastackService:
     def __init__(self):
         self.api_key = settings.MEDIASTACK_API_KEY
@@ -65,9 +85,39 @@ class MediastackService:
             logger.error(f"Failed to fetch articles: {str(e)}")
             raise Exception(f"Failed to fetch articles: {str(e)}")
 
-    def format_article_data(self, article_data: Dict) -> Dict:
+    def get_bias_lookup(self, source_names: List[Optional[str]]) -> Dict[str, BiasSource]:
+        """
+        Resolve the bias sources for a batch of articles
+
+        Names are matched through the in-memory SourceResolver (normalized
+        name, aliases, then fuzzy match); names that don't resolve are queued
+        for review in UnresolvedSource.
+
+        Returns:
+            Dict mapping lower-cased source names to BiasSource objects, for
+            passing to format_article_data
+        """
+        resolver = get_resolver()
+        lookup = {}
+        unresolved = []
+        for name in {name for name in source_names if name}:
+            bias_source = resolver.resolve(name)
+            if bias_source is None:
+                unresolved.append(name)
+            else:
+                lookup[name.lower()] = bias_source
+        if unresolved:
+            record_unresolved(unresolved)
+        return lookup
+
+    def format_article_data(
+        self, article_data: Dict, bias_lookup: Optional[Dict[str, BiasSource]] = None
+    ) -> ArticleRecord:
         """
-        Format article data to match our Article model structure
+        Format article data to match our Article model structure, as a compact ArticleRecord
+
+        Pass ``bias_lookup`` from get_bias_lookup when formatting a batch, to
+        avoid one bias source query per article.
         """
         try:
             # Log raw article data for debugging
@@ -76,33 +126,39 @@ class MediastackService:
             # Extract country from API response
             country = article_data.get('country', '')
             
-            formatted_data = {
-                'title': article_data.get('title'),
-                'description': article_data.get('description'),
-                'url': article_data.get('url'),
-                'image': article_data.get('image'),
-                'published_at': datetime.strptime(
-                    article_data.get('published_at'), 
-                    '%Y-%m-%dT%H:%M:%S%z'
-                ) if article_data.get('published_at') else None,
-                'source': article_data.get('source'),
-                'category': article_data.get('category'),
-                'country': country.upper() if country else None,
-                'bias_score': None,  # Default to None
-                'reliability_score': None  # Default to None
-            }
-            
             # Add bias and reliability information if available
+            bias_score = None
+            reliability_score = None
             source_name = article_data.get('source')
             if source_name:
                 try:
-                    bias_source = BiasSource.objects.filter(source_name__iexact=source_name).first()
+                    if bias_lookup is not None:
+                        bias_source = bias_lookup.get(source_name.lower())
+                    else:
+                        bias_source = get_resolver().resolve(source_name)
                     if bias_source:
-                        formatted_data['bias_score'] = self._bias_rating_to_score(bias_source.bias_rating)
-                        formatted_data['reliability_score'] = bias_source.reliability_score
+                        bias_score = self._bias_rating_to_score(bias_source.bias_rating)
+                        reliability_score = bias_source.reliability_score
                 except Exception as e:
                     logger.error(f"Error fetching bias data for {source_name}: {str(e)}")
             
+            formatted_data = ArticleRecord(
+                title=article_data.get('title'),
+                description=article_data.get('description'),
+                url=article_data.get('url'),
+                image=article_data.get('image'),
+                published_at=datetime.strptime(
+                    article_data.get('published_at'), 
+                    '%Y-%m-%dT%H:%M:%S%z'
+                ) if article_data.get('published_at') else None,
+                source=source_name,
+                category=article_data.get('category'),
+                country=country.upper() if country else None,
+                bias_score=bias_score,
+                reliability_score=reliability_score,
+                image_proxy=proxy_url(article_data['image']) if article_data.get('image') else None
+            )
+            
             logger.info(f"Formatted article data: {formatted_data}")
             return formatted_data
         except Exception as e:
@@ -114,29 +170,136 @@ class MediastackService:
         """Convert bias rating string to numerical score between -1 and 1"""
         if not bias_rating:
             return None
-            
-        bias_scores = {
-            'far_left': -1.0,
-            'left': -0.6,
-            'center_left': -0.3,
-            'center': 0.0,
-            'center_right': 0.3,
-            'right': 0.6,
-            'far_right': 1.0
-        }
         
-        return bias_scores.get(bias_rating)
+        return BIAS_SCORES.get(bias_rating)
+
+
+class ArticleIngestService:
+    """Store the latest Mediastack articles so background jobs can work on them"""
+
+    def __init__(self):
+        self.mediastack_service = MediastackService()
+
+    def ingest(
+        self,
+        categories: Optional[List[str]] = None,
+        countries: Optional[List[str]] = None,
+        limit: int = 100
+    ) -> List[Article]:
+        """
+        Fetch one page of the newest articles and store the ones we have not seen yet
+
+        Articles are de-duplicated by URL. Sends ``articles_ingested`` with the
+        newly created rows so downstream jobs can refresh themselves.
+        """
+        from .signals import articles_ingested
+
+        response_data = self.mediastack_service.get_articles(
+            categories=categories,
+            countries=countries,
+            limit=limit
+        )
+
+        articles_data = response_data.get('data', [])
+        bias_lookup = self.mediastack_service.get_bias_lookup([a.get('source') for a in articles_data])
+
+        candidates = []
+        for article_data in articles_data:
+            formatted_article = self.mediastack_service.format_article_data(article_data, bias_lookup=bias_lookup)
+            if not formatted_article.get('url') or not formatted_article.get('title'):
+                continue
+            if not formatted_article.get('published_at'):
+                continue
+            candidates.append(formatted_article)
+
+        existing_urls = set(
+            Article.objects.filter(url__in=[a['url'] for a in candidates]).values_list('url', flat=True)
+        )
+
+        new_articles = []
+        for formatted_article in candidates:
+            if formatted_article['url'] in existing_urls:
+                continue
+            existing_urls.add(formatted_article['url'])
+            new_articles.append(Article(
+                title=formatted_article['title'][:500],
+                description=formatted_article.get('description'),
+                url=formatted_article['url'],
+                image=formatted_article.get('image'),
+                published_at=formatted_article['published_at'],
+                source=formatted_article.get('source') or '',
+                category=formatted_article.get('category'),
+                country=formatted_article.get('country'),
+                bias_score=formatted_article.get('bias_score'),
+                reliability_score=formatted_article.get('reliability_score'),
+                bias_source=bias_lookup.get((formatted_article.get('source') or '').lower())
+            ))
+
+        created = Article.objects.bulk_create(new_articles)
+        logger.info(f"Ingested {len(created)} new articles ({len(candidates) - len(created)} already stored)")
+
+        if created:
+            articles_ingested.send(sender=self.__class__, articles=created)
+
+        # Ingest runs in the background, so write the source review queue right away
+        flush_unresolved()
+
+        return created
 
 
 class UserPreferenceService:
     def __init__(self):
         self.mediastack_service = MediastackService()
     
+    @staticmethod
+    def preference_cache_key(user_id=None, session_id=None) -> str:
+        return f"preference_user_{user_id}" if user_id else f"preference_session_{session_id}"
+
+    def invalidate_preference(self, preference: UserPreference) -> None:
+        """Drop the cached copy of a preference after it changed"""
+        cache.delete(self.preference_cache_key(preference.user_id, preference.session_id))
+
+    @staticmethod
+    def _feed_generation_key(user_id=None, session_id=None) -> str:
+        return f"feed_generation_user_{user_id}" if user_id else f"feed_generation_session_{session_id}"
+
+    def feed_generation(self, user_id=None, session_id=None) -> int:
+        """
+        Current generation of a visitor's personalized feed, embedded in its cache keys
+
+        Generations start at the current time in nanoseconds, so a counter lost to
+        cache eviction or expiry restarts above every value it had before and can
+        never make old feed entries reachable again. That lets the keys expire
+        with the feeds they name instead of piling up once per visitor.
+        """
+        key = self._feed_generation_key(user_id, session_id)
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, time.time_ns(), timeout=settings.PERSONALIZED_CACHE_TIMEOUT)
+            generation = cache.get(key)
+        return generation
+
+    def bump_feed_generation(self, user_id=None, session_id=None) -> None:
+        """Make every cached personalized feed of a visitor unreachable"""
+        # A fresh value rather than incr(): two concurrent bumps on a backend whose
+        # incr is a get and a set (the file cache) could otherwise both write g + 1
+        cache.set(
+            self._feed_generation_key(user_id, session_id), time.time_ns(),
+            timeout=settings.PERSONALIZED_CACHE_TIMEOUT
+        )
+
     def get_or_create_preference(self, user=None, session_id=None) -> UserPreference:
-        """Get or create a user preference object"""
+        """Get or create a user preference object (read-through cached)"""
         if not user and not session_id:
             raise ValueError("Either user or session_id must be provided")
         
+        cache_key = self.preference_cache_key(user.pk if user else None, session_id)
+        preference = cache.get(cache_key)
+        if preference is not None:
+            return preference
+
+        # get_or_create retries the lookup if a concurrent request inserted the row
+        # first, which the unique user/session_id constraints guarantee it will find
         if user:
             preference, created = UserPreference.objects.get_or_create(user=user)
         else:
@@ -145,6 +308,7 @@ class UserPreferenceService:
         if created:
             logger.info(f"Created new preference for {'user ' + user.username if user else 'session ' + session_id}")
         
+        cache.set(cache_key, preference, timeout=settings.PREFERENCE_CACHE_TIMEOUT)
         return preference
     
     def update_preference(self, preference_id: int, data: Dict) -> UserPreference:
@@ -165,6 +329,8 @@ class UserPreferenceService:
                 preference.preferred_countries = data['preferred_countries']
             
             preference.save()
+            self.invalidate_preference(preference)
+            self.bump_feed_generation(preference.user_id, preference.session_id)
             return preference
         except UserPreference.DoesNotExist:
             logger.error(f"User preference with id {preference_id} not found")
@@ -192,6 +358,8 @@ class UserPreferenceService:
                 interaction.session_id = session_id
             
             interaction.save()
+            self.bump_feed_generation(interaction.user_id, interaction.session_id)
+            trending.engine.record(article.id, interaction_type)
             return interaction
         except Article.DoesNotExist:
             logger.error(f"Article with id {article_id} not found")
@@ -228,13 +396,16 @@ class UserPreferenceService:
             )
             
             # Format and filter articles
-            articles = []
-            for article_data in response_data.get('data', []):
+            articles_data = [
+                article_data for article_data in response_data.get('data', [])
                 # Skip excluded sources
-                if article_data.get('source') in preference.excluded_sources:
-                    continue
-                    
-                formatted_article = self.mediastack_service.format_article_data(article_data)
+                if article_data.get('source') not in preference.excluded_sources
+            ]
+            bias_lookup = self.mediastack_service.get_bias_lookup([a.get('source') for a in articles_data])
+
+            articles = []
+            for article_data in articles_data:
+                formatted_article = self.mediastack_service.format_article_data(article_data, bias_lookup=bias_lookup)
                 articles.append(formatted_article)
             
             # Sort articles based on user interactions if available
@@ -271,8 +442,8 @@ class UserPreferenceService:
                 return articles
                 
             # Calculate user preferences based on interactions
-            liked_categories = self._get_preferred_categories(interactions)
-            liked_sources = self._get_preferred_sources(interactions)
+            liked_categories, liked_sources = self._get_interaction_preferences(interactions)
+            related_urls = self._get_related_urls(interactions)
             
             # Score articles based on user preferences
             scored_articles = []
@@ -286,6 +457,10 @@ class UserPreferenceService:
                 # Boost score for preferred sources
                 if article.get('source') in liked_sources:
                     score += 1
+                
+                # Boost score for articles read by readers of the same articles
+                if article.get('url') in related_urls:
+                    score += settings.RELATED_ARTICLES['PERSONALIZATION_BOOST']
                     
                 scored_articles.append((score, article))
             
@@ -298,26 +473,45 @@ class UserPreferenceService:
             logger.error(f"Error personalizing article order: {str(e)}")
             return articles
     
+    def _get_interaction_preferences(self, interactions) -> Tuple[List[str], List[str]]:
+        """Preferred categories and sources, from the article snapshot when it covers every interaction"""
+        snapshot = get_snapshot() if get_snapshot is not None else None
+        if snapshot is not None:
+            rows = snapshot.rows_for(list(interactions.values_list('article_id', flat=True)))
+            if (rows != MISSING).all():
+                return snapshot.frequent('category', rows, min_count=2), snapshot.frequent('source', rows, min_count=2)
+        # Some articles are older than the snapshot window
+        return self._get_preferred_categories(interactions), self._get_preferred_sources(interactions)
+    
     def _get_preferred_categories(self, interactions) -> List[str]:
         """Get preferred categories based on user interactions"""
-        # Count interactions by category
-        category_counts = {}
-        for interaction in interactions:
-            category = interaction.article.category
-            if category:
-                category_counts[category] = category_counts.get(category, 0) + 1
-        
-        # Get top categories (more than 1 interaction)
-        return [category for category, count in category_counts.items() if count > 1]
+        # Count interactions by category in the database and keep the
+        # top categories (more than 1 interaction)
+        category_counts = (
+            interactions.exclude(article__category__isnull=True)
+            .exclude(article__category='')
+            .values('article__category')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+        )
+        return [row['article__category'] for row in category_counts]
+    
+    def _get_related_urls(self, interactions) -> set:
+        """URLs of the "readers also viewed" neighbors of the articles interacted with"""
+        # Feed articles come from Mediastack without ids, so match them by URL
+        return set(
+            RelatedArticle.objects.filter(article__in=interactions.exclude(interaction_type='dislike').values('article'))
+            .values_list('related__url', flat=True)
+        )
     
     def _get_preferred_sources(self, interactions) -> List[str]:
         """Get preferred sources based on user interactions"""
-        # Count interactions by source
-        source_counts = {}
-        for interaction in interactions:
-            source = interaction.article.source
-            if source:
-                source_counts[source] = source_counts.get(source, 0) + 1
-        
-        # Get top sources (more than 1 interaction)
-        return [source for source, count in source_counts.items() if count > 1]
+        # Count interactions by source in the database and keep the
+        # top sources (more than 1 interaction)
+        source_counts = (
+            interactions.exclude(article__source='')
+            .values('article__source')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+        )
+        return [row['article__source'] for row in source_counts]
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from .models import BiasSource, SourceAlias, UnresolvedSource
+from .sources import invalidate_resolver
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sent by ArticleIngestService after a batch of new articles has been stored.
+# Receivers get ``articles``: the list of newly created Article instances.
+articles_ingested = Signal()
+
+
+@receiver(articles_ingested)
+def publish_article_stream(sender, articles, **kwargs):
+    """Push each ingest cycle's articles to this process's stream subscribers right away"""
+    try:
+        from .streaming import broker
+        # Scan from the watermark rather than publish the batch: jumping the watermark to the
+        # batch's highest id would skip lower ids stored by other processes and not yet polled
+        broker.poll()
+    except Exception as e:
+        logger.error(f"Error publishing articles to stream subscribers: {str(e)}")
+
+
+@receiver(articles_ingested)
+def rebuild_article_snapshot(sender, articles, **kwargs):
+    """Swap in a fresh ranking snapshot after each ingest cycle"""
+    try:
+        from .snapshot import rebuild_snapshot
+        rebuild_snapshot()
+    except ImportError as e:
+        logger.warning(f"Skipping article snapshot rebuild: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error rebuilding article snapshot: {str(e)}")
+
+
+@receiver(articles_ingested)
+def update_bias_rollups(sender, articles, **kwargs):
+    """Add each ingest cycle's articles to the analytics rollups"""
+    try:
+        from .analytics import add_articles
+        add_articles(articles)
+    except Exception as e:
+        logger.error(f"Error updating bias rollups: {str(e)}")
+
+
+@receiver(articles_ingested)
+def refresh_country_summaries(sender, articles, **kwargs):
+    """Recompute the news map's per-country summaries after each ingest cycle"""
+    try:
+        from .country_summary import refresh_summaries
+        refresh_summaries()
+    except Exception as e:
+        logger.error(f"Error refreshing country summaries: {str(e)}")
+
+
+@receiver(articles_ingested)
+def warm_article_cache(sender, articles, **kwargs):
+    """Precompute the first page of popular article queries after each ingest cycle"""
+    if not settings.CACHE_WARMING['ON_INGEST']:
+        return
+    try:
+        from .warming import warm_cache
+        warm_cache()
+    except Exception as e:
+        logger.error(f"Error warming article cache: {str(e)}")
+
+
+@receiver([post_save, post_delete], sender=BiasSource)
+@receiver([post_save, post_delete], sender=SourceAlias)
+def reload_source_resolver(sender, instance, **kwargs):
+    """Pick up bias catalog edits and drop review queue entries they now resolve"""
+    invalidate_resolver()
+    if kwargs.get('created'):
+        key = instance.alias_key if sender is SourceAlias else instance.normalized_key
+        UnresolvedSource.objects.filter(normalized_key=key).delete()
+
+
+@receiver(pre_save, sender=BiasSource)
+def remember_bias_scores(sender, instance, raw=False, **kwargs):
+    """Keep the stored rating so post_save can tell whether articles need re-scoring"""
+    if raw or instance.pk is None:
+        instance._stored_scores = None
+        return
+    instance._stored_scores = (
+        BiasSource.objects.filter(pk=instance.pk).values_list('bias_rating', 'reliability_score').first()
+    )
+
+
+@receiver(post_save, sender=BiasSource)
+def rescore_bias_source_articles(sender, instance, created, raw=False, **kwargs):
+    """Re-score stored articles when a source is added or its rating or reliability changes"""
+    if raw:
+        return
+    if created or getattr(instance, '_stored_scores', None) != (instance.bias_rating, instance.reliability_score):
+        from .rescoring import enqueue_rescore
+        enqueue_rescore([instance.pk])
+
+
+@receiver(pre_delete, sender=BiasSource)
+def clear_bias_source_scores(sender, instance, **kwargs):
+    """Articles of a deleted source no longer have a bias rating"""
+    from .models import Article
+    from .rescoring import source_tag
+    from .tiered_cache import tiered_cache
+    from .analytics import rebuild_rollups
+    articles = Article.objects.filter(bias_source=instance)
+    source_names = list(articles.order_by().values_list('source', flat=True).distinct())
+    articles.update(bias_score=None, reliability_score=None)
+    rebuild_rollups(sources=source_names)
+    tiered_cache.invalidate_tags([source_tag(instance.pk)])
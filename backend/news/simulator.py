@@ -0,0 +1,291 @@
+"""
+Configurable Mediastack simulator for offline load testing.
+
+A small WSGI app implementing the parts of the ``/v1/news`` contract that
+MediastackService relies on: ``access_key``, ``keywords``, ``categories``,
+``countries``, ``limit``, ``offset``, ``sort`` and the ``pagination`` block.
+Articles are synthetic but deterministic for a given seed. Latency, error
+rate and quota exhaustion are configurable so benchmarks can exercise slow or
+failing upstreams.
+
+Run it with ``python manage.py run_mediastack_simulator`` (or any WSGI server,
+e.g. ``gunicorn news.simulator:application`` configured through the
+``MEDIASTACK_SIM_*`` environment variables) and point ``MEDIASTACK_BASE_URL``
+at ``http://<host>:<port>/v1``.
+
+``GET /__stats__`` returns request counters.
+
+This module only uses the standard library so it can run without Django.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+import json
+import os
+import random
+import threading
+import time
+
+CATEGORIES = ['general', 'business', 'entertainment', 'health', 'science', 'sports', 'technology']
+COUNTRIES = ['us', 'gb', 'de', 'fr', 'ca', 'au', 'in', 'jp', 'br', 'za']
+SOURCES = [
+    'CNN', 'Fox News', 'BBC', 'Reuters', 'Associated Press', 'The New York Times', 'The Guardian',
+    'NPR', 'Breitbart', 'The Hill', 'Bloomberg', 'TechCrunch', 'Local Herald', 'Daily Bulletin',
+]
+TOPICS = [
+    'election', 'market', 'storm', 'vaccine', 'startup', 'league', 'court', 'climate', 'merger',
+    'satellite', 'border', 'festival', 'policy', 'study', 'earnings', 'championship', 'drought', 'chip',
+]
+VERBS = ['shakes up', 'dominates', 'reshapes', 'stalls', 'boosts', 'divides', 'surprises', 'tests']
+
+BASE_TIME = datetime(2025, 3, 15, 23, 59, tzinfo=timezone.utc)
+
+ERRORS = {
+    'missing_access_key': ('401 Unauthorized', 'You have not supplied an API Access Key.'),
+    'invalid_access_key': ('401 Unauthorized', 'You have supplied an invalid API Access Key.'),
+    'usage_limit_reached': (
+        '429 Too Many Requests',
+        'Your monthly usage limit has been reached. Please upgrade your Subscription Plan.'
+    ),
+    'internal_error': ('500 Internal Server Error', 'An internal error occurred.'),
+    'not_found': ('404 Not Found', 'The requested resource does not exist.'),
+}
+
+
+class LatencyModel:
+    """
+    Per-request delay, parsed from a spec string (all values in milliseconds):
+
+    - ``fixed:50``
+    - ``uniform:20:200``
+    - ``normal:100:30`` (mean, standard deviation; clamped at zero)
+    - ``lognormal:80:0.5`` (median, sigma of the underlying normal)
+    """
+
+    def __init__(self, spec: str = 'fixed:0', rng: Optional[random.Random] = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, *params = spec.split(':')
+        try:
+            params = [float(p) for p in params]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.kind = kind
+        self.params = params
+
+    def sample(self) -> float:
+        """Delay in seconds"""
+        if self.kind == 'fixed':
+            ms = self.params[0]
+        elif self.kind == 'uniform':
+            ms = self.rng.uniform(*self.params)
+        elif self.kind == 'normal':
+            ms = self.rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = self.rng.lognormvariate(0, sigma) * median
+        return max(ms, 0.0) / 1000
+
+
+def generate_articles(total: int, seed: int = 0) -> List[Dict]:
+    """Deterministic synthetic articles, newest first"""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(total):
+        topic, other = rng.sample(TOPICS, 2)
+        source = rng.choice(SOURCES)
+        published_at = BASE_TIME - timedelta(minutes=3 * i)
+        articles.append({
+            'author': rng.choice([None, 'Staff Writer', 'Jane Doe', 'John Smith']),
+            'title': f"{topic.title()} {rng.choice(VERBS)} {other} coverage ({i})",
+            'description': f"Simulated report on the {topic} and the {other}.",
+            'url': f"https://simulated.example.com/{published_at:%Y/%m/%d}/{topic}-{other}-{i}",
+            'source': source,
+            'image': None if i % 5 == 0 else f"https://simulated.example.com/images/{i}.jpg",
+            'category': rng.choice(CATEGORIES),
+            'language': 'en',
+            'country': rng.choice(COUNTRIES),
+            'published_at': published_at.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        })
+    return articles
+
+
+def _split_filter(value: Optional[str]):
+    """Split a Mediastack list filter into (included, excluded) sets"""
+    included, excluded = set(), set()
+    for item in (value or '').split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        if item.startswith('-'):
+            excluded.add(item[1:])
+        else:
+            included.add(item)
+    return included, excluded
+
+
+class MediastackSimulator:
+    """WSGI app simulating the Mediastack ``/v1/news`` endpoint"""
+
+    def __init__(
+        self,
+        total: int = 10000,
+        seed: int = 0,
+        latency: str = 'fixed:0',
+        error_rate: float = 0.0,
+        quota: Optional[int] = None,
+        access_key: Optional[str] = None
+    ):
+        self.articles = generate_articles(total, seed)
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, rng=random.Random(seed + 1))
+        self.error_rate = error_rate
+        self.quota = quota
+        self.access_key = access_key
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'served': 0, 'errors': 0, 'quota_exhausted': 0}
+
+    @classmethod
+    def from_env(cls):
+        quota = os.getenv('MEDIASTACK_SIM_QUOTA')
+        return cls(
+            total=int(os.getenv('MEDIASTACK_SIM_TOTAL', 10000)),
+            seed=int(os.getenv('MEDIASTACK_SIM_SEED', 0)),
+            latency=os.getenv('MEDIASTACK_SIM_LATENCY', 'fixed:0'),
+            error_rate=float(os.getenv('MEDIASTACK_SIM_ERROR_RATE', 0)),
+            quota=int(quota) if quota else None,
+            access_key=os.getenv('MEDIASTACK_SIM_ACCESS_KEY') or None,
+        )
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path == '/__stats__':
+            with self._lock:
+                return self._json(start_response, '200 OK', dict(self.stats))
+        if path.rstrip('/') not in ('/v1/news', '/news'):
+            return self._error(start_response, 'not_found', count=False)
+
+        params = {key: values[-1] for key, values in parse_qs(environ.get('QUERY_STRING', '')).items()}
+
+        with self._lock:
+            self.stats['requests'] += 1
+            over_quota = self.quota is not None and self.stats['requests'] > self.quota
+            fail = not over_quota and self.rng.random() < self.error_rate
+            delay = self.latency.sample()
+
+        if delay:
+            time.sleep(delay)
+
+        if not params.get('access_key'):
+            return self._error(start_response, 'missing_access_key')
+        if self.access_key is not None and params['access_key'] != self.access_key:
+            return self._error(start_response, 'invalid_access_key')
+        if over_quota:
+            with self._lock:
+                self.stats['quota_exhausted'] += 1
+            return self._error(start_response, 'usage_limit_reached')
+        if fail:
+            return self._error(start_response, 'internal_error')
+
+        try:
+            body = self.search(params)
+        except ValueError as e:
+            return self._json(start_response, '422 Unprocessable Entity', {
+                'error': {'code': 'validation_error', 'message': str(e)}
+            })
+
+        with self._lock:
+            self.stats['served'] += 1
+        return self._json(start_response, '200 OK', body)
+
+    def search(self, params: Dict[str, str]) -> Dict:
+        """Apply the ``/v1/news`` filters, sorting and pagination"""
+        try:
+            limit = int(params.get('limit', 25))
+            offset = int(params.get('offset', 0))
+        except ValueError:
+            raise ValueError('limit and offset must be integers')
+        if not 1 <= limit <= 100 or offset < 0:
+            raise ValueError('limit must be between 1 and 100 and offset must not be negative')
+
+        categories, excluded_categories = _split_filter(params.get('categories'))
+        countries, excluded_countries = _split_filter(params.get('countries'))
+
+        # Keywords are space separated; "-term" excludes, "OR" is accepted and ignored
+        terms = [t.lower() for t in params.get('keywords', '').split() if t.upper() != 'OR']
+        required = [t for t in terms if not t.startswith('-')]
+        excluded_terms = [t[1:] for t in terms if t.startswith('-') and len(t) > 1]
+
+        matches = []
+        for article in self.articles:
+            if categories and article['category'] not in categories:
+                continue
+            if article['category'] in excluded_categories:
+                continue
+            if countries and article['country'] not in countries:
+                continue
+            if article['country'] in excluded_countries:
+                continue
+            if required or excluded_terms:
+                text = f"{article['title']} {article['description']}".lower()
+                if required and not any(term in text for term in required):
+                    continue
+                if any(term in text for term in excluded_terms):
+                    continue
+            matches.append(article)
+
+        if params.get('sort') == 'published_asc':
+            matches.reverse()
+
+        page = matches[offset:offset + limit]
+        return {
+            'pagination': {
+                'limit': limit,
+                'offset': offset,
+                'count': len(page),
+                'total': len(matches),
+            },
+            'data': page,
+        }
+
+    def _error(self, start_response, code: str, count: bool = True):
+        if count:
+            with self._lock:
+                self.stats['errors'] += 1
+        status, message = ERRORS[code]
+        return self._json(start_response, status, {'error': {'code': code, 'message': message}})
+
+    def _json(self, start_response, status: str, body: Dict):
+        content = json.dumps(body).encode('utf-8')
+        start_response(status, [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(content))),
+        ])
+        return [content]
+
+
+def make_server(host: str, port: int, app: MediastackSimulator):
+    """Threaded WSGI server, so simulated latency does not serialize requests"""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server as wsgiref_make_server
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    return wsgiref_make_server(host, port, app, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+
+
+def __getattr__(name):
+    # Build the module-level WSGI app on first use so importing this module stays cheap
+    if name == 'application':
+        globals()['application'] = MediastackSimulator.from_env()
+        return globals()['application']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
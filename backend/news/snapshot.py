@@ -0,0 +1,259 @@
+"""
+Memory-mapped columnar snapshot of recent article features.
+
+The ranking code needs category, source, country, bias and publication time for
+recent articles. Instead of every worker loading them from the ORM, a builder
+writes them once into a single file of fixed-width NumPy columns plus interned
+string tables. Workers map the file read-only, so all processes on a host share
+the same page-cache pages.
+
+File layout (all integers little-endian)::
+
+    MAGIC (8 bytes) | header length (uint64) | JSON header | columns...
+
+Each column starts on a 64-byte boundary; the header records its dtype and
+offset. String columns are stored as int32 codes into the header's string
+tables, with -1 meaning "missing".
+
+Personalization reads the categories and sources of the articles a visitor
+interacted with from the snapshot (``rows_for`` and ``frequent``) instead of
+grouping interactions joined to articles in the database.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from typing import Dict, List, Optional
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .models import Article
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'NNSNAP01'
+ALIGNMENT = 64
+MISSING = -1
+
+STRING_COLUMNS = ('category', 'source', 'country')
+
+COLUMN_DTYPES = {
+    'id': '<i8',
+    'published_at': '<i8',  # seconds since the epoch
+    'category': '<i4',
+    'source': '<i4',
+    'country': '<i4',
+    'bias_score': '<f4',  # NaN when unknown
+    'reliability_score': '<f4',  # NaN when unknown
+}
+
+
+class StringTable:
+    """Interns strings to dense integer codes"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: Optional[str]) -> int:
+        if not value:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def build_snapshot(path, since=None) -> int:
+    """
+    Write a snapshot of articles published after ``since`` to ``path``
+
+    The file is written next to ``path`` and moved into place with
+    ``os.replace``, so readers only ever see a complete snapshot.
+
+    Returns:
+        Number of articles in the snapshot
+    """
+    path = os.fspath(path)
+    tables = {name: StringTable() for name in STRING_COLUMNS}
+    columns = {name: [] for name in COLUMN_DTYPES}
+
+    queryset = Article.objects.all()
+    if since is not None:
+        queryset = queryset.filter(published_at__gte=since)
+
+    rows = queryset.order_by('-published_at').values_list(
+        'id', 'published_at', 'category', 'source', 'country', 'bias_score', 'reliability_score'
+    )
+    for article_id, published_at, category, source, country, bias_score, reliability_score in rows.iterator(chunk_size=2000):
+        columns['id'].append(article_id)
+        columns['published_at'].append(int(published_at.timestamp()))
+        columns['category'].append(tables['category'].code(category))
+        columns['source'].append(tables['source'].code(source))
+        columns['country'].append(tables['country'].code(country))
+        columns['bias_score'].append(np.nan if bias_score is None else bias_score)
+        columns['reliability_score'].append(np.nan if reliability_score is None else reliability_score)
+
+    count = len(columns['id'])
+    arrays = {name: np.asarray(values, dtype=COLUMN_DTYPES[name]) for name, values in columns.items()}
+
+    header = {
+        'version': 1,
+        'count': count,
+        'built_at': int(time.time()),
+        'strings': {name: table.values for name, table in tables.items()},
+        'columns': {},
+    }
+    # Column offsets depend on the header size, which depends on the offsets.
+    # Reserve room for the offsets first, then lay the columns out after it.
+    header_bytes = json.dumps(header).encode('utf-8')
+    reserved = len(header_bytes) + 64 * len(arrays)
+    offset = _align(len(MAGIC) + 8 + reserved)
+    for name, array in arrays.items():
+        header['columns'][name] = {'dtype': COLUMN_DTYPES[name], 'offset': offset}
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    assert len(header_bytes) <= reserved
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', len(header_bytes)))
+            f.write(header_bytes)
+            for name, array in arrays.items():
+                f.seek(header['columns'][name]['offset'])
+                f.write(array.tobytes())
+            f.truncate(max(offset, f.tell()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    logger.info(f"Wrote article snapshot with {count} articles to {path}")
+    return count
+
+
+class ArticleSnapshot:
+    """Read-only, zero-copy view of a snapshot file"""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not an article snapshot")
+        (header_length,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode('utf-8'))
+
+        self.count = header['count']
+        self.built_at = header['built_at']
+        self.strings = header['strings']
+        self.columns = {
+            name: np.frombuffer(self._mmap, dtype=spec['dtype'], count=self.count, offset=spec['offset'])
+            for name, spec in header['columns'].items()
+        }
+        self._codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.strings.items()
+        }
+        # Built on first use by rows_for
+        self._id_order = None
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def code_for(self, column: str, value: Optional[str]) -> int:
+        """Code of ``value`` in a string column, or -1 if it never occurs"""
+        return self._codes[column].get(value, MISSING)
+
+    def decode(self, column: str, code: int) -> Optional[str]:
+        return self.strings[column][code] if code != MISSING else None
+
+    def rows_for(self, ids) -> np.ndarray:
+        """Row of each article id in ``ids``, or -1 for ids outside the snapshot"""
+        ids = np.asarray(ids, dtype=COLUMN_DTYPES['id'])
+        if not self.count:
+            return np.full(len(ids), MISSING)
+        if self._id_order is None:
+            self._id_order = np.argsort(self.columns['id'])
+        sorted_ids = self.columns['id'][self._id_order]
+        positions = np.minimum(np.searchsorted(sorted_ids, ids), self.count - 1)
+        return np.where(sorted_ids[positions] == ids, self._id_order[positions], MISSING)
+
+    def frequent(self, column: str, rows: np.ndarray, min_count: int = 1) -> List[str]:
+        """Values of a string column occurring at least ``min_count`` times in ``rows``"""
+        codes = self.columns[column][rows]
+        counts = np.bincount(codes[codes != MISSING], minlength=len(self.strings[column]))
+        return [self.strings[column][code] for code in np.flatnonzero(counts >= min_count)]
+
+    def mask(self, **filters) -> np.ndarray:
+        """Boolean row mask for exact matches on string columns, e.g. ``mask(category='sports')``"""
+        result = np.ones(self.count, dtype=bool)
+        for column, value in filters.items():
+            result &= self.columns[column] == self.code_for(column, value)
+        return result
+
+
+_lock = threading.Lock()
+_current: Optional[ArticleSnapshot] = None
+_checked_at = 0.0
+
+# How often (in seconds) a worker checks whether the snapshot file was swapped
+RELOAD_CHECK_INTERVAL = 5.0
+
+
+def get_snapshot() -> Optional[ArticleSnapshot]:
+    """
+    Return the current snapshot, re-mapping the file when it has been swapped
+
+    Returns None if no snapshot has been built yet.
+    """
+    global _current, _checked_at
+
+    now = time.monotonic()
+    if _current is not None and now - _checked_at < RELOAD_CHECK_INTERVAL:
+        return _current
+
+    with _lock:
+        _checked_at = now
+        path = os.fspath(settings.ARTICLE_SNAPSHOT_PATH)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return _current
+        if _current is None or _current.identity != (stat.st_ino, stat.st_mtime_ns):
+            # The previous mapping stays alive for as long as callers hold its arrays
+            _current = ArticleSnapshot(path)
+            logger.info(f"Loaded article snapshot with {len(_current)} articles")
+        return _current
+
+
+def rebuild_snapshot() -> int:
+    """Rebuild the configured snapshot from the recent-article window"""
+    since = timezone.now() - timedelta(hours=settings.ARTICLE_SNAPSHOT_WINDOW_HOURS)
+    return build_snapshot(settings.ARTICLE_SNAPSHOT_PATH, since=since)
@@ -0,0 +1,196 @@
+"""
+Source-name normalization and the in-memory bias source resolver.
+
+Upstream source names vary ("CNN", "cnn", "CNN International", "cnn.com"), so
+bias sources and their aliases are matched on a normalized key: ASCII,
+case-folded, without punctuation, a leading "the", a web domain suffix or
+trailing words like "news" or "international".
+
+``SourceResolver`` holds every bias source keyed by its normalized name and by
+each ``SourceAlias``. Lookups are an exact dict hit first; otherwise the
+closest key by trigram similarity from a precomputed trigram index, if it is
+close enough. Names that still don't resolve are counted and periodically
+written to the ``UnresolvedSource`` review queue.
+
+Each worker keeps one resolver and reloads it when the catalog version in the
+shared cache changes; saving or deleting a bias source or alias bumps it.
+"""
+from collections import Counter, defaultdict
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from typing import Dict, Iterable, List, Optional
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+DOMAIN_SUFFIX = re.compile(r'\.(com|co\.uk|org|net|news|co|uk|us)$')
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+SUFFIX_WORDS = {
+    'news', 'international', 'online', 'digital', 'com', 'live', 'edition', 'english',
+    'channel', 'network', 'us', 'uk', 'usa', 'world',
+}
+
+CATALOG_VERSION_KEY = 'source_catalog_version'
+FUZZY_THRESHOLD = 0.6
+FUZZY_MIN_LENGTH = 4
+UNRESOLVED_FLUSH_INTERVAL = 60.0
+
+
+def normalize_source_name(name: Optional[str]) -> str:
+    """Matching key for a source name, e.g. "The New York Times" -> "newyorktimes" """
+    if not name:
+        return ''
+    key = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').casefold().strip()
+    key = re.sub(r'^https?://', '', key)
+    key = re.sub(r'^www\.', '', key).rstrip('/')
+    key = DOMAIN_SUFFIX.sub('', key)
+    words = NON_ALPHANUMERIC.sub(' ', key).split()
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    while len(words) > 1 and words[-1] in SUFFIX_WORDS:
+        words = words[:-1]
+    return ''.join(words)
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SourceResolver:
+    """Maps upstream source names to BiasSource objects"""
+
+    def __init__(self, sources_by_key: Dict[str, object]):
+        self.sources_by_key = sources_by_key
+        self._trigrams = {key: _trigrams(key) for key in sources_by_key}
+        self._index = defaultdict(list)
+        for key, trigrams in self._trigrams.items():
+            for trigram in trigrams:
+                self._index[trigram].append(key)
+        self._fuzzy_matches = {}
+
+    @classmethod
+    def load(cls):
+        from .models import BiasSource, SourceAlias
+
+        sources = {source.id: source for source in BiasSource.objects.all()}
+        sources_by_key = {}
+        # Aliases first, so a source's own name wins when an alias normalizes to the same key
+        for alias_key, bias_source_id in SourceAlias.objects.values_list('alias_key', 'bias_source_id'):
+            sources_by_key[alias_key] = sources[bias_source_id]
+        for source in sources.values():
+            if source.normalized_key:
+                sources_by_key[source.normalized_key] = source
+        return cls(sources_by_key)
+
+    def resolve(self, name: Optional[str]):
+        """BiasSource for an upstream source name, or None"""
+        key = normalize_source_name(name)
+        if not key:
+            return None
+        source = self.sources_by_key.get(key)
+        if source is not None:
+            return source
+        match = self._fuzzy_matches.get(key, False)
+        if match is False:
+            match = self._fuzzy_match(key)
+            if len(self._fuzzy_matches) > 10000:
+                self._fuzzy_matches.clear()
+            self._fuzzy_matches[key] = match
+        return self.sources_by_key[match] if match else None
+
+    def _fuzzy_match(self, key: str) -> Optional[str]:
+        if len(key) < FUZZY_MIN_LENGTH:
+            return None
+        trigrams = _trigrams(key)
+        shared = Counter()
+        for trigram in trigrams:
+            for candidate in self._index.get(trigram, ()):
+                shared[candidate] += 1
+
+        best, best_score = None, FUZZY_THRESHOLD
+        for candidate, count in shared.items():
+            score = count / (len(trigrams) + len(self._trigrams[candidate]) - count)
+            if score > best_score or (score == best_score and best is not None and candidate < best):
+                best, best_score = candidate, score
+        return best
+
+
+_resolver: Optional[SourceResolver] = None
+_resolver_version = None
+_lock = threading.Lock()
+_unresolved = Counter()
+_flushed_at = time.monotonic()
+
+
+def _catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def get_resolver() -> SourceResolver:
+    """This worker's resolver, reloaded when the bias catalog changed"""
+    global _resolver, _resolver_version
+    version = _catalog_version()
+    with _lock:
+        if _resolver is None or version != _resolver_version:
+            _resolver = SourceResolver.load()
+            _resolver_version = version
+        return _resolver
+
+
+def invalidate_resolver() -> None:
+    """Make every worker reload its resolver; call after changing bias sources or aliases"""
+    global _resolver
+    with _lock:
+        _resolver = None
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def record_unresolved(names: Iterable[str]) -> None:
+    """Count source names that didn't resolve; written to the review queue every minute"""
+    global _flushed_at
+    with _lock:
+        _unresolved.update(names)
+        due = time.monotonic() - _flushed_at >= UNRESOLVED_FLUSH_INTERVAL
+    if due:
+        flush_unresolved()
+
+
+def flush_unresolved() -> List[str]:
+    """Write pending unresolved source names to UnresolvedSource; returns the names written"""
+    global _flushed_at
+    from .models import UnresolvedSource
+
+    with _lock:
+        pending = dict(_unresolved)
+        _unresolved.clear()
+        _flushed_at = time.monotonic()
+
+    for name, count in pending.items():
+        name = name[:200]
+        try:
+            # update() skips auto_now, so last_seen is set explicitly
+            updated = UnresolvedSource.objects.filter(source_name=name).update(
+                occurrences=F('occurrences') + count, last_seen=timezone.now()
+            )
+            if not updated:
+                entry, created = UnresolvedSource.objects.get_or_create(
+                    source_name=name,
+                    defaults={'normalized_key': normalize_source_name(name), 'occurrences': count}
+                )
+                if not created:
+                    UnresolvedSource.objects.filter(pk=entry.pk).update(
+                        occurrences=F('occurrences') + count, last_seen=timezone.now()
+                    )
+        except Exception as e:
+            logger.error(f"Error recording unresolved source {name}: {str(e)}")
+    return list(pending)
@@ -0,0 +1,317 @@
+"""
+Server-Sent Events fan-out of newly ingested articles.
+
+Clients subscribe to ``/api/stream/articles/`` with the same filters as
+``/api/articles/`` (categories, countries, keywords) and receive every new
+stored article that matches, as one ``article`` event whose id is the
+article id.
+
+Each process has one ``Broker``. Its ``SubscriptionIndex`` buckets
+subscriptions by (category, country), with None standing for "any", so an
+article is matched by looking up four buckets and only checking the keywords
+of the subscriptions found there, however many others are connected. Matched
+articles are rendered once and the same bytes are queued on every
+subscriber's event loop.
+
+Articles reach the broker through ``Broker.poll``, an id-ordered scan for
+articles above the broker's id watermark (the highest id published). A poller
+thread runs it every ``STREAM['POLL_INTERVAL']`` seconds while anyone is
+subscribed, which covers ``manage.py ingest_articles`` running elsewhere, and
+the ``articles_ingested`` signal runs it right away when ingest runs in this
+process. Concurrent ingests can commit a lower id after a higher one was
+scanned, so each scan starts ``STREAM['RESCAN_WINDOW']`` ids below the
+watermark and skips the ids it already published there. An article that
+commits after more than ``RESCAN_WINDOW`` higher ids were published is not
+delivered live; it is only found by listing or replay from an older id.
+
+A reconnecting client sends ``Last-Event-ID`` (or ``last_event_id`` on the
+first connection) and first gets the newest ``STREAM['REPLAY_LIMIT']``
+matching articles above it. Subscribers that fall ``STREAM['QUEUE_SIZE']``
+events behind are disconnected and resume the same way.
+"""
+from asgiref.sync import sync_to_async
+from collections import defaultdict
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max, Q
+from django.db.models.functions import Lower
+from itertools import product
+from typing import Iterable, List, Optional, Set
+import asyncio
+import logging
+import threading
+
+from .models import Article
+from .renderers import FastJSONRenderer
+from .serializers import StoredArticleSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class StreamFull(Exception):
+    """Raised when a process already has ``STREAM['MAX_SUBSCRIBERS']`` subscribers"""
+
+
+class Event:
+    __slots__ = ('id', 'frame')
+
+    def __init__(self, id: int, frame: bytes):
+        self.id = id
+        self.frame = frame
+
+    @classmethod
+    def for_article(cls, article: Article) -> 'Event':
+        data = FastJSONRenderer().render(StoredArticleSerializer(article).data)
+        return cls(article.id, b'id: %d\nevent: article\ndata: %s\n\n' % (article.id, data))
+
+
+def _text(article: Article) -> str:
+    return f"{article.title} {article.description or ''}".lower()
+
+
+class Subscription:
+    """One client's filters and the queue its events are delivered to"""
+    __slots__ = ('categories', 'countries', 'keywords', 'loop', 'queue', 'max_queued', 'closed')
+
+    def __init__(
+        self,
+        categories: Iterable[str] = (),
+        countries: Iterable[str] = (),
+        keywords: Iterable[str] = (),
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        max_queued: int = 100
+    ):
+        self.categories = frozenset(c.strip().lower() for c in categories if c.strip())
+        self.countries = frozenset(c.strip().lower() for c in countries if c.strip())
+        self.keywords = tuple(sorted({k.strip().lower() for k in keywords if k.strip()}))
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.max_queued = max_queued
+        self.closed = False
+
+    def keys(self):
+        """The (category, country) index buckets this subscription lives in"""
+        return product(self.categories or (None,), self.countries or (None,))
+
+    def matches_text(self, text: str) -> bool:
+        return not self.keywords or any(keyword in text for keyword in self.keywords)
+
+    def deliver(self, event: Event) -> None:
+        """Queue an event from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's event loop is gone
+            self.closed = True
+
+    def _put(self, event: Event) -> None:
+        if self.closed:
+            return
+        if self.queue.qsize() >= self.max_queued:
+            # Too far behind: end the stream so the client resumes from its Last-Event-ID
+            self.closed = True
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+
+class SubscriptionIndex:
+    """Subscriptions bucketed by (category, country); None in a key matches any value"""
+
+    def __init__(self):
+        self._buckets = defaultdict(set)
+
+    def add(self, subscription: Subscription) -> None:
+        for key in subscription.keys():
+            self._buckets[key].add(subscription)
+
+    def remove(self, subscription: Subscription) -> None:
+        for key in subscription.keys():
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(subscription)
+                if not bucket:
+                    del self._buckets[key]
+
+    def match(self, article: Article) -> Set[Subscription]:
+        category = (article.category or '').lower() or None
+        country = (article.country or '').lower() or None
+        candidates = set()
+        for key in {(category, country), (category, None), (None, country), (None, None)}:
+            candidates.update(self._buckets.get(key, ()))
+        if not candidates:
+            return candidates
+        text = _text(article)
+        return {subscription for subscription in candidates if subscription.matches_text(text)}
+
+
+class Broker:
+    def __init__(self):
+        self.index = SubscriptionIndex()
+        self.subscriptions: Set[Subscription] = set()
+        # Highest article id published; None while nobody is subscribed
+        self.watermark: Optional[int] = None
+        # Ids at or below this were stored before the first subscriber arrived
+        self._floor = 0
+        # Ids published in the rescan window below the watermark
+        self._published: Set[int] = set()
+        self._lock = threading.Lock()
+        self._poller: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+
+    def subscribe(self, categories=(), countries=(), keywords=(), loop=None) -> Subscription:
+        """Register a subscriber on ``loop``; call from a thread that may query the database"""
+        config = settings.STREAM
+        subscription = Subscription(
+            categories, countries, keywords, loop=loop, max_queued=config['QUEUE_SIZE']
+        )
+        with self._lock:
+            if len(self.subscriptions) >= config['MAX_SUBSCRIBERS']:
+                raise StreamFull(f"{len(self.subscriptions)} subscribers connected")
+            if self.watermark is None:
+                # Only articles stored from now on are live; older ones are replayed
+                self.watermark = self._floor = Article.objects.aggregate(latest=Max('id'))['latest'] or 0
+                self._published = set()
+            self.subscriptions.add(subscription)
+            self.index.add(subscription)
+            if config['POLL_INTERVAL'] and self._poller is None:
+                self._poller = threading.Thread(target=self._poll_forever, name='stream-poller', daemon=True)
+                self._poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.closed = True
+        with self._lock:
+            self.subscriptions.discard(subscription)
+            self.index.remove(subscription)
+            if not self.subscriptions:
+                self.watermark = None
+                self._published = set()
+                self._wakeup.set()
+
+    def _window_start(self) -> int:
+        """Id above which articles may still be unpublished; call with the lock held"""
+        return max(self._floor, self.watermark - settings.STREAM['RESCAN_WINDOW'])
+
+    def publish(self, articles: Iterable[Article]) -> int:
+        """
+        Deliver articles not yet published to matching subscribers; returns the number of deliveries
+
+        Articles at or below the rescan window are ignored.
+        """
+        with self._lock:
+            if self.watermark is None:
+                return 0
+            start = self._window_start()
+            fresh = sorted(
+                {a.id: a for a in articles if a.id > start and a.id not in self._published}.values(),
+                key=lambda a: a.id
+            )
+            if not fresh:
+                return 0
+            self._published.update(article.id for article in fresh)
+            self.watermark = max(self.watermark, fresh[-1].id)
+            start = self._window_start()
+            self._published = {id for id in self._published if id > start}
+            matches = [(article, self.index.match(article)) for article in fresh]
+
+        delivered = 0
+        for article, subscriptions in matches:
+            if not subscriptions:
+                continue
+            event = Event.for_article(article)
+            for subscription in subscriptions:
+                subscription.deliver(event)
+            delivered += len(subscriptions)
+        return delivered
+
+    def poll(self) -> int:
+        """Publish unpublished articles in the rescan window and above, e.g. stored by another process"""
+        batch_size = settings.STREAM['POLL_BATCH_SIZE']
+        delivered = 0
+        after = None
+        while True:
+            with self._lock:
+                if self.watermark is None:
+                    return delivered
+                start = self._window_start()
+                published = set(self._published)
+            if after is not None:
+                start = max(start, after)
+            # Ids first: most of the window is usually published already
+            ids = list(Article.objects.filter(id__gt=start).order_by('id').values_list('id', flat=True)[:batch_size])
+            new_ids = [id for id in ids if id not in published]
+            if new_ids:
+                delivered += self.publish(Article.objects.filter(id__in=new_ids))
+            if len(ids) < batch_size:
+                return delivered
+            after = ids[-1]
+
+    def _poll_forever(self) -> None:
+        try:
+            while True:
+                # Woken early when the last subscriber leaves
+                self._wakeup.wait(settings.STREAM['POLL_INTERVAL'])
+                with self._lock:
+                    self._wakeup.clear()
+                    if not self.subscriptions:
+                        self._poller = None
+                        return
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Error polling for new articles: {str(e)}")
+        finally:
+            close_old_connections()
+
+    def reset(self) -> None:
+        """Drop every subscription (tests)"""
+        for subscription in list(self.subscriptions):
+            self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+def replay(subscription: Subscription, after_id: int, limit: int) -> List[Event]:
+    """Events for the newest ``limit`` stored articles above ``after_id`` that match, oldest first"""
+    articles = Article.objects.filter(id__gt=after_id)
+    if subscription.categories:
+        articles = articles.annotate(category_key=Lower('category')).filter(category_key__in=subscription.categories)
+    if subscription.countries:
+        articles = articles.annotate(country_key=Lower('country')).filter(country_key__in=subscription.countries)
+    if subscription.keywords:
+        matches_keyword = Q()
+        for keyword in subscription.keywords:
+            matches_keyword |= Q(title__icontains=keyword) | Q(description__icontains=keyword)
+        articles = articles.filter(matches_keyword)
+    newest = list(articles.order_by('-id')[:limit])
+    # icontains and lower() can disagree outside ASCII; keep exactly what live events would match
+    return [Event.for_article(article) for article in reversed(newest) if subscription.matches_text(_text(article))]
+
+
+async def event_stream(subscription: Subscription, last_event_id: Optional[int] = None):
+    """SSE body for a subscription: replay after ``last_event_id``, then live events and heartbeats"""
+    config = settings.STREAM
+    replayed = set()
+    try:
+        yield f"retry: {config['RETRY_MS']}\n\n".encode()
+        if last_event_id is not None:
+            for event in await sync_to_async(replay)(subscription, last_event_id, config['REPLAY_LIMIT']):
+                replayed.add(event.id)
+                yield event.frame
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=config['HEARTBEAT'])
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            if event is None:
+                break
+            # Already replayed. Live ids aren't always increasing (late commits), so compare exactly
+            if event.id in replayed:
+                continue
+            yield event.frame
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,55 @@
+"""
+Test helpers shared by the news test suite.
+"""
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from typing import Optional
+from .identity import read_anonymous_id
+
+# Maximum number of SQL queries per request, keyed by URL name. Budgets cover
+# a visitor's first request, including middleware queries, and
+# must not depend on the size of the result or the visitor's history.
+# Once-per-worker loads (the source resolver) are warmed up beforehand.
+QUERY_BUDGETS = {
+    'articles': 0,
+    'personalized': 5,
+    'preferences': 4,
+    'interaction': 2,
+    'bias-sources': 1,
+    'bias-source-detail': 1,
+    'bias-analytics': 1,
+    'map-summary': 1,
+    'trending': 1,
+    'related-articles': 1,
+    # Request thread only; the feed and rails run on the section pool (news.home)
+    'home': 4,
+}
+
+
+@contextmanager
+def assert_query_budget(url_name: str, using: str = 'default'):
+    """
+    Fail if the block runs more SQL queries than the budget for ``url_name``
+
+    Usage::
+
+        with assert_query_budget('articles'):
+            client.get(reverse('articles'))
+    """
+    budget = QUERY_BUDGETS[url_name]
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    if len(context) > budget:
+        queries = '\n'.join(f"  {i}. {query['sql']}" for i, query in enumerate(context.captured_queries, 1))
+        raise AssertionError(
+            f"'{url_name}' ran {len(context)} queries, over its budget of {budget}:\n{queries}"
+        )
+
+
+def anonymous_id(client) -> Optional[str]:
+    """Anonymous visitor id a test client got from the signed identity cookie"""
+    cookie = client.cookies.get(settings.ANONYMOUS_ID_COOKIE_NAME)
+    return read_anonymous_id(cookie.value) if cookie else None
@@ -0,0 +1,32 @@
+import pytest
+from django.core.cache import cache
+from news import services, trending
+from news.tiered_cache import tiered_cache
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Views keep payloads and ETags in the cache; don't let them leak between tests
+    cache.clear()
+    tiered_cache.l1.clear()
+    yield
+    cache.clear()
+    tiered_cache.l1.clear()
+
+@pytest.fixture(autouse=True)
+def foreground_rescoring(settings):
+    # Tests run re-scoring jobs explicitly instead of on a background thread
+    settings.RESCORING = {**settings.RESCORING, 'IN_BACKGROUND': False}
+
+@pytest.fixture(autouse=True)
+def reset_trending():
+    # Interactions recorded by one test must not be checkpointed into another's database
+    trending.engine.reset()
+    yield
+    trending.engine.reset()
+
+@pytest.fixture(autouse=True)
+def article_snapshot(settings, tmp_path, monkeypatch):
+    # Ingest rebuilds the snapshot; keep it out of var/ and don't rank with another test's
+    settings.ARTICLE_SNAPSHOT_PATH = tmp_path / 'article_snapshot.bin'
+    if services.get_snapshot is not None:
+        monkeypatch.setattr('news.snapshot._current', None)
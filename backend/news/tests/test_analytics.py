@@ -0,0 +1,131 @@
+import io
+import pytest
+from datetime import datetime, timedelta, timezone
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.analytics import add_articles, query_rollups, rebuild_rollups
+from news.models import Article, BiasRollup
+
+START = datetime(2025, 3, 15, 10, tzinfo=timezone.utc)
+
+def make_articles(specs):
+    """specs: (minutes after START, source, category, country, bias_score, reliability_score)"""
+    return Article.objects.bulk_create([
+        Article(
+            title=f'Article {i}', url=f'https://example.com/{i}', published_at=START + timedelta(minutes=minutes),
+            source=source, category=category, country=country, bias_score=bias_score, reliability_score=reliability
+        )
+        for i, (minutes, source, category, country, bias_score, reliability) in enumerate(specs)
+    ])
+
+SPECS = [
+    (5, 'CNN', 'general', 'US', -0.3, 0.7),
+    (20, 'CNN', 'general', 'US', -0.3, 0.7),
+    (30, 'Fox News', 'general', 'US', 0.6, 0.5),
+    (70, 'BBC', 'sports', 'GB', 0.0, 0.9),
+    (80, 'Local Herald', None, None, None, None),
+    (60 * 24, 'CNN', 'general', 'US', -0.3, 0.7),
+]
+
+def all_rollups():
+    return sorted(
+        BiasRollup.objects.values_list('bucket_start', 'category', 'country', 'source', 'article_count', 'reliability_sum')
+    )
+
+@pytest.mark.django_db
+class TestRollupMaintenance:
+    def test_incremental_matches_rebuild(self):
+        articles = make_articles(SPECS)
+        add_articles(articles[:2])
+        add_articles(articles[2:])
+        incremental = all_rollups()
+
+        assert rebuild_rollups() == 5
+        assert all_rollups() == incremental
+        cnn = BiasRollup.objects.get(source='CNN', bucket_start=START)
+        assert (cnn.article_count, cnn.center_left_count, cnn.reliability_count) == (2, 2, 2)
+        assert BiasRollup.objects.get(source='Local Herald').category == ''
+
+    def test_ingest_updates_rollups(self, settings, tmp_path):
+        from news.signals import articles_ingested
+
+        settings.ARTICLE_SNAPSHOT_PATH = tmp_path / 'snapshot.bin'
+        settings.CACHE_WARMING = dict(settings.CACHE_WARMING, ON_INGEST=False)
+        articles = make_articles(SPECS[:3])
+        articles_ingested.send(sender=None, articles=articles)
+        assert BiasRollup.objects.get(source='CNN').article_count == 2
+
+    def test_rebuild_single_source(self):
+        make_articles(SPECS)
+        rebuild_rollups()
+        Article.objects.filter(source='CNN').update(bias_score=-0.6)
+        rebuild_rollups(sources=['CNN'])
+        assert BiasRollup.objects.filter(source='CNN', left_count__gt=0).count() == 2
+        assert BiasRollup.objects.get(source='BBC').center_count == 1
+
+@pytest.mark.django_db
+class TestQueryRollups:
+    @pytest.fixture(autouse=True)
+    def rollups(self):
+        make_articles(SPECS)
+        rebuild_rollups()
+
+    def test_daily(self):
+        buckets = query_rollups(START - timedelta(hours=10), START + timedelta(days=2))
+        assert [bucket['article_count'] for bucket in buckets] == [5, 1]
+        first = buckets[0]
+        assert first['bucket'] == '2025-03-15T00:00:00+00:00'
+        assert first['bias'] == {
+            'far_left': 0, 'left': 0, 'center_left': 2, 'center': 1,
+            'center_right': 0, 'right': 1, 'far_right': 0, 'unrated': 1,
+        }
+        assert first['average_bias'] == 0.0
+        assert first['average_reliability'] == 0.7
+
+    def test_hourly_grouped_and_filtered(self):
+        buckets = query_rollups(
+            START, START + timedelta(hours=2), granularity='hour', group_by=['source'], countries=['us', 'GB']
+        )
+        assert [(bucket['bucket'][11:16], bucket['source'], bucket['article_count']) for bucket in buckets] == [
+            ('10:00', 'CNN', 2),
+            ('10:00', 'Fox News', 1),
+            ('11:00', 'BBC', 1),
+        ]
+
+    def test_countries_match_ingested_codes(self):
+        # Ingest stores country codes uppercase; rollups and filters are case-insensitive
+        buckets = query_rollups(START, START + timedelta(days=1), group_by=['country'], countries=['us'])
+        assert [(bucket['country'], bucket['article_count']) for bucket in buckets] == [('us', 3)]
+        response = APIClient().get(
+            reverse('bias-analytics'), {'start': '2025-03-15', 'end': '2025-03-16', 'countries': 'US'}
+        )
+        assert [bucket['article_count'] for bucket in response.data['buckets']] == [3]
+
+@pytest.mark.django_db
+class TestBiasAnalyticsView:
+    def test_range_query(self):
+        make_articles(SPECS)
+        call_command('rebuild_bias_rollups', stdout=io.StringIO())
+        response = APIClient().get(
+            reverse('bias-analytics'),
+            {'start': '2025-03-15', 'end': '2025-03-16', 'group_by': 'category', 'granularity': 'day'}
+        )
+        assert response.status_code == 200
+        assert response.data['start'] == '2025-03-15T00:00:00+00:00'
+        assert [(bucket['category'], bucket['article_count']) for bucket in response.data['buckets']] == [
+            (None, 1), ('general', 3), ('sports', 1),
+        ]
+        assert response['ETag']
+
+    @pytest.mark.parametrize('params', [
+        {'start': 'yesterday'},
+        {'start': '2025-02-30'},
+        {'start': '2025-03-16', 'end': '2025-03-15'},
+        {'start': '2020-01-01', 'end': '2025-01-01'},
+        {'granularity': 'week'},
+        {'group_by': 'title'},
+    ])
+    def test_invalid_parameters(self, params):
+        response = APIClient().get(reverse('bias-analytics'), params)
+        assert response.status_code == 400
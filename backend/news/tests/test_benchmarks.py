@@ -0,0 +1,68 @@
+import requests
+from news.benchmarks.harness import compare_results, measure, measure_all
+from news.benchmarks.upstream import StubUpstream
+from news.services import MediastackService
+
+def result(ops_per_sec, peak_bytes=10000, spread=0.0):
+    return {
+        'ops_per_sec': ops_per_sec,
+        'ops_per_sec_q1': ops_per_sec * (1 - spread),
+        'ops_per_sec_q3': ops_per_sec * (1 + spread),
+        'peak_bytes': peak_bytes,
+    }
+
+class TestHarness:
+    def test_measure_reports_throughput_and_allocations(self):
+        calls = []
+        stats = measure(lambda: calls.append([0] * 1000), duration=0.01, min_iterations=3, repeats=3)
+        assert stats['iterations'] >= 9
+        assert stats['ops_per_sec_q1'] <= stats['ops_per_sec'] <= stats['ops_per_sec_q3']
+        assert stats['ops_per_sec'] > 0
+        assert stats['peak_bytes'] > 0
+        # The list appended on the measured call is still alive
+        assert stats['retained_blocks'] >= 1
+
+    def test_compare_results_flags_slowdowns_beyond_threshold(self):
+        baseline = {'fast': result(100), 'steady': result(100), 'removed': result(100)}
+        current = {'fast': result(70), 'steady': result(90), 'new': result(1)}
+        regressions = compare_results(current, baseline, threshold=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith('fast:')
+
+    def test_rounds_are_interleaved(self):
+        order = []
+        results = measure_all(
+            {'a': lambda: order.append('a'), 'b': lambda: order.append('b')},
+            duration=0, min_iterations=1, repeats=2
+        )
+        assert set(results) == {'a', 'b'}
+        # Per round: a warm-up call, a timed call and an allocation sample
+        assert order == ['a'] * 3 + ['b'] * 3 + ['a'] * 3 + ['b'] * 3
+
+    def test_compare_results_ignores_differences_within_the_noise(self):
+        baseline = {'noisy': result(100, spread=0.2), 'steady': result(100, spread=0.01)}
+        current = {'noisy': result(70, spread=0.2), 'steady': result(70, spread=0.01)}
+        regressions = compare_results(current, baseline, threshold=0.1)
+        assert len(regressions) == 1
+        assert regressions[0].startswith('steady:')
+
+    def test_compare_results_accepts_baselines_without_quartiles(self):
+        baseline = {'case': {'ops_per_sec': 100, 'peak_bytes': 10000}}
+        assert compare_results({'case': result(95)}, baseline, threshold=0.1) == []
+        assert len(compare_results({'case': result(50)}, baseline, threshold=0.1)) == 1
+
+    def test_compare_results_flags_memory_growth(self):
+        regressions = compare_results(
+            {'case': result(100, peak_bytes=50000)}, {'case': result(100, peak_bytes=10000)}, threshold=0.25
+        )
+        assert len(regressions) == 1
+        assert 'peak memory' in regressions[0]
+
+class TestStubUpstream:
+    def test_serves_recorded_pages(self):
+        with StubUpstream() as upstream:
+            response = MediastackService().get_articles(limit=10, offset=95)
+        assert upstream.calls == 1
+        assert len(response['data']) == 5
+        assert response['pagination']['offset'] == 95
+        assert requests.get is not upstream.get
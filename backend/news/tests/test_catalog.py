@@ -0,0 +1,115 @@
+import io
+import json
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from news.catalog import CatalogError, iter_json_array, load_catalog
+from news.models import BiasSource, SourceAlias
+from news.services import MediastackService
+
+CSV_CATALOG = """source_name,bias_rating,reliability_score,description,aliases
+CNN,center_left,0.7,Cable News Network,CNN Wire
+Le Monde,Center Left,0.85,French daily,lemonde.fr;Le Monde Paris
+Local Herald,,,,
+"""
+
+def records(count):
+    return [
+        {'source_name': f'Outlet {i}', 'bias_rating': 'center', 'reliability_score': 0.5 + (i % 5) / 10}
+        for i in range(count)
+    ]
+
+class TestIterJsonArray:
+    def test_small_buffers(self):
+        data = records(50)
+        text = json.dumps(data, indent=2)
+        assert list(iter_json_array(io.StringIO(text), buffer_size=7)) == data
+
+    def test_empty_and_invalid(self):
+        assert list(iter_json_array(io.StringIO(' [ ] '))) == []
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('{"source_name": "CNN"}')))
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('[{"source_name": "CNN"}')))
+
+@pytest.mark.django_db
+class TestLoadCatalog:
+    def test_csv(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            report = load_catalog(io.StringIO(CSV_CATALOG), 'csv')
+
+        assert report.created == ['CNN', 'Le Monde', 'Local Herald']
+        le_monde = BiasSource.objects.get(source_name='Le Monde')
+        assert le_monde.bias_rating == 'center_left'
+        assert le_monde.normalized_key == 'lemonde'
+        assert BiasSource.objects.get(source_name='Local Herald').bias_rating is None
+        assert report.aliases == 3
+        # The resolver sees the new sources and aliases right away
+        lookup = MediastackService().get_bias_lookup(['lemonde.fr', 'Local Herald'])
+        assert lookup['lemonde.fr'] == le_monde
+
+    def test_reports_diff(self):
+        load_catalog(io.StringIO(json.dumps(records(10))), 'json', chunk_size=3)
+
+        changed = records(12)
+        changed[4]['bias_rating'] = 'right'
+        jsonl = '\n'.join(json.dumps(record) for record in changed)
+        report = load_catalog(io.StringIO(jsonl), 'jsonl', chunk_size=3)
+
+        assert report.created == ['Outlet 10', 'Outlet 11']
+        assert report.updated == ['Outlet 4']
+        assert report.unchanged == 9
+        assert BiasSource.objects.get(source_name='Outlet 4').bias_rating == 'right'
+        assert BiasSource.objects.count() == 12
+
+    def test_one_upsert_per_chunk(self, django_assert_num_queries):
+        # Per chunk: one SELECT for the diff, one INSERT ... ON CONFLICT and one SELECT for the new ids;
+        # plus the transaction's savepoint and the re-scoring job. Chunks stay small enough for SQLite's
+        # bound-parameter limit, which would split bigger inserts.
+        with django_assert_num_queries(3 * 3 + 2 + 1):
+            load_catalog(io.StringIO(json.dumps(records(250))), 'json', chunk_size=100)
+        assert BiasSource.objects.count() == 250
+
+    def test_invalid_record_aborts_load(self):
+        data = records(5)
+        data[3]['bias_rating'] = 'leftish'
+        with pytest.raises(CatalogError, match='record 4: invalid bias_rating'):
+            load_catalog(io.StringIO(json.dumps(data)), 'json', chunk_size=2)
+        assert BiasSource.objects.count() == 0
+
+    def test_skip_invalid(self):
+        data = records(4) + [{'bias_rating': 'left'}, {'source_name': 'X', 'reliability_score': 7}]
+        report = load_catalog(io.StringIO(json.dumps(data)), 'json', skip_invalid=True)
+        assert len(report.created) == 4
+        assert [error.line for error in report.errors] == [5, 6]
+
+    def test_dry_run(self):
+        report = load_catalog(io.StringIO(CSV_CATALOG), 'csv', dry_run=True)
+        assert len(report.created) == 3
+        assert BiasSource.objects.count() == 0
+        assert SourceAlias.objects.count() == 0
+
+@pytest.mark.django_db
+class TestLoadBiasCatalogCommand:
+    def test_command(self, tmp_path):
+        path = tmp_path / 'catalog.csv'
+        path.write_text(CSV_CATALOG)
+        out = io.StringIO()
+        call_command('load_bias_catalog', str(path), stdout=out)
+        assert '3 created, 0 updated, 0 unchanged, 0 skipped, 3 aliases' in out.getvalue()
+
+        out = io.StringIO()
+        call_command('load_bias_catalog', str(path), stdout=out)
+        assert '0 created, 0 updated, 3 unchanged' in out.getvalue()
+
+    def test_invalid_catalog(self, tmp_path):
+        path = tmp_path / 'catalog.jsonl'
+        path.write_text('{"source_name": "CNN", "bias_rating": "sideways"}\n')
+        with pytest.raises(CommandError, match='nothing was loaded'):
+            call_command('load_bias_catalog', str(path), stdout=io.StringIO())
+
+    def test_unknown_extension(self, tmp_path):
+        path = tmp_path / 'catalog.txt'
+        path.write_text('')
+        with pytest.raises(CommandError, match='--format'):
+            call_command('load_bias_catalog', str(path), stdout=io.StringIO())
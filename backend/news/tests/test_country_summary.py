@@ -0,0 +1,83 @@
+import io
+import pytest
+from datetime import datetime, timedelta, timezone
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.country_summary import get_summary, refresh_summaries
+from news.models import Article, CountrySummary, UserInteraction
+
+NOW = datetime(2025, 3, 15, 12, tzinfo=timezone.utc)
+
+@pytest.fixture
+def articles():
+    def article(i, country, hours_ago, bias_score=None):
+        return Article.objects.create(
+            title=f'Article {i}', url=f'https://example.com/{i}', published_at=NOW - timedelta(hours=hours_ago),
+            source='CNN', country=country, bias_score=bias_score
+        )
+    us = [article(i, 'us', hours_ago=i, bias_score=-0.3) for i in range(4)]
+    gb = [article(10, 'GB', hours_ago=2, bias_score=0.0), article(11, 'gb', hours_ago=3, bias_score=0.6)]
+    article(20, 'fr', hours_ago=48)
+    article(30, None, hours_ago=1)
+    # The oldest US article in the window is the most engaged with
+    UserInteraction.objects.bulk_create([
+        UserInteraction(session_id=f'visitor{i}', article=us[3], interaction_type='view') for i in range(3)
+    ] + [UserInteraction(session_id='visitor', article=us[2], interaction_type='like')])
+    return us, gb
+
+@pytest.mark.django_db
+class TestRefreshSummaries:
+    def test_windows(self, settings, articles):
+        settings.MAP_SUMMARY = dict(settings.MAP_SUMMARY, WINDOWS=[24, 168], TOP_N=3)
+        us, gb = articles
+        assert refresh_summaries(now=NOW) == 5
+
+        day = get_summary(24)
+        assert day['refreshed_at'] == NOW.isoformat()
+        assert set(day['countries']) == {'us', 'gb'}
+        assert day['countries']['us'] == {
+            'article_count': 4,
+            'average_bias': -0.3,
+            'top_article_ids': [us[3].id, us[2].id, us[0].id],
+        }
+        assert day['countries']['gb']['article_count'] == 2
+        assert day['countries']['gb']['average_bias'] == 0.3
+        assert day['countries']['gb']['top_article_ids'] == [gb[0].id, gb[1].id]
+
+        week = get_summary(168)['countries']['fr']
+        assert (week['article_count'], week['average_bias']) == (1, None)
+        assert week['top_article_ids'] == [Article.objects.get(title='Article 20').id]
+
+    def test_refresh_replaces_rows(self, articles):
+        refresh_summaries(now=NOW)
+        refresh_summaries(now=NOW + timedelta(days=30))
+        assert CountrySummary.objects.count() == 0
+        assert get_summary(24) == {'window_hours': 24, 'refreshed_at': None, 'countries': {}}
+
+    def test_ingest_refreshes(self, settings, tmp_path, articles):
+        from news.signals import articles_ingested
+
+        settings.ARTICLE_SNAPSHOT_PATH = tmp_path / 'snapshot.bin'
+        settings.CACHE_WARMING = dict(settings.CACHE_WARMING, ON_INGEST=False)
+        Article.objects.update(published_at=datetime.now(timezone.utc))
+        articles_ingested.send(sender=None, articles=[])
+        assert CountrySummary.objects.filter(window_hours=24, country='us').exists()
+
+@pytest.mark.django_db
+class TestMapSummaryView:
+    def test_single_request(self, articles, django_assert_num_queries):
+        call_command('refresh_map_summary', stdout=io.StringIO())
+        client = APIClient()
+        with django_assert_num_queries(1):
+            response = client.get(reverse('map-summary'), {'window': 168})
+        assert response.status_code == 200
+        assert response.data['window_hours'] == 168
+        assert response['Cache-Control'] == 'public, max-age=60'
+
+        not_modified = client.get(reverse('map-summary'), {'window': 168}, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert not_modified.status_code == 304
+
+    @pytest.mark.parametrize('window', ['12', 'week'])
+    def test_unknown_window(self, window):
+        assert APIClient().get(reverse('map-summary'), {'window': window}).status_code == 400
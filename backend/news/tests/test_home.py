@@ -0,0 +1,151 @@
+import io
+import pytest
+import threading
+import time
+from unittest.mock import patch
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.benchmarks.upstream import StubUpstream
+from news import home
+from news.home import run_sections
+from news.views import ArticlesView
+
+@pytest.fixture
+def upstream(settings):
+    settings.MEDIASTACK_API_KEY = 'test'
+    ArticlesView.mediastack_service = None
+    with StubUpstream() as stub:
+        yield stub
+    ArticlesView.mediastack_service = None
+
+@pytest.fixture
+def bias_data():
+    call_command('initialize_bias_data', stdout=io.StringIO())
+
+def slow(seconds, result=None):
+    def wait(*args, **kwargs):
+        time.sleep(seconds)
+        return result
+    return wait
+
+# Sections release their thread's database connections when they finish
+@pytest.mark.django_db
+class TestRunSections:
+    def test_sections_run_concurrently(self):
+        started = time.monotonic()
+        results, errors = run_sections({
+            'a': (slow(0.2, 1), 5),
+            'b': (slow(0.2, 2), 5),
+        })
+        assert results == {'a': 1, 'b': 2}
+        assert errors == {}
+        assert time.monotonic() - started < 0.35
+
+    def test_timeouts_and_errors(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        results, errors = run_sections({
+            'late': (slow(0.5, 1), 0.05),
+            'broken': (fail, 5),
+            'fine': (lambda: 3, 5),
+        })
+        assert results == {'late': None, 'broken': None, 'fine': 3}
+        assert errors == {'late': 'timeout', 'broken': 'error'}
+
+    def test_concurrent_requests_beyond_the_pool(self, settings, monkeypatch):
+        # A pool for one request's three sections, shared by three requests at once
+        settings.HOME = {**settings.HOME, 'CONCURRENT_REQUESTS': 1, 'MAX_RAILS': 2}
+        monkeypatch.setattr(home, '_executor', None)
+        monkeypatch.setattr(home, '_pending', 0)
+        sections = {name: (slow(0.2, name), 0.5) for name in ('personalized', 'general', 'sports')}
+        outcomes = []
+        requests = [threading.Thread(target=lambda: outcomes.append(run_sections(sections))) for _ in range(3)]
+        for request in requests:
+            request.start()
+        for request in requests:
+            request.join()
+        home._executor.shutdown()
+
+        # Queued behind the other requests, the last sections would have missed their deadline
+        assert len(outcomes) == 3
+        for results, errors in outcomes:
+            assert errors == {}
+            assert results == {'personalized': 'personalized', 'general': 'general', 'sports': 'sports'}
+
+@pytest.mark.django_db(transaction=True)
+class TestHomeView:
+    def test_all_sections(self, settings, bias_data, upstream):
+        response = APIClient().get(reverse('home'), {'limit': 10, 'rail_limit': 5})
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data['partial'] is False
+        assert data['errors'] == {}
+        assert data['preferences']['preferred_categories'] == []
+        assert len(data['personalized']['articles']) == 10
+        assert data['personalized_fallback'] is False
+        assert [rail['category'] for rail in data['rails']] == settings.HOME['RAIL_CATEGORIES']
+        assert all(len(rail['articles']) == 5 for rail in data['rails'])
+        assert response['Cache-Control'] == 'private'
+
+        sources = {article['source'] for article in data['personalized']['articles']}
+        assert data['bias_sources']
+        assert set(data['bias_sources']) <= sources
+        for name, entry in data['bias_sources'].items():
+            assert entry['bias_rating']
+
+    def test_rails_follow_preferences_and_share_caches(self, upstream):
+        client = APIClient()
+        client.get(reverse('preferences'))
+        client.post(reverse('preferences'), {'preferred_categories': ['science', 'health']}, format='json')
+
+        data = client.get(reverse('home')).json()
+        assert [rail['category'] for rail in data['rails']] == ['science', 'health']
+        calls = upstream.calls
+        assert calls == 3
+
+        # Both sections were cached for the standalone endpoints too
+        assert client.get(reverse('personalized')).status_code == 200
+        assert client.get(reverse('articles'), {'categories': 'health'}).status_code == 200
+        assert client.get(reverse('home')).status_code == 200
+        assert upstream.calls == calls
+
+    def test_personalized_timeout_falls_back_to_cached_articles(self, settings, upstream):
+        settings.HOME = {**settings.HOME, 'TIMEOUTS': {'personalized': 0.05, 'rail': 5}}
+        client = APIClient()
+        with patch('news.views.PersonalizedNewsView.load_feed', side_effect=slow(0.5)):
+            data = client.get(reverse('home')).json()
+        assert data['personalized'] is None
+        assert data['personalized_fallback'] is False
+        assert data['errors'] == {'personalized': 'timeout'}
+        assert data['partial'] is True
+        assert all(rail['articles'] for rail in data['rails'])
+
+        assert client.get(reverse('articles')).status_code == 200
+        with patch('news.views.PersonalizedNewsView.load_feed', side_effect=slow(0.5)):
+            data = client.get(reverse('home')).json()
+        assert len(data['personalized']['articles']) == 25
+        assert data['personalized_fallback'] is True
+        assert data['partial'] is True
+
+    def test_failed_rail_is_partial(self, upstream):
+        load_articles = ArticlesView.load_articles
+
+        def fail_sports(self, keywords, categories, *args):
+            if categories == ['sports']:
+                raise Exception('upstream down')
+            return load_articles(self, keywords, categories, *args)
+
+        with patch.object(ArticlesView, 'load_articles', fail_sports):
+            data = APIClient().get(reverse('home')).json()
+        rails = {rail['category']: rail['articles'] for rail in data['rails']}
+        assert rails['sports'] is None
+        assert rails['general']
+        assert data['errors'] == {'rail:sports': 'error'}
+        assert data['personalized']['articles']
+
+    def test_invalid_limit(self):
+        response = APIClient().get(reverse('home'), {'rail_limit': 'many'})
+        assert response.status_code == 400
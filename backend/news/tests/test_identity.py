@@ -0,0 +1,68 @@
+import pytest
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.identity import COOKIE_SALT, read_anonymous_id
+from news.models import UserPreference
+from news.testing import anonymous_id
+from django.core import signing
+
+@pytest.mark.django_db
+class TestAnonymousIdentity:
+    def test_new_visitor_gets_signed_cookie(self):
+        client = APIClient()
+        response = client.get(reverse('preferences'))
+
+        cookie = response.cookies[settings.ANONYMOUS_ID_COOKIE_NAME]
+        assert cookie['httponly']
+        visitor_id = read_anonymous_id(cookie.value)
+        assert response.data['session_id'] == visitor_id
+        assert Session.objects.count() == 0
+
+    def test_id_is_stable_and_cookie_not_reissued(self):
+        client = APIClient()
+        first = client.get(reverse('preferences'))
+        second = client.get(reverse('preferences'))
+
+        assert first.data['session_id'] == second.data['session_id'] == anonymous_id(client)
+        assert settings.ANONYMOUS_ID_COOKIE_NAME not in second.cookies
+
+    def test_no_session_queries(self):
+        client = APIClient()
+        client.get(reverse('preferences'))
+        with CaptureQueriesContext(connection) as context:
+            client.get(reverse('preferences'))
+        assert not any('django_session' in query['sql'] for query in context.captured_queries)
+
+    def test_tampered_cookie_gets_new_id(self):
+        client = APIClient()
+        client.get(reverse('preferences'))
+        original = anonymous_id(client)
+
+        forged = signing.get_cookie_signer(salt=COOKIE_SALT).sign(original)[:-1] + 'x'
+        client.cookies[settings.ANONYMOUS_ID_COOKIE_NAME] = forged
+        response = client.get(reverse('preferences'))
+        assert response.data['session_id'] != original
+
+    def test_legacy_session_is_migrated(self):
+        session = SessionStore()
+        session['session_id'] = 'legacy-visitor'
+        session.create()
+        UserPreference.objects.create(session_id='legacy-visitor', preferred_categories=['sports'])
+
+        client = APIClient()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        response = client.get(reverse('preferences'))
+
+        assert response.data['session_id'] == 'legacy-visitor'
+        assert response.data['preferred_categories'] == ['sports']
+        assert anonymous_id(client) == 'legacy-visitor'
+
+    def test_read_anonymous_id_rejects_garbage(self):
+        assert read_anonymous_id(None) is None
+        assert read_anonymous_id('') is None
+        assert read_anonymous_id('not-signed') is None
@@ -0,0 +1,276 @@
+import os
+import pytest
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from PIL import Image
+from django.test import Client
+from django.urls import reverse
+from news import images as images_module
+from news.images import ImageCache, ImageURLError, check_url, fetch, get_variant, sign_url, url_key
+from news.models import Article
+from news.services import MediastackService
+from news.views import ArticlesView
+
+def encode(image, format, **params):
+    out = BytesIO()
+    image.save(out, format, **params)
+    return out.getvalue()
+
+PHOTO = encode(Image.new('RGB', (2000, 1000), (200, 30, 30)), 'JPEG')
+LOGO = encode(Image.new('RGBA', (300, 300), (0, 0, 255, 128)), 'PNG')
+
+class FixtureServer:
+    """Local HTTP server serving fixed images, counting requests per path"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.hits = {}
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.hits[self.path] = fixture.hits.get(self.path, 0) + 1
+                route = fixture.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                status, headers, body = route
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def image_settings(settings, tmp_path):
+    settings.IMAGE_PROXY = {
+        **settings.IMAGE_PROXY, 'CACHE_DIR': tmp_path / 'images', 'ALLOW_PRIVATE_HOSTS': True,
+        'MAX_SOURCE_BYTES': 100_000,
+    }
+    return settings.IMAGE_PROXY
+
+@pytest.fixture
+def images(image_settings):
+    routes = {
+        '/photo.jpg': (200, {'Content-Type': 'image/jpeg'}, PHOTO),
+        '/copy.jpg': (200, {'Content-Type': 'image/jpeg'}, PHOTO),
+        '/logo.png': (200, {'Content-Type': 'image/png'}, LOGO),
+        '/moved': (302, {'Location': '/photo.jpg'}, b''),
+        '/page.html': (200, {'Content-Type': 'text/html'}, b'<html></html>'),
+        '/huge.jpg': (200, {'Content-Type': 'image/jpeg'}, b'\xff' * 200_000),
+    }
+    with FixtureServer(routes) as server:
+        yield server
+
+def vary(response):
+    return {value.strip() for value in response.get('Vary', '').split(',')}
+
+def get_image(url, accept='image/avif,image/webp,*/*', signed=True, **params):
+    if signed:
+        params.setdefault('sig', sign_url(url))
+    return Client().get(reverse('image-proxy'), {'url': url, **params}, HTTP_ACCEPT=accept)
+
+class TestImageProxyView:
+    def test_variants_from_one_fetch(self, images):
+        response = get_image(images.url('/photo.jpg'))
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'image/webp'
+        assert response['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert 'Accept' in vary(response)
+        image = Image.open(BytesIO(b''.join(response.streaming_content)))
+        assert image.format == 'WEBP'
+        assert image.size == (640, 320)
+
+        response = get_image(images.url('/photo.jpg'), size='thumb', format='jpeg')
+        assert response['Content-Type'] == 'image/jpeg'
+        assert 'Accept' not in vary(response)
+        assert Image.open(BytesIO(b''.join(response.streaming_content))).size == (160, 80)
+
+        # Without WebP in Accept, JPEG is served
+        response = get_image(images.url('/photo.jpg'), accept='image/*')
+        assert response['Content-Type'] == 'image/jpeg'
+        assert images.hits == {'/photo.jpg': 1}
+
+    def test_transparency(self, images):
+        response = get_image(images.url('/logo.png'), size='thumb', format='webp')
+        image = Image.open(BytesIO(b''.join(response.streaming_content)))
+        assert image.mode == 'RGBA'
+        assert image.size == (160, 160)
+
+        response = get_image(images.url('/logo.png'), size='thumb', format='jpeg')
+        assert Image.open(BytesIO(b''.join(response.streaming_content))).mode == 'RGB'
+
+    def test_conditional_and_content_addressed(self, images, image_settings):
+        response = get_image(images.url('/photo.jpg'), format='webp')
+        etag = response['ETag']
+        url = images.url('/photo.jpg')
+        response = Client().get(
+            reverse('image-proxy'), {'url': url, 'sig': sign_url(url), 'format': 'webp'}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+        # The same bytes under another URL share the stored file
+        assert get_image(images.url('/copy.jpg'), format='webp')['ETag'] == etag
+        blobs = [name for _, _, names in os.walk(image_settings['CACHE_DIR'] / 'blobs') for name in names]
+        assert len(blobs) == 4
+
+    def test_redirect(self, images):
+        response = get_image(images.url('/moved'), format='jpeg')
+        assert response.status_code == 200
+        assert images.hits == {'/moved': 1, '/photo.jpg': 1}
+
+    @pytest.mark.parametrize('path', ['/missing.jpg', '/page.html', '/huge.jpg'])
+    def test_upstream_failures_are_remembered(self, images, path):
+        assert get_image(images.url(path)).status_code == 502
+        assert get_image(images.url(path)).status_code == 502
+        assert images.hits == {path: 1}
+
+    @pytest.mark.parametrize('params', [
+        {'url': ''},
+        {'url': 'https://example.com/a.jpg', 'size': 'poster'},
+        {'url': 'https://example.com/a.jpg', 'format': 'gif'},
+        {'url': 'file:///etc/passwd'},
+    ])
+    def test_bad_requests(self, image_settings, params):
+        response = Client().get(reverse('image-proxy'), {**params, 'sig': sign_url(params['url'])})
+        assert response.status_code == 400
+
+    @pytest.mark.django_db
+    def test_only_signed_urls_and_article_images_are_fetched(self, images):
+        url = images.url('/photo.jpg')
+        assert get_image(url, signed=False).status_code == 403
+        assert get_image(url, sig=sign_url(images.url('/logo.png'))).status_code == 403
+        assert images.hits == {}
+
+        Article.objects.create(
+            title='Photo', url='https://example.com/photo', image=url,
+            published_at=datetime(2026, 1, 1, tzinfo=timezone.utc), source='Example',
+        )
+        assert get_image(url, signed=False).status_code == 200
+        assert images.hits == {'/photo.jpg': 1}
+
+    def test_private_hosts_are_refused(self, images, settings):
+        settings.IMAGE_PROXY = {**settings.IMAGE_PROXY, 'ALLOW_PRIVATE_HOSTS': False}
+        assert get_image(images.url('/photo.jpg')).status_code == 400
+        assert images.hits == {}
+
+@pytest.mark.django_db
+def test_feed_articles_link_to_the_proxy(images, monkeypatch):
+    service = MediastackService()
+    monkeypatch.setattr(ArticlesView, 'mediastack_service', service)
+    monkeypatch.setattr(service, 'get_articles', lambda **kwargs: {'data': [{
+        'title': 'Photo', 'url': 'https://example.com/photo', 'image': images.url('/photo.jpg'),
+        'source': 'Example', 'published_at': '2025-03-15T22:00:00+00:00',
+    }]})
+    article = Client().get(reverse('articles')).json()['articles'][0]
+    # Upstream articles aren't stored, so only the signature lets the proxy fetch them
+    assert not Article.objects.exists()
+    response = Client().get(f"{article['image_proxy']}&size=thumb", HTTP_ACCEPT='image/webp')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'image/webp'
+    assert images.hits == {'/photo.jpg': 1}
+
+def test_concurrent_misses_share_one_fetch(images, monkeypatch):
+    url = images.url('/photo.jpg')
+    fetched = []
+
+    def slow_fetch(url):
+        fetched.append(url)
+        time.sleep(0.1)
+        return fetch(url)
+
+    monkeypatch.setattr(images_module, 'fetch', slow_fetch)
+    results = []
+
+    def request(delay):
+        time.sleep(delay)
+        results.append(get_variant(url, 'card', 'webp', signature=sign_url(url)))
+
+    # Some arrive while the first fetch runs, some as it finishes
+    threads = [threading.Thread(target=request, args=(i * 0.02,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fetched) == 1
+    assert len(set(results)) == 1 and len(results) == 8
+    assert images_module._inflight == {}
+
+def test_check_url(settings):
+    settings.IMAGE_PROXY = {**settings.IMAGE_PROXY, 'ALLOW_PRIVATE_HOSTS': False}
+    for url in ['http://127.0.0.1/a.jpg', 'http://10.0.0.1/a.jpg', 'http://[::1]/a.jpg', 'http://h:99999/']:
+        with pytest.raises(ImageURLError):
+            check_url(url)
+    assert check_url('http://93.184.216.34/a.jpg') == '93.184.216.34'
+
+def test_fetch_connects_to_the_checked_address(images, monkeypatch):
+    # A host that resolves to the fixture server once, then somewhere unreachable
+    resolve = socket.getaddrinfo
+    lookups = []
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host != 'images.test':
+            return resolve(host, *args, **kwargs)
+        lookups.append(host)
+        address = '127.0.0.1' if len(lookups) == 1 else '192.0.2.1'
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (address, 0))]
+
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+    assert fetch(f'http://images.test:{images.server.server_port}/photo.jpg') == PHOTO
+    assert lookups == ['images.test']
+
+class TestImageCache:
+    def test_least_recently_used_are_evicted(self, tmp_path):
+        image_cache = ImageCache(tmp_path, max_bytes=2500)
+        for name in ('a', 'b'):
+            image_cache.put(url_key(name), {('card', 'webp'): name.encode() * 1000})
+        # a was stored first, but reading it makes b the least recently used
+        for age, name in enumerate('ab', 1):
+            os.utime(image_cache.get(url_key(name), 'card', 'webp')[1], ns=(age, age))
+            os.utime(image_cache._ref_path(url_key(name), 'card', 'webp'), ns=(age, age))
+        assert image_cache.get(url_key('a'), 'card', 'webp') is not None
+
+        image_cache.put(url_key('c'), {('card', 'webp'): b'c' * 1000})
+        assert image_cache.get(url_key('b'), 'card', 'webp') is None
+        assert image_cache.get(url_key('a'), 'card', 'webp') is not None
+        assert image_cache.get(url_key('c'), 'card', 'webp') is not None
+
+    def test_directory_is_only_walked_over_the_bound(self, tmp_path, monkeypatch):
+        image_cache = ImageCache(tmp_path, max_bytes=10_000)
+        walks = []
+        files = ImageCache._files
+        monkeypatch.setattr(ImageCache, '_files', lambda self: walks.append(1) or files(self))
+        for name in 'abcd':
+            image_cache.put(url_key(name), {('card', 'webp'): name.encode() * 2000})
+        # Once to learn the size, then never while under the bound
+        assert len(walks) == 1
+
+        image_cache.put(url_key('e'), {('card', 'webp'): b'e' * 2000})
+        assert len(walks) == 2
+        assert images_module._sizes[image_cache.directory] <= 9_000
+        assert image_cache.get(url_key('a'), 'card', 'webp') is None
+        assert image_cache.get(url_key('e'), 'card', 'webp') is not None
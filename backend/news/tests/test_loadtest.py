@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timezone
+from news.benchmarks.upstream import StubUpstream
+from news.loadtest import percentile, run_load_test, summarize
+from news.models import Article
+from news.views import ArticlesView
+
+class TestSummaries:
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+        assert percentile([7], 0.99) == 7
+        assert percentile([], 0.5) is None
+
+    def test_summarize(self):
+        samples = [('articles', 0.010, True), ('articles', 0.030, False), ('articles', 0.020, True)]
+        stats = summarize(samples, elapsed=2.0)
+        assert stats['requests'] == 3
+        assert stats['errors'] == 1
+        assert stats['throughput'] == 1.5
+        assert stats['p50_ms'] == pytest.approx(20)
+        assert stats['max_ms'] == pytest.approx(30)
+
+@pytest.mark.django_db(transaction=True)
+def test_run_load_test_against_live_server(live_server, settings):
+    settings.MEDIASTACK_API_KEY = 'test'
+    ArticlesView.mediastack_service = None
+    article = Article.objects.create(
+        title='Test Article', url='https://example.com/article',
+        published_at=datetime(2025, 3, 15, tzinfo=timezone.utc), source='Test Source'
+    )
+
+    steps = []
+    with StubUpstream() as upstream:
+        results = run_load_test(
+            live_server.url, steps=[1, 2], duration=0.5, article_ids=[article.id], on_step=steps.append
+        )
+
+    assert [step['concurrency'] for step in results['steps']] == [1, 2]
+    assert steps == results['steps']
+    for step in results['steps']:
+        assert step['overall']['requests'] > 0
+        assert step['overall']['errors'] == 0
+        assert step['overall']['p99_ms'] >= step['overall']['p50_ms']
+        # No simulator stats URL given
+        assert step['upstream_calls'] is None
+    assert upstream.calls > 0
@@ -0,0 +1,138 @@
+import threading
+import time
+import pytest
+from collections import Counter
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.profiling import ProfileStore, SamplingProfiler, make_token, token_is_valid
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILING_STORAGE_DIR = tmp_path / 'profiles'
+    settings.PROFILING_INTERVAL = 0.001
+    return settings.PROFILING_STORAGE_DIR
+
+class TestSamplingProfiler:
+    def test_collects_collapsed_stacks(self):
+        profiler = SamplingProfiler(threading.get_ident(), 0.001)
+        profiler.start()
+        busy_loop(0.1)
+        samples = profiler.stop()
+
+        assert sum(samples.values()) > 0
+        stack = samples.most_common(1)[0][0]
+        frames = stack.split(';')
+        assert frames[-1].startswith('busy_loop (test_profiling.py:')
+        assert any(frame.startswith('test_collects_collapsed_stacks ') for frame in frames)
+
+class TestTokens:
+    def test_valid_token(self):
+        assert token_is_valid(make_token())
+
+    def test_tampered_token(self):
+        assert not token_is_valid(make_token() + 'x')
+        assert not token_is_valid('profile')
+
+    def test_expired_token(self, settings):
+        token = make_token()
+        settings.PROFILING_TOKEN_MAX_AGE = -1
+        assert not token_is_valid(token)
+
+class TestProfileStore:
+    def test_save_and_list(self, tmp_path):
+        store = ProfileStore(tmp_path, max_stored=10)
+        store.save('a' * 32, Counter({'main;handler': 3, 'main': 1}), {'path': '/api/articles/'})
+
+        assert store.list() == [{'path': '/api/articles/', 'request_id': 'a' * 32}]
+        with open(store.folded_path('a' * 32)) as f:
+            assert f.read() == 'main;handler 3\nmain 1\n'
+
+    def test_retention(self, tmp_path):
+        store = ProfileStore(tmp_path, max_stored=2)
+        for char in 'abc':
+            store.save(char * 32, Counter({'main': 1}), {})
+            time.sleep(0.01)
+
+        assert [profile['request_id'] for profile in store.list()] == ['c' * 32, 'b' * 32]
+        assert store.folded_path('a' * 32) is None
+        assert len(list(tmp_path.iterdir())) == 4
+
+    def test_rejects_path_traversal(self, tmp_path):
+        store = ProfileStore(tmp_path)
+        with pytest.raises(ValueError):
+            store.folded_path('../settings')
+
+@pytest.mark.django_db
+class TestSamplingProfilerMiddleware:
+    def test_not_profiled_by_default(self, profile_dir):
+        response = APIClient().get(reverse('bias-sources'))
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+        assert ProfileStore().list() == []
+
+    def test_profiled_with_token(self, profile_dir):
+        response = APIClient().get(reverse('bias-sources'), HTTP_X_PROFILE=make_token())
+        profile_id = response['X-Profile-Id']
+
+        profiles = ProfileStore().list()
+        assert len(profiles) == 1
+        assert profiles[0]['request_id'] == profile_id
+        assert profiles[0]['path'] == '/api/bias-sources/'
+        assert profiles[0]['status'] == 200
+        assert profiles[0]['trigger'] == 'token'
+
+    def test_invalid_token_is_ignored(self, profile_dir):
+        response = APIClient().get(reverse('bias-sources'), HTTP_X_PROFILE='forged')
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+
+    def test_sample_rate(self, profile_dir, settings):
+        settings.PROFILING_SAMPLE_RATE = 1.0
+        response = APIClient().get(reverse('bias-sources'))
+        assert 'X-Profile-Id' in response
+        assert ProfileStore().list()[0]['trigger'] == 'sample'
+
+@pytest.mark.django_db
+class TestProfileView:
+    @pytest.fixture
+    def profile_id(self, profile_dir):
+        return APIClient().get(reverse('bias-sources'), HTTP_X_PROFILE=make_token())['X-Profile-Id']
+
+    @pytest.fixture
+    def admin_client(self):
+        client = APIClient()
+        client.force_login(User.objects.create_user('admin', password='secret', is_staff=True))
+        return client
+
+    def test_requires_staff(self, profile_id):
+        assert APIClient().get(reverse('profiles')).status_code == 403
+
+        client = APIClient()
+        client.force_login(User.objects.create_user('reader', password='secret'))
+        assert client.get(reverse('profiles')).status_code == 403
+        assert client.get(reverse('profile-detail', args=[profile_id])).status_code == 403
+
+    def test_list(self, admin_client, profile_id):
+        response = admin_client.get(reverse('profiles'))
+        assert response.status_code == 200
+        assert [profile['request_id'] for profile in response.json()] == [profile_id]
+
+    def test_download(self, admin_client, profile_id):
+        response = admin_client.get(reverse('profile-detail', args=[profile_id]))
+        assert response.status_code == 200
+        assert response['Content-Disposition'] == f'attachment; filename="{profile_id}.folded"'
+        for line in b''.join(response.streaming_content).decode().splitlines():
+            stack, count = line.rsplit(' ', 1)
+            assert int(count) > 0
+
+    def test_download_unknown(self, admin_client, profile_dir):
+        assert admin_client.get(reverse('profile-detail', args=['f' * 32])).status_code == 404
+        assert admin_client.get(reverse('profile-detail', args=['nope'])).status_code == 404
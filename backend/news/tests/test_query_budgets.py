@@ -0,0 +1,143 @@
+import io
+import pytest
+from datetime import datetime, timedelta, timezone
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.benchmarks.upstream import StubUpstream
+from news.models import Article, UserInteraction
+from news.sources import get_resolver
+from news.testing import anonymous_id, assert_query_budget
+from news.views import ArticlesView
+
+@pytest.fixture
+def bias_data():
+    call_command('initialize_bias_data', stdout=io.StringIO())
+    get_resolver()
+
+@pytest.fixture
+def articles():
+    published_at = datetime(2025, 3, 15, tzinfo=timezone.utc)
+    return Article.objects.bulk_create([
+        Article(
+            title=f'Article {i}', url=f'https://example.com/{i}', published_at=published_at - timedelta(minutes=i),
+            source=('CNN', 'BBC', 'Reuters')[i % 3], category=('general', 'sports')[i % 2]
+        )
+        for i in range(30)
+    ])
+
+@pytest.fixture
+def upstream(settings):
+    settings.MEDIASTACK_API_KEY = 'test'
+    ArticlesView.mediastack_service = None
+    with StubUpstream() as stub:
+        yield stub
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    def test_articles(self, bias_data, upstream):
+        with assert_query_budget('articles'):
+            response = APIClient().get(reverse('articles'), {'limit': 100})
+        assert response.status_code == 200
+        assert len(response.data['articles']) == 100
+
+    def test_personalized_does_not_grow_with_history(self, bias_data, articles, upstream):
+        client = APIClient()
+        with assert_query_budget('personalized'):
+            assert client.get(reverse('personalized')).status_code == 200
+
+        session_id = anonymous_id(client)
+        UserInteraction.objects.bulk_create([
+            UserInteraction(session_id=session_id, article=articles[i % len(articles)], interaction_type='view')
+            for i in range(300)
+        ])
+        with assert_query_budget('personalized'):
+            assert client.get(reverse('personalized'), {'limit': 50}).status_code == 200
+
+    def test_preferences(self, django_assert_num_queries):
+        client = APIClient()
+        with assert_query_budget('preferences'):
+            assert client.get(reverse('preferences')).status_code == 200
+        # Repeat visits are served from the preference cache
+        with django_assert_num_queries(0):
+            assert client.get(reverse('preferences')).status_code == 200
+
+    def test_interaction(self, articles):
+        with assert_query_budget('interaction'):
+            response = APIClient().post(
+                reverse('interaction'), {'article_id': articles[0].id, 'interaction_type': 'like'}, format='json'
+            )
+        assert response.status_code == 201
+
+    def test_bias_sources(self, bias_data):
+        with assert_query_budget('bias-sources'):
+            response = APIClient().get(reverse('bias-sources'))
+        assert len(response.data) == 20
+        with assert_query_budget('bias-source-detail'):
+            assert APIClient().get(reverse('bias-source-detail', args=['cnn'])).status_code == 200
+
+    def test_bias_analytics(self, articles):
+        call_command('rebuild_bias_rollups', stdout=io.StringIO())
+        with assert_query_budget('bias-analytics'):
+            response = APIClient().get(
+                reverse('bias-analytics'), {'start': '2025-03-01', 'end': '2025-04-01', 'group_by': 'source'}
+            )
+        assert sum(bucket['article_count'] for bucket in response.data['buckets']) == 30
+
+    def test_trending(self, articles):
+        from news import trending
+        for article in articles[:20]:
+            trending.engine.record(article.id, 'view')
+        trending.engine.checkpoint()
+        with assert_query_budget('trending'):
+            response = APIClient().get(reverse('trending'), {'limit': 20})
+        assert len(response.data['articles']) == 20
+
+    # Sections run on pool threads, which need committed data
+    @pytest.mark.django_db(transaction=True)
+    def test_home(self, bias_data, upstream):
+        with assert_query_budget('home'):
+            response = APIClient().get(reverse('home'))
+        assert response.status_code == 200
+        assert response.data['errors'] == {}
+
+    def test_budget_overrun_fails(self, bias_data):
+        with pytest.raises(AssertionError, match="over its budget of 1"):
+            with assert_query_budget('bias-sources'):
+                APIClient().get(reverse('bias-sources'))
+                APIClient().get(reverse('bias-sources'))
+
+@pytest.mark.django_db
+def test_query_count_headers_in_debug(settings, bias_data):
+    from news import metrics
+    metrics.reset()
+
+    settings.DEBUG = True
+    response = APIClient().get(reverse('bias-sources'))
+    assert response['X-DB-Query-Count'] == '1'
+    assert float(response['X-DB-Query-Time-Ms']) >= 0
+
+    settings.DEBUG = False
+    response = APIClient().get(reverse('bias-sources'))
+    assert 'X-DB-Query-Count' not in response
+
+    summaries = metrics.snapshot()['summaries']
+    assert summaries['db.queries.bias-sources'] == {'count': 2, 'sum': 2, 'max': 1}
+    assert summaries['db.time_ms.bias-sources']['count'] == 2
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_query_counts(bias_data):
+    from django.contrib.auth.models import User
+    from news import metrics
+    metrics.reset()
+
+    APIClient().get(reverse('bias-sources'))
+    assert APIClient().get(reverse('metrics')).status_code == 403
+
+    admin = APIClient()
+    admin.force_login(User.objects.create_user('admin', password='secret', is_staff=True))
+    response = admin.get(reverse('metrics'))
+    assert response.status_code == 200
+    assert response.data['summaries']['db.queries.bias-sources'] == {'count': 1, 'sum': 1, 'max': 1, 'mean': 1.0}
+    assert 'db.time_ms.bias-sources' in response.data['summaries']
+    assert set(response.data['cache']) >= {'l1_hits', 'l2_hits', 'misses', 'hit_ratio'}
@@ -0,0 +1,115 @@
+import io
+import pytest
+from datetime import datetime, timezone
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.models import Article, RelatedArticle, UserInteraction
+from news.recommendations import build_related_articles, interaction_matrix, top_neighbors
+from news.services import UserPreferenceService
+
+@pytest.fixture
+def articles():
+    published_at = datetime(2025, 3, 15, tzinfo=timezone.utc)
+    return [
+        Article.objects.create(
+            title=f'Article {i}', url=f'https://example.com/{i}', published_at=published_at, source='CNN'
+        )
+        for i in range(5)
+    ]
+
+def view(visitor, article, interaction_type='view'):
+    UserInteraction.objects.create(session_id=visitor, article=article, interaction_type=interaction_type)
+
+@pytest.fixture
+def interactions(articles):
+    a0, a1, a2, a3, a4 = articles
+    # a0 and a1 are read together by three visitors, a0 and a2 by two, a3 by one reader of a0
+    for visitor in ['v1', 'v2', 'v3']:
+        view(visitor, a0)
+        view(visitor, a1)
+    for visitor in ['v4', 'v5']:
+        view(visitor, a0)
+        view(visitor, a2)
+    view('v1', a3)
+    view('v1', a1, 'like')
+    view('v6', a4, 'dislike')
+    view('v7', a4, 'dislike')
+    view('v6', a0)
+    view('v7', a0)
+
+@pytest.mark.django_db
+class TestBuildRelatedArticles:
+    def test_matrix(self, interactions, articles):
+        matrix, article_ids = interaction_matrix(datetime(2000, 1, 1, tzinfo=timezone.utc))
+        assert matrix.shape == (7, 4)
+        # Repeated interactions count once; dislikes not at all
+        assert matrix.sum() == 13
+        assert articles[4].id not in article_ids
+
+    def test_neighbors(self, interactions, articles):
+        a0, a1, a2, a3, a4 = articles
+        assert build_related_articles(top_k=5, window_days=3650, min_cooccurrence=2) == 4
+
+        neighbors = {
+            (row.article_id, row.rank): (row.related_id, row.score) for row in RelatedArticle.objects.all()
+        }
+        # a0 has 7 readers, a1 3 (all shared), a2 2 (all shared): cosine 3/sqrt(21) and 2/sqrt(14)
+        assert neighbors[(a0.id, 1)] == (a1.id, round(3 / 21 ** 0.5, 6))
+        assert neighbors[(a0.id, 2)] == (a2.id, round(2 / 14 ** 0.5, 6))
+        assert neighbors[(a1.id, 1)] == (a0.id, round(3 / 21 ** 0.5, 6))
+        assert neighbors[(a2.id, 1)] == (a0.id, round(2 / 14 ** 0.5, 6))
+        # a3 shares a single reader with anything
+        assert not RelatedArticle.objects.filter(article=a3).exists()
+
+    def test_top_k(self, interactions, articles):
+        build_related_articles(top_k=1, window_days=3650, min_cooccurrence=1)
+        assert list(
+            RelatedArticle.objects.filter(article=articles[0]).values_list('related_id', flat=True)
+        ) == [articles[1].id]
+
+    def test_empty(self):
+        assert build_related_articles() == 0
+
+    def test_command_replaces_table(self, interactions):
+        build_related_articles(top_k=5, window_days=3650, min_cooccurrence=1)
+        out = io.StringIO()
+        call_command('build_related_articles', '--window-days', '3650', stdout=out)
+        assert 'Stored 4 related articles' in out.getvalue()
+        assert RelatedArticle.objects.count() == 4
+
+@pytest.mark.django_db
+class TestRelatedArticlesView:
+    def test_related(self, interactions, articles, django_assert_num_queries):
+        build_related_articles(top_k=5, window_days=3650, min_cooccurrence=2)
+        with django_assert_num_queries(1):
+            response = APIClient().get(reverse('related-articles', args=[articles[0].id]))
+        assert response.status_code == 200
+        assert [article['id'] for article in response.data['related']] == [articles[1].id, articles[2].id]
+        assert response.data['related'][0]['url'] == 'https://example.com/1'
+
+        response = APIClient().get(reverse('related-articles', args=[articles[0].id]), {'limit': 1})
+        assert len(response.data['related']) == 1
+
+    @pytest.mark.parametrize('limit', ['-1', '0', 'five'])
+    def test_invalid_limit(self, articles, limit):
+        response = APIClient().get(reverse('related-articles', args=[articles[0].id]), {'limit': limit})
+        assert response.status_code == 400
+
+    def test_without_neighbors(self, articles):
+        response = APIClient().get(reverse('related-articles', args=[articles[3].id]))
+        assert response.status_code == 200
+        assert response.data['related'] == []
+        assert APIClient().get(reverse('related-articles', args=[999999])).status_code == 404
+
+@pytest.mark.django_db
+class TestPersonalizationSignal:
+    def test_related_articles_are_boosted(self, interactions, articles):
+        build_related_articles(top_k=5, window_days=3650, min_cooccurrence=2)
+        view('reader', articles[2])
+        feed = [
+            {'url': 'https://example.com/elsewhere', 'published_at': '2025-03-16T00:00:00'},
+            {'url': articles[0].url, 'published_at': '2025-03-15T00:00:00'},
+        ]
+        ordered = UserPreferenceService()._personalize_article_order(feed, session_id='reader')
+        assert [article['url'] for article in ordered] == [articles[0].url, 'https://example.com/elsewhere']
@@ -0,0 +1,85 @@
+import pickle
+import pytest
+from datetime import datetime, timezone
+from rest_framework.renderers import JSONRenderer
+from urllib.parse import urlencode
+from news.images import sign_url
+from news.records import FIELDS, ArticleRecord
+from news.renderers import FastJSONRenderer
+from news.services import MediastackService
+
+def article(**overrides):
+    data = {
+        'title': 'Test Article',
+        'description': 'Test Description',
+        'url': 'https://example.com/article',
+        'image': None,
+        'published_at': datetime(2025, 3, 15, 22, 0, tzinfo=timezone.utc),
+        'source': 'Test Source',
+        'category': 'technology',
+        'country': 'US',
+        'bias_score': -0.3,
+        'reliability_score': 0.85,
+        'image_proxy': None
+    }
+    data.update(overrides)
+    return data
+
+def fresh(value):
+    # A distinct string object, as decoding each upstream article produces
+    return ''.join(list(value))
+
+class TestArticleRecord:
+    def test_mapping(self):
+        record = ArticleRecord(**article())
+        assert record == article()
+        assert dict(record) == article()
+        assert list(record) == list(FIELDS)
+        assert record['source'] == record.get('source') == 'Test Source'
+        assert 'source' in record and 'id' not in record
+        assert record.get('id', 'missing') == 'missing'
+        with pytest.raises(KeyError):
+            record['id']
+        assert not hasattr(record, '__dict__')
+
+    def test_from_mapping_drops_other_keys(self):
+        assert ArticleRecord.from_mapping({**article(), 'id': 1}) == article()
+        assert ArticleRecord.from_mapping({'title': 'Only a title'})['source'] is None
+
+    def test_repeated_strings_are_shared(self):
+        first = ArticleRecord(**article(source=fresh('Some Source'), category=fresh('sports')))
+        second = ArticleRecord(**article(source=fresh('Some Source'), category=fresh('sports')))
+        assert first.source is second.source
+        assert first.category is second.category
+
+    def test_pickle_round_trip(self):
+        records = [ArticleRecord(**article(title=f'Article {i}')) for i in range(3)]
+        loaded = pickle.loads(pickle.dumps(records, pickle.HIGHEST_PROTOCOL))
+        assert loaded == records
+        assert all(type(record) is ArticleRecord for record in loaded)
+        assert loaded[0].source is loaded[1].source
+
+    def test_renders_like_a_dict(self):
+        payload = {
+            'articles': [ArticleRecord(**article()), ArticleRecord(**article(published_at=None, bias_score=None))],
+            'pagination': {'offset': 0, 'limit': 25, 'total': 2},
+        }
+        expected = JSONRenderer().render({**payload, 'articles': [dict(a) for a in payload['articles']]})
+        assert FastJSONRenderer().render(payload) == expected
+        assert JSONRenderer().render(payload) == expected
+
+def test_format_article_data_returns_record():
+    formatted = MediastackService().format_article_data({
+        'title': 'Test', 'url': 'https://example.com/test', 'source': fresh('BBC'),
+        'category': 'general', 'country': 'gb', 'published_at': '2025-03-15T22:00:00+00:00'
+    })
+    assert type(formatted) is ArticleRecord
+    assert formatted['country'] == 'GB'
+    assert formatted.source is ArticleRecord(source=fresh('BBC')).source
+    assert formatted['image_proxy'] is None
+
+def test_format_article_data_signs_the_image():
+    image = 'https://cdn.example.com/a b.jpg'
+    formatted = MediastackService().format_article_data({'title': 'Test', 'image': image})
+    assert formatted['image_proxy'] == f"/api/img/?{urlencode({'url': image, 'sig': sign_url(image)})}"
+
@@ -0,0 +1,114 @@
+import io
+import uuid
+import pytest
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from news.models import BiasSource
+from news.parsers import FastJSONParser
+from news.renderers import FastJSONRenderer
+from news.serializers import ArticleSerializer, BiasSourceSerializer
+from news.services import MediastackService
+
+def article(**overrides):
+    data = {
+        'title': 'Test Article',
+        'description': 'Test Description',
+        'url': 'https://example.com/article',
+        'image': 'https://example.com/image.jpg',
+        'published_at': datetime(2025, 3, 15, 22, 0, tzinfo=timezone.utc),
+        'source': 'Test Source',
+        'category': 'technology',
+        'country': 'US',
+        'bias_score': -0.3,
+        'reliability_score': 0.85
+    }
+    data.update(overrides)
+    return data
+
+PAYLOADS = [
+    {'articles': [article(), article(bias_score=None, reliability_score=None)],
+     'pagination': {'offset': 0, 'limit': 25, 'total': 100}},
+    article(published_at=datetime(2025, 3, 15, 22, 0, 0, 123456, tzinfo=timezone.utc)),
+    article(published_at=datetime(2025, 3, 15, 22, 0, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+    article(published_at=datetime(2025, 3, 15, 22, 0)),
+    article(published_at=None),
+    {'bias_score': Decimal('0.30'), 'reliability_score': Decimal('0.950')},
+    {'bias_score': 0.6, 'scores': [-1.0, -0.6, 0.0, 0.3, 1.0, 0.123456789, 0.1 + 0.2]},
+    {'id': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    {'day': date(2025, 3, 15), 'at': time(12, 30, 15, 500), 'duration': timedelta(minutes=5)},
+    {'title': 'Ünïcödé — “quotes” 日本語 🎉', 'control': 'tab\tnewline\nquote"backslash\\\x00\x1f\x7f'},
+    {'title': 'line separator paragraph'},
+    {'nested': {'tuple': (1, 2), 'empty': [], 'none': None, 'bool': True, 'big': 2 ** 62}},
+    [],
+    {},
+    'plain string',
+]
+
+class TestFastJSONRenderer:
+    @pytest.mark.parametrize('data', PAYLOADS)
+    def test_byte_identical(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize('data', [
+        {1: 'integer key'},
+        {'huge': 2 ** 70},
+    ])
+    def test_falls_back_for_values_orjson_rejects(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_lone_surrogate_raises_like_stock_renderer(self):
+        data = {'surrogate': '\ud800'}
+        with pytest.raises(UnicodeEncodeError):
+            JSONRenderer().render(data)
+        with pytest.raises(UnicodeEncodeError):
+            FastJSONRenderer().render(data)
+
+    def test_indent_falls_back(self):
+        data = {'articles': [article()]}
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(data, media_type) == JSONRenderer().render(data, media_type)
+
+    def test_none_renders_empty(self):
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_aware_time_raises_like_stock_renderer(self):
+        data = {'at': time(12, 0, tzinfo=timezone.utc)}
+        with pytest.raises(ValueError):
+            JSONRenderer().render(data)
+        with pytest.raises(ValueError):
+            FastJSONRenderer().render(data)
+
+    def test_formatted_article(self):
+        formatted = MediastackService().format_article_data({
+            'title': 'Test', 'url': 'https://example.com', 'source': 'Nowhere',
+            'published_at': '2025-03-15T22:00:00+00:00', 'country': 'us'
+        })
+        serializer = ArticleSerializer(data=formatted)
+        assert serializer.is_valid()
+        data = serializer.validated_data
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.django_db
+    def test_serializer_output(self):
+        BiasSource.objects.create(source_name='BBC', bias_rating='center', reliability_score=0.9)
+        BiasSource.objects.create(source_name='Unrated')
+        data = BiasSourceSerializer(BiasSource.objects.all(), many=True).data
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+class TestFastJSONParser:
+    @pytest.mark.parametrize('body', [
+        b'{"article_id": 1, "interaction_type": "like"}',
+        b'{"interests": ["politics", "\\u00fc\\u2028"], "n": 1.5e-7, "big": 123456789012345678901234567890}',
+        '{"title": "Ünïcödé 日本語"}'.encode('utf-8'),
+        b'[]',
+    ])
+    def test_matches_json_parser(self, body):
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.parametrize('body', [b'{"a": ', b'{"a": NaN}', b''])
+    def test_invalid_json_raises_parse_error(self, body):
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(body))
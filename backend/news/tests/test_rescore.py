@@ -0,0 +1,245 @@
+import io
+import json
+import pytest
+from datetime import datetime, timezone
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models.query import QuerySet
+from django.test.utils import CaptureQueriesContext
+from news.catalog import load_catalog
+from news.models import Article, BiasSource, RescoreJob
+from unittest.mock import patch
+from news import rescoring
+from news.rescoring import batched_rescoring, feed_tags, run_job, run_pending_jobs, source_tag
+from news.sources import get_resolver
+from news.tiered_cache import tiered_cache
+
+PUBLISHED_AT = datetime(2025, 3, 15, tzinfo=timezone.utc)
+
+@pytest.fixture
+def sources():
+    cnn = BiasSource.objects.create(source_name='CNN', bias_rating='center_left', reliability_score=0.7)
+    bbc = BiasSource.objects.create(source_name='BBC', bias_rating='center', reliability_score=0.9)
+    # Jobs for the new sources have nothing to do yet
+    run_pending_jobs()
+    return cnn, bbc
+
+def add_articles(source, count, bias_source=None, bias_score=None):
+    Article.objects.bulk_create([
+        Article(
+            title=f'{source} {i}', url=f'https://example.com/{source}/{i}', published_at=PUBLISHED_AT,
+            source=source, bias_source=bias_source, bias_score=bias_score
+        )
+        for i in range(count)
+    ])
+
+def scores(source):
+    return set(Article.objects.filter(source=source).values_list('bias_score', 'reliability_score'))
+
+@pytest.mark.django_db
+class TestRescoreOnRatingChange:
+    def test_rating_change_queues_job(self, sources):
+        cnn, bbc = sources
+        add_articles('CNN', 5, cnn, -0.3)
+        add_articles('BBC', 3, bbc, 0.0)
+
+        cnn.description = 'Cable News Network'
+        cnn.save()
+        assert not RescoreJob.objects.filter(status='pending').exists()
+
+        cnn.bias_rating = 'left'
+        cnn.reliability_score = 0.6
+        cnn.save()
+        job = RescoreJob.objects.get(status='pending')
+        assert job.source_ids == [cnn.id]
+
+        run_job(job, chunk_size=2)
+        assert job.status == 'done'
+        assert job.updated_count == 5
+        assert scores('CNN') == {(-0.6, 0.6)}
+        assert scores('BBC') == {(0.0, None)}
+
+    def test_new_source_links_stored_articles(self, sources):
+        add_articles('Le Monde', 2)
+        add_articles('lemonde.fr', 1)
+
+        le_monde = BiasSource.objects.create(source_name='Le Monde', bias_rating='center_left', reliability_score=0.85)
+        le_monde.aliases.create(alias='lemonde.fr')
+        run_pending_jobs()
+
+        assert Article.objects.filter(bias_source=le_monde).count() == 3
+        assert scores('Le Monde') == scores('lemonde.fr') == {(-0.3, 0.85)}
+
+    def test_one_update_per_chunk(self, sources):
+        cnn, _ = sources
+        add_articles('CNN', 10, cnn)
+        job = RescoreJob.objects.create(source_ids=[cnn.id], linked=True)
+        with CaptureQueriesContext(connection) as context:
+            run_job(job, chunk_size=4)
+        article_updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE "news_article"')]
+        assert len(article_updates) == 3
+        assert job.cursor == Article.objects.latest('id').id
+        assert scores('CNN') == {(-0.3, 0.7)}
+
+    def test_resumes_from_cursor(self, sources):
+        cnn, _ = sources
+        add_articles('CNN', 6, cnn)
+        ids = list(Article.objects.order_by('id').values_list('id', flat=True))
+        # A job interrupted after the first three articles
+        job = RescoreJob.objects.create(source_ids=[cnn.id], status='running', linked=True, cursor=ids[2], updated_count=3)
+
+        run_pending_jobs()
+        job.refresh_from_db()
+        assert job.status == 'done'
+        assert job.updated_count == 6
+        assert Article.objects.filter(id__in=ids[:3], bias_score__isnull=True).count() == 3
+        assert Article.objects.filter(id__in=ids[3:], bias_score=-0.3).count() == 3
+
+    def test_deleting_source_clears_scores(self, sources):
+        cnn, _ = sources
+        add_articles('CNN', 2, cnn, -0.3)
+        cnn.delete()
+        assert scores('CNN') == {(None, None)}
+
+@pytest.mark.django_db
+class TestFeedInvalidation:
+    def test_only_affected_feeds_are_invalidated(self, sources):
+        cnn, bbc = sources
+        add_articles('CNN', 1, cnn, -0.3)
+        tags = feed_tags([{'source': 'CNN'}, {'source': 'cnn.com'}, {'source': 'Local Herald'}])
+        assert tags == {source_tag(cnn.id)}
+        tiered_cache.set('cnn_feed', 'cnn', timeout=300, tags=tags)
+        tiered_cache.set('bbc_feed', 'bbc', timeout=300, tags=feed_tags([{'source': 'BBC'}]))
+
+        cnn.bias_rating = 'left'
+        cnn.save()
+        run_pending_jobs()
+
+        assert tiered_cache.get('cnn_feed') is None
+        assert tiered_cache.get('bbc_feed') == 'bbc'
+
+@pytest.mark.django_db
+class TestCatalogRescoring:
+    def test_catalog_changes_queue_one_job(self, sources):
+        cnn, bbc = sources
+        add_articles('CNN', 2, cnn, -0.3)
+        catalog = [
+            {'source_name': 'CNN', 'bias_rating': 'left', 'reliability_score': 0.7},
+            {'source_name': 'BBC', 'bias_rating': 'center', 'reliability_score': 0.9, 'description': 'British'},
+            {'source_name': 'Reuters', 'bias_rating': 'center', 'reliability_score': 0.9},
+        ]
+        report = load_catalog(io.StringIO(json.dumps(catalog)), 'json')
+
+        # BBC's description changed, but not its scores
+        reuters = BiasSource.objects.get(source_name='Reuters')
+        assert sorted(report.rescore_ids) == sorted([cnn.id, reuters.id])
+        get_resolver()
+        job = RescoreJob.objects.get(status='pending')
+        run_job(job)
+        assert scores('CNN') == {(-0.6, 0.7)}
+
+@pytest.mark.django_db
+class TestRescoreArticlesCommand:
+    def test_all(self, sources):
+        cnn, bbc = sources
+        add_articles('CNN', 2)
+        add_articles('bbc.com', 2)
+        out = io.StringIO()
+        call_command('rescore_articles', '--all', stdout=out)
+        assert 'Ran 1 re-scoring jobs' in out.getvalue()
+        assert scores('CNN') == {(-0.3, 0.7)}
+        assert scores('bbc.com') == {(0.0, 0.9)}
+
+@pytest.mark.django_db
+class TestLockContention:
+    def test_locked_database_leaves_job_pending(self, sources):
+        cnn, _ = sources
+        add_articles('CNN', 4, cnn)
+        job = RescoreJob.objects.create(source_ids=[cnn.id], linked=True)
+        real_update = QuerySet.update
+        calls = []
+        def update(queryset, **kwargs):
+            # The second chunk's UPDATE finds the table locked
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise OperationalError('database table is locked')
+            return real_update(queryset, **kwargs)
+
+        with patch.object(QuerySet, 'update', autospec=True, side_effect=update):
+            run_job(job, chunk_size=2)
+        job.refresh_from_db()
+        assert job.status == 'pending'
+        assert job.error is None
+        # The first chunk stays done
+        assert job.updated_count == 2
+
+        run_job(job, chunk_size=2)
+        assert job.status == 'done'
+        assert job.updated_count == 4
+
+    def test_other_errors_fail_the_job(self, sources):
+        cnn, _ = sources
+        job = RescoreJob.objects.create(source_ids=[cnn.id])
+        with patch('news.rescoring.link_articles', side_effect=OperationalError('no such column: foo')):
+            run_job(job)
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert 'no such column' in job.error
+
+@pytest.mark.django_db(transaction=True)
+class TestBackgroundRunner:
+    @pytest.fixture(autouse=True)
+    def background(self, settings):
+        settings.RESCORING = {
+            **settings.RESCORING, 'IN_BACKGROUND': True, 'RETRY_DELAY': 0.01, 'MAX_RETRY_DELAY': 0.05,
+            'MAX_ATTEMPTS': 2,
+        }
+
+    def wait_for_runner(self):
+        runner = rescoring._runner
+        if runner is not None:
+            runner.join(5)
+            assert not runner.is_alive()
+
+    def test_retries_until_done(self):
+        real_link = rescoring.link_articles
+        outcomes = [OperationalError('database is locked'), RuntimeError('flaky'), None]
+        def link(source_ids):
+            outcome = outcomes.pop(0)
+            if outcome is not None:
+                raise outcome
+            return real_link(source_ids)
+
+        with patch('news.rescoring.link_articles', side_effect=link):
+            cnn = BiasSource.objects.create(source_name='CNN', bias_rating='center_left', reliability_score=0.7)
+            self.wait_for_runner()
+        assert outcomes == []
+        assert RescoreJob.objects.get(source_ids=[cnn.id]).status == 'done'
+
+    def test_gives_up_after_max_attempts(self):
+        with patch('news.rescoring.link_articles', side_effect=RuntimeError('broken')) as link:
+            BiasSource.objects.create(source_name='CNN', bias_rating='center_left', reliability_score=0.7)
+            self.wait_for_runner()
+        assert link.call_count == 2
+        assert RescoreJob.objects.get().status == 'failed'
+
+@pytest.mark.django_db
+class TestBatchedRescoring:
+    def test_one_job_and_no_runner(self, settings):
+        settings.RESCORING = {**settings.RESCORING, 'IN_BACKGROUND': True}
+        with patch('news.rescoring.start_background_runner') as start:
+            with batched_rescoring() as batch:
+                cnn = BiasSource.objects.create(source_name='CNN', bias_rating='center_left', reliability_score=0.7)
+                bbc = BiasSource.objects.create(source_name='BBC', bias_rating='center', reliability_score=0.9)
+            assert RescoreJob.objects.get() == batch.job
+            assert batch.job.source_ids == sorted([cnn.id, bbc.id])
+        start.assert_not_called()
+
+    def test_initialize_bias_data_rescores_in_the_foreground(self, settings):
+        settings.RESCORING = {**settings.RESCORING, 'IN_BACKGROUND': True}
+        add_articles('CNN', 2)
+        with patch('news.rescoring.start_background_runner') as start:
+            call_command('initialize_bias_data', stdout=io.StringIO())
+        start.assert_not_called()
+        assert RescoreJob.objects.get().status == 'done'
+        assert scores('CNN') == {(-0.3, 0.7)}
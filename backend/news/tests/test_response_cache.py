@@ -0,0 +1,77 @@
+import gzip
+import json
+import pytest
+from unittest.mock import MagicMock
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from news.response_cache import build_payload, negotiate_encoding
+from news.services import MediastackService
+from news.views import ArticlesView
+
+@pytest.fixture
+def large_data():
+    return {
+        'articles': [{'title': f'Article {i}', 'url': f'https://example.com/{i}'} for i in range(50)],
+        'pagination': {'offset': 0, 'limit': 50, 'total': 50}
+    }
+
+class TestNegotiateEncoding:
+    factory = APIRequestFactory()
+
+    def negotiate(self, payload, accept_encoding):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return negotiate_encoding(request, payload)
+
+    def test_prefers_brotli_then_gzip(self, large_data):
+        payload = build_payload(large_data)
+        assert self.negotiate(payload, 'gzip, deflate') == 'gzip'
+        if 'br' in payload.variants:
+            assert self.negotiate(payload, 'gzip, br') == 'br'
+            assert self.negotiate(payload, 'gzip, br;q=0') == 'gzip'
+        assert self.negotiate(payload, 'identity') == 'identity'
+        assert self.negotiate(payload, '') == 'identity'
+
+    def test_small_bodies_are_not_compressed(self):
+        payload = build_payload({'articles': []})
+        assert list(payload.variants) == ['identity']
+        assert self.negotiate(payload, 'gzip, br') == 'identity'
+
+@pytest.mark.django_db
+class TestCachedArticlesResponse:
+    def setup_method(self):
+        ArticlesView.mediastack_service = None
+
+    def test_cache_hit_serves_compressed_bytes(self, large_data):
+        mock_service = MagicMock(spec=MediastackService)
+        mock_service.get_articles.return_value = {
+            'data': large_data['articles'],
+            'pagination': {'total': 50}
+        }
+        mock_service.format_article_data.side_effect = lambda article, **kwargs: {
+            'title': article['title'], 'description': None, 'url': article['url'], 'image': None,
+            'published_at': None, 'source': 'Test Source', 'category': 'general', 'country': 'US',
+            'bias_score': None, 'reliability_score': None
+        }
+        ArticlesView.mediastack_service = mock_service
+
+        client = APIClient()
+        url = reverse('articles')
+        plain = client.get(url, {'limit': '50'})
+        assert plain.status_code == status.HTTP_200_OK
+        assert 'Content-Encoding' not in plain
+
+        compressed = client.get(url, {'limit': '50'}, HTTP_ACCEPT_ENCODING='gzip')
+        assert compressed.status_code == status.HTTP_200_OK
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed['Vary']
+        assert compressed['ETag'] != plain['ETag']
+        assert gzip.decompress(compressed.content) == plain.content
+        assert len(json.loads(plain.content)['articles']) == 50
+        assert mock_service.get_articles.call_count == 1
+
+        not_modified = client.get(
+            url, {'limit': '50'}, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag']
+        )
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
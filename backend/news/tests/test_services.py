@@ -102,3 +102,91 @@ class TestMediastackService:
         assert formatted['published_at'] is None
         assert formatted['source'] is None
         assert formatted['category'] is None
+
+@pytest.mark.django_db
+class TestArticleIngestService:
+    def test_ingest_skips_known_urls(self, mock_api_response, settings, tmp_path):
+        from news.models import Article, BiasSource
+        from news.services import ArticleIngestService
+        from news.signals import articles_ingested
+
+        settings.ARTICLE_SNAPSHOT_PATH = tmp_path / 'snapshot.bin'
+        settings.CACHE_WARMING = dict(settings.CACHE_WARMING, ON_INGEST=False)
+        received = []
+        def receiver(sender, articles, **kwargs):
+            received.append(articles)
+        articles_ingested.connect(receiver)
+
+        bias_source = BiasSource.objects.create(source_name='Test Source', bias_rating='center', reliability_score=0.8)
+        try:
+            service = ArticleIngestService()
+            service.mediastack_service.get_articles = MagicMock(return_value=mock_api_response)
+
+            created = service.ingest()
+            assert len(created) == 1
+            article = Article.objects.get()
+            assert article.url == 'https://example.com/article'
+            assert article.bias_source == bias_source
+            assert article.reliability_score == 0.8
+            assert received == [created]
+
+            # A second run stores nothing and sends no signal
+            assert service.ingest() == []
+            assert Article.objects.count() == 1
+            assert len(received) == 1
+        finally:
+            articles_ingested.disconnect(receiver)
+
+@pytest.mark.django_db
+class TestUserPreferenceService:
+    def test_preference_is_cached(self, django_assert_num_queries):
+        from news.services import UserPreferenceService
+
+        service = UserPreferenceService()
+        created = service.get_or_create_preference(session_id='visitor')
+        with django_assert_num_queries(0):
+            cached = service.get_or_create_preference(session_id='visitor')
+        assert cached.id == created.id
+
+    def test_update_invalidates_cache(self):
+        from news.services import UserPreferenceService
+
+        service = UserPreferenceService()
+        preference = service.get_or_create_preference(session_id='visitor')
+        service.update_preference(preference.id, {'preferred_categories': ['sports']})
+
+        assert service.get_or_create_preference(session_id='visitor').preferred_categories == ['sports']
+
+    def test_concurrent_create_returns_existing_row(self):
+        from django.db.models.query import QuerySet
+        from news.models import UserPreference
+        from news.services import UserPreferenceService
+
+        existing = UserPreference.objects.create(session_id='visitor')
+        # Simulate losing the race: the first lookup misses, the insert then hits the unique index
+        real_get = QuerySet.get
+        calls = []
+        def get(queryset, *args, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise UserPreference.DoesNotExist
+            return real_get(queryset, *args, **kwargs)
+
+        with patch.object(QuerySet, 'get', autospec=True, side_effect=get):
+            preference = UserPreferenceService().get_or_create_preference(session_id='visitor')
+        assert len(calls) == 2
+        assert preference.id == existing.id
+        assert UserPreference.objects.filter(session_id='visitor').count() == 1
+
+    def test_session_id_is_unique(self):
+        from django.db import IntegrityError, transaction
+        from news.models import UserPreference
+
+        UserPreference.objects.create(session_id='visitor')
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                UserPreference.objects.create(session_id='visitor')
+        # Rows keyed by user only may all leave session_id empty
+        from django.contrib.auth.models import User
+        UserPreference.objects.create(user=User.objects.create_user('a'))
+        UserPreference.objects.create(user=User.objects.create_user('b'))
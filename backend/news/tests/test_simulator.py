@@ -0,0 +1,88 @@
+import json
+import threading
+import pytest
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+from django.test import override_settings
+from news.services import MediastackService
+from news.simulator import LatencyModel, MediastackSimulator, make_server
+
+def call(app, path='/v1/news', **params):
+    environ = {}
+    setup_testing_defaults(environ)
+    environ['PATH_INFO'] = path
+    environ['QUERY_STRING'] = urlencode(params)
+    captured = {}
+    def start_response(status, headers):
+        captured['status'] = status
+    body = b''.join(app(environ, start_response))
+    return int(captured['status'].split()[0]), json.loads(body)
+
+class TestMediastackSimulator:
+    def test_deterministic_articles(self):
+        assert MediastackSimulator(total=50, seed=3).articles == MediastackSimulator(total=50, seed=3).articles
+        assert MediastackSimulator(total=50, seed=3).articles != MediastackSimulator(total=50, seed=4).articles
+
+    def test_filters_and_pagination(self):
+        app = MediastackSimulator(total=2000)
+        status, body = call(app, access_key='key', categories='sports,technology', countries='us', limit=10, offset=5)
+        assert status == 200
+        assert body['pagination']['limit'] == 10
+        assert body['pagination']['offset'] == 5
+        assert body['pagination']['count'] == len(body['data']) == 10
+        assert all(a['category'] in ('sports', 'technology') and a['country'] == 'us' for a in body['data'])
+        # Newest first by default
+        published = [a['published_at'] for a in body['data']]
+        assert published == sorted(published, reverse=True)
+
+        status, body = call(app, access_key='key', categories='-sports', sort='published_asc', limit=100)
+        assert all(a['category'] != 'sports' for a in body['data'])
+        published = [a['published_at'] for a in body['data']]
+        assert published == sorted(published)
+
+    def test_keywords(self):
+        app = MediastackSimulator(total=500)
+        status, body = call(app, access_key='key', keywords='election OR vaccine -market', limit=100)
+        assert status == 200
+        assert body['data']
+        for article in body['data']:
+            text = f"{article['title']} {article['description']}".lower()
+            assert 'election' in text or 'vaccine' in text
+            assert 'market' not in text
+
+    def test_errors_and_quota(self):
+        app = MediastackSimulator(total=10, quota=2, access_key='secret')
+        assert call(app)[1]['error']['code'] == 'missing_access_key'
+        assert call(app, access_key='wrong')[1]['error']['code'] == 'invalid_access_key'
+        status, body = call(app, access_key='secret')
+        assert status == 429
+        assert body['error']['code'] == 'usage_limit_reached'
+        assert call(app, '/__stats__')[1] == {'requests': 3, 'served': 0, 'errors': 3, 'quota_exhausted': 1}
+
+        failing = MediastackSimulator(total=10, error_rate=1.0)
+        assert call(failing, access_key='key')[0] == 500
+        assert call(failing, access_key='key', limit=500)[0] == 500
+        assert call(MediastackSimulator(total=10), access_key='key', limit=500)[0] == 422
+
+    def test_latency_model(self):
+        assert LatencyModel('fixed:50').sample() == 0.05
+        assert 0.02 <= LatencyModel('uniform:20:30').sample() <= 0.03
+        assert LatencyModel('normal:-100:1').sample() == 0
+        assert LatencyModel('lognormal:80:0.5').sample() > 0
+        with pytest.raises(ValueError):
+            LatencyModel('uniform:20')
+
+    def test_mediastack_service_against_server(self):
+        server = make_server('127.0.0.1', 0, MediastackSimulator(total=100))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with override_settings(MEDIASTACK_BASE_URL=f'http://127.0.0.1:{server.server_port}/v1'):
+                service = MediastackService()
+                response = service.get_articles(categories=['general'], limit=5)
+            assert response['pagination']['count'] == len(response['data'])
+            formatted = service.format_article_data(response['data'][0])
+            assert formatted['published_at'] is not None
+        finally:
+            server.shutdown()
+            server.server_close()
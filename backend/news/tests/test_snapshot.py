@@ -0,0 +1,124 @@
+import os
+import pytest
+from datetime import datetime, timezone
+from django.test import override_settings
+from news.models import Article
+
+np = pytest.importorskip('numpy')
+
+from news import snapshot
+from news.snapshot import ArticleSnapshot, build_snapshot, get_snapshot
+
+@pytest.fixture
+def articles():
+    return [
+        Article.objects.create(
+            title='Older Article',
+            url='https://example.com/older',
+            published_at=datetime(2025, 3, 14, 12, 0, tzinfo=timezone.utc),
+            source='BBC',
+            category='general',
+            country='GB',
+            bias_score=0.0,
+            reliability_score=0.9
+        ),
+        Article.objects.create(
+            title='Newer Article',
+            url='https://example.com/newer',
+            published_at=datetime(2025, 3, 15, 12, 0, tzinfo=timezone.utc),
+            source='Unknown Blog',
+            category=None,
+            country='US'
+        ),
+    ]
+
+@pytest.mark.django_db
+class TestArticleSnapshot:
+    def test_round_trip(self, tmp_path, articles):
+        path = tmp_path / 'snapshot.bin'
+        assert build_snapshot(path) == 2
+
+        snap = ArticleSnapshot(path)
+        assert len(snap) == 2
+        # Newest first
+        assert list(snap['id']) == [articles[1].id, articles[0].id]
+        assert snap['published_at'][1] == int(articles[0].published_at.timestamp())
+        assert snap.decode('source', snap['source'][1]) == 'BBC'
+        assert snap.decode('category', snap['category'][0]) is None
+        assert snap['bias_score'][1] == 0.0
+        assert np.isnan(snap['bias_score'][0])
+        assert list(snap.mask(country='GB')) == [False, True]
+        assert not snap.mask(source='Nobody').any()
+
+    def test_since_filter(self, tmp_path, articles):
+        path = tmp_path / 'snapshot.bin'
+        assert build_snapshot(path, since=datetime(2025, 3, 15, tzinfo=timezone.utc)) == 1
+        assert list(ArticleSnapshot(path)['id']) == [articles[1].id]
+
+    def test_empty_snapshot(self, tmp_path):
+        path = tmp_path / 'snapshot.bin'
+        assert build_snapshot(path) == 0
+        assert len(ArticleSnapshot(path)) == 0
+
+    def test_get_snapshot_picks_up_swapped_file(self, tmp_path, articles, monkeypatch):
+        path = tmp_path / 'snapshot.bin'
+        monkeypatch.setattr(snapshot, '_current', None)
+        monkeypatch.setattr(snapshot, 'RELOAD_CHECK_INTERVAL', 0)
+
+        with override_settings(ARTICLE_SNAPSHOT_PATH=path):
+            assert get_snapshot() is None
+
+            build_snapshot(path)
+            first = get_snapshot()
+            assert len(first) == 2
+
+            articles[0].delete()
+            build_snapshot(path)
+            second = get_snapshot()
+            assert second is not first
+            assert len(second) == 1
+            # The old mapping is still readable by anyone holding it
+            assert len(first['id']) == 2
+
+        assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+    def test_rows_for_and_frequent(self, tmp_path, articles):
+        path = tmp_path / 'snapshot.bin'
+        build_snapshot(path)
+        snap = ArticleSnapshot(path)
+        older, newer = articles
+        rows = snap.rows_for([older.id, newer.id, older.id, newer.id + 1000])
+        assert list(rows) == [1, 0, 1, -1]
+        assert snap.frequent('source', rows[:3]) == ['Unknown Blog', 'BBC']
+        assert snap.frequent('source', rows[:3], min_count=2) == ['BBC']
+        # The newer article has no category
+        assert snap.frequent('category', rows[:3]) == ['general']
+
+        build_snapshot(path, since=datetime(2030, 1, 1, tzinfo=timezone.utc))
+        assert list(ArticleSnapshot(path).rows_for([older.id])) == [-1]
+
+@pytest.mark.django_db
+def test_personalization_reads_preferences_from_snapshot(articles, settings, django_assert_num_queries):
+    from news.models import UserInteraction
+    from news.services import UserPreferenceService
+
+    older, newer = articles
+    for article in (older, older, newer):
+        UserInteraction.objects.create(article=article, session_id='reader', interaction_type='view')
+    service = UserPreferenceService()
+    interactions = UserInteraction.objects.filter(session_id='reader')
+    from_database = service._get_interaction_preferences(interactions)
+    assert from_database == (['general'], ['BBC'])
+
+    build_snapshot(settings.ARTICLE_SNAPSHOT_PATH)
+    with django_assert_num_queries(1):
+        assert service._get_interaction_preferences(interactions) == from_database
+
+    # An interaction with an article outside the snapshot falls back to the database
+    outside = Article.objects.create(
+        title='Not in the snapshot', url='https://example.com/outside',
+        published_at=datetime(2025, 3, 16, tzinfo=timezone.utc), source='BBC', category='general'
+    )
+    UserInteraction.objects.create(article=outside, session_id='reader', interaction_type='view')
+    with django_assert_num_queries(3):
+        assert service._get_interaction_preferences(interactions) == (['general'], ['BBC'])
@@ -0,0 +1,131 @@
+import io
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from news.models import BiasSource, SourceAlias, UnresolvedSource
+from news.services import MediastackService
+from news.sources import SourceResolver, flush_unresolved, get_resolver, normalize_source_name
+
+@pytest.fixture
+def bias_data():
+    call_command('initialize_bias_data', stdout=io.StringIO())
+
+@pytest.fixture(autouse=True)
+def clear_pending_unresolved():
+    flush_unresolved()
+    yield
+    flush_unresolved()
+
+class TestNormalizeSourceName:
+    @pytest.mark.parametrize('name, key', [
+        ('CNN', 'cnn'),
+        ('cnn', 'cnn'),
+        ('CNN International', 'cnn'),
+        ('cnn.com', 'cnn'),
+        ('https://www.cnn.com/', 'cnn'),
+        ('The New York Times', 'newyorktimes'),
+        ('New York Times', 'newyorktimes'),
+        ('Fox News', 'fox'),
+        ('BBC News', 'bbc'),
+        ('Al Jazeera English', 'aljazeera'),
+        ('The Guardian', 'guardian'),
+        ('guardian.co.uk', 'guardian'),
+        ('Newsmax', 'newsmax'),
+        ('News', 'news'),
+        ('Le Monde', 'lemonde'),
+        ('Süddeutsche Zeitung', 'suddeutschezeitung'),
+        ('', ''),
+        (None, ''),
+    ])
+    def test_keys(self, name, key):
+        assert normalize_source_name(name) == key
+
+class TestSourceResolver:
+    @pytest.fixture
+    def resolver(self):
+        return SourceResolver({'reuters': 'Reuters', 'bbc': 'BBC', 'washingtonpost': 'The Washington Post'})
+
+    def test_exact(self, resolver):
+        assert resolver.resolve('REUTERS') == 'Reuters'
+        assert resolver.resolve('BBC World News') == 'BBC'
+
+    def test_fuzzy(self, resolver):
+        assert resolver.resolve('Reuter') == 'Reuters'
+        assert resolver.resolve('Washington Posts') == 'The Washington Post'
+
+    def test_no_match(self, resolver):
+        assert resolver.resolve('Local Herald') is None
+        # Short keys are too ambiguous to match fuzzily
+        assert resolver.resolve('bbd') is None
+        assert resolver.resolve(None) is None
+
+@pytest.mark.django_db
+class TestBiasLookup:
+    def test_variants_resolve(self, bias_data):
+        lookup = MediastackService().get_bias_lookup(
+            ['cnn', 'CNN International', 'nytimes', 'The Guardian', 'AP', 'Huffington Post', 'Local Herald', None]
+        )
+        assert {name: source.source_name for name, source in lookup.items()} == {
+            'cnn': 'CNN',
+            'cnn international': 'CNN',
+            'nytimes': 'The New York Times',
+            'the guardian': 'The Guardian',
+            'ap': 'Associated Press',
+            'huffington post': 'HuffPost',
+        }
+
+    def test_format_article_data_uses_resolver(self, bias_data):
+        formatted = MediastackService().format_article_data({'source': 'wsj', 'url': 'https://example.com'})
+        assert formatted['bias_score'] == 0.3
+        assert formatted['reliability_score'] == 0.9
+
+    def test_lookup_needs_no_queries_once_loaded(self, bias_data, django_assert_num_queries):
+        get_resolver()
+        with django_assert_num_queries(0):
+            MediastackService().get_bias_lookup(['CNN', 'bbc.com'])
+
+    def test_catalog_changes_are_picked_up(self, bias_data):
+        service = MediastackService()
+        assert service.get_bias_lookup(['Le Monde']) == {}
+
+        le_monde = BiasSource.objects.create(source_name='Le Monde', bias_rating='center_left', reliability_score=0.85)
+        assert service.get_bias_lookup(['Le Monde'])['le monde'] == le_monde
+
+        SourceAlias.objects.create(alias='lemonde.fr', bias_source=le_monde)
+        assert service.get_bias_lookup(['lemonde.fr'])['lemonde.fr'] == le_monde
+
+@pytest.mark.django_db
+class TestUnresolvedQueue:
+    def test_unresolved_names_are_queued(self, bias_data):
+        service = MediastackService()
+        service.get_bias_lookup(['Local Herald', 'CNN'])
+        service.get_bias_lookup(['Local Herald'])
+        assert flush_unresolved() == ['Local Herald']
+
+        service.get_bias_lookup(['Local Herald'])
+        flush_unresolved()
+        entry = UnresolvedSource.objects.get()
+        assert entry.source_name == 'Local Herald'
+        assert entry.normalized_key == 'localherald'
+        assert entry.occurrences == 3
+
+    def test_reappearing_names_update_last_seen(self, bias_data):
+        MediastackService().get_bias_lookup(['Local Herald'])
+        flush_unresolved()
+        long_ago = timezone.now() - timedelta(days=3)
+        UnresolvedSource.objects.update(first_seen=long_ago, last_seen=long_ago)
+
+        MediastackService().get_bias_lookup(['Local Herald'])
+        flush_unresolved()
+        entry = UnresolvedSource.objects.get()
+        assert entry.first_seen == long_ago
+        assert entry.last_seen > long_ago + timedelta(days=2)
+
+    def test_adding_an_alias_resolves_queue_entry(self, bias_data):
+        MediastackService().get_bias_lookup(['Cable News Network'])
+        flush_unresolved()
+        assert UnresolvedSource.objects.count() == 1
+
+        SourceAlias.objects.create(alias='Cable News Network', bias_source=BiasSource.objects.get(source_name='CNN'))
+        assert UnresolvedSource.objects.count() == 0
@@ -0,0 +1,210 @@
+import asyncio
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from datetime import datetime, timezone
+from django.test import AsyncClient
+from django.urls import reverse
+from news.models import Article
+from news.signals import articles_ingested
+from news.streaming import StreamFull, Subscription, SubscriptionIndex, broker, event_stream
+
+published_at = datetime(2025, 3, 15, tzinfo=timezone.utc)
+
+def make_article(i, category='sports', country='us', title=None, description=None):
+    return Article.objects.create(
+        title=title or f'Article {i}', description=description, url=f'https://example.com/{i}',
+        published_at=published_at, source='BBC', category=category, country=country
+    )
+
+@pytest.fixture(autouse=True)
+def stream_settings(settings):
+    # Tests publish and poll explicitly instead of on the poller thread
+    settings.STREAM = {**settings.STREAM, 'POLL_INTERVAL': 0, 'HEARTBEAT': 5}
+    broker.reset()
+    yield
+    broker.reset()
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+def drain(loop, subscription):
+    """Run the deliveries scheduled on ``loop`` and return the queued events"""
+    loop.run_until_complete(asyncio.sleep(0))
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+class TestSubscriptionIndex:
+    def test_match(self):
+        index = SubscriptionIndex()
+        sports = Subscription(categories=['Sports'])
+        sports_us = Subscription(categories=['sports', 'business'], countries=['us'])
+        everything = Subscription()
+        election = Subscription(keywords=['election', ''])
+        business = Subscription(categories=['business'])
+        for subscription in (sports, sports_us, everything, election, business):
+            index.add(subscription)
+
+        match_report = Article(title='Match report', category='sports', country='US')
+        assert index.match(match_report) == {sports, sports_us, everything}
+        vote = Article(title='Vote', description='The Election is close', category='general', country='gb')
+        assert index.match(vote) == {everything, election}
+
+        index.remove(sports_us)
+        index.remove(everything)
+        assert index.match(match_report) == {sports}
+        assert index.match(Article(title='Quiet day', category='science')) == set()
+
+@pytest.mark.django_db
+class TestBroker:
+    def test_publish_and_poll_share_the_watermark(self, loop):
+        old = make_article(1)
+        subscription = broker.subscribe(categories=['sports'], loop=loop)
+        assert broker.watermark == old.id
+
+        new = [make_article(2), make_article(3, category='business')]
+        assert broker.publish([old] + new) == 1
+        assert [event.id for event in drain(loop, subscription)] == [new[0].id]
+        # Already published by the signal path
+        assert broker.poll() == 0
+
+        # Stored by another process
+        later = make_article(4)
+        assert broker.poll() == 1
+        events = drain(loop, subscription)
+        assert [event.id for event in events] == [later.id]
+        assert events[0].frame.startswith(f'id: {later.id}\nevent: article\ndata: {{'.encode())
+        assert events[0].frame.endswith(b'\n\n')
+
+    def test_ingest_signal_publishes(self, loop):
+        subscription = broker.subscribe(loop=loop)
+        article = make_article(1)
+        articles_ingested.send(sender=None, articles=[article])
+        assert [event.id for event in drain(loop, subscription)] == [article.id]
+
+    def test_ingest_signal_does_not_skip_articles_stored_elsewhere(self, loop):
+        subscription = broker.subscribe(loop=loop)
+        elsewhere = make_article(1)
+        ingested = make_article(2)
+        articles_ingested.send(sender=None, articles=[ingested])
+        assert [event.id for event in drain(loop, subscription)] == [elsewhere.id, ingested.id]
+
+    def test_late_commits_below_the_watermark_are_published(self, settings, loop):
+        subscription = broker.subscribe(loop=loop)
+        # A concurrent ingest commits ``late`` after ``early`` was already scanned
+        late, early = make_article(1), make_article(2)
+        assert broker.publish([early]) == 1
+        assert broker.watermark == early.id
+        assert broker.poll() == 1
+        assert broker.poll() == 0
+        assert [event.id for event in drain(loop, subscription)] == [early.id, late.id]
+
+        # Beyond the window, it's left to replay
+        settings.STREAM = {**settings.STREAM, 'RESCAN_WINDOW': 1}
+        too_late, later, latest = make_article(3), make_article(4), make_article(5)
+        broker.publish([later, latest])
+        assert broker.poll() == 0
+        assert too_late.id not in [event.id for event in drain(loop, subscription)]
+
+    def test_slow_subscriber_is_disconnected(self, settings, loop):
+        settings.STREAM = {**settings.STREAM, 'QUEUE_SIZE': 2}
+        subscription = broker.subscribe(loop=loop)
+        broker.publish([make_article(i) for i in range(3)])
+        events = drain(loop, subscription)
+        assert len(events) == 3
+        assert events[-1] is None
+        assert subscription.closed
+
+    def test_subscriber_limit(self, settings, loop):
+        settings.STREAM = {**settings.STREAM, 'MAX_SUBSCRIBERS': 1}
+        subscription = broker.subscribe(loop=loop)
+        with pytest.raises(StreamFull):
+            broker.subscribe(loop=loop)
+        broker.unsubscribe(subscription)
+        assert broker.watermark is None
+        broker.subscribe(loop=loop)
+
+@pytest.mark.django_db(transaction=True)
+def test_poller_thread(settings, loop):
+    settings.STREAM = {**settings.STREAM, 'POLL_INTERVAL': 0.01}
+    subscription = broker.subscribe(loop=loop)
+    poller = broker._poller
+    article = make_article(1)
+    event = loop.run_until_complete(asyncio.wait_for(subscription.queue.get(), 2))
+    assert event.id == article.id
+
+    # The poller stops with the last subscriber
+    broker.unsubscribe(subscription)
+    poller.join(1)
+    assert not poller.is_alive()
+    assert broker._poller is None
+
+@pytest.mark.django_db
+class TestEventStream:
+    def test_replay_then_live(self):
+        async def run():
+            first = await sync_to_async(make_article)(1)
+            await sync_to_async(make_article)(2, category='business')
+            missed = await sync_to_async(make_article)(3, title='Derby day')
+
+            subscription = await sync_to_async(broker.subscribe)(
+                categories=['sports'], loop=asyncio.get_running_loop()
+            )
+            stream = event_stream(subscription, last_event_id=first.id)
+            assert await anext(stream) == b'retry: 5000\n\n'
+            replayed = await anext(stream)
+            assert replayed.startswith(f'id: {missed.id}\n'.encode())
+            assert b'"title":"Derby day"' in replayed
+
+            # A live copy of a replayed article is skipped
+            live = await sync_to_async(make_article)(4)
+            await sync_to_async(broker.publish)([missed, live])
+            frame = await asyncio.wait_for(anext(stream), 1)
+            assert frame.startswith(f'id: {live.id}\n'.encode())
+
+            await stream.aclose()
+            assert subscription not in broker.subscriptions
+
+        async_to_sync(run)()
+
+    def test_heartbeat(self, settings):
+        settings.STREAM = {**settings.STREAM, 'HEARTBEAT': 0.01}
+
+        async def run():
+            subscription = await sync_to_async(broker.subscribe)(loop=asyncio.get_running_loop())
+            stream = event_stream(subscription)
+            await anext(stream)
+            assert await anext(stream) == b': keepalive\n\n'
+            await stream.aclose()
+
+        async_to_sync(run)()
+
+@pytest.mark.django_db
+class TestArticleStreamView:
+    def test_stream_response(self):
+        async def run():
+            article = await sync_to_async(make_article)(1)
+            response = await AsyncClient().get(
+                reverse('article-stream'), {'countries': 'US'}, headers={'Last-Event-ID': '0'}
+            )
+            assert response.status_code == 200
+            assert response['Content-Type'] == 'text/event-stream'
+            assert response['Cache-Control'] == 'no-cache'
+            chunks = aiter(response.streaming_content)
+            assert await anext(chunks) == b'retry: 5000\n\n'
+            assert (await anext(chunks)).startswith(f'id: {article.id}\n'.encode())
+            await chunks.aclose()
+
+        async_to_sync(run)()
+
+    def test_invalid_last_event_id(self):
+        async def run():
+            return await AsyncClient().get(reverse('article-stream'), {'last_event_id': 'latest'})
+
+        response = async_to_sync(run)()
+        assert response.status_code == 400
+        assert broker.subscriptions == set()
@@ -0,0 +1,143 @@
+import pytest
+from unittest.mock import patch
+from news import metrics
+from news.tiered_cache import TAG_VERSION_PREFIX, LRUCache, TieredCache
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def counters():
+    return metrics.snapshot()['counters']
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(max_entries=2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        assert lru.get('a') == 1  # 'b' is now least recently used
+        lru.set('c', 3, 60)
+
+        assert lru.get('b') is None
+        assert lru.get('a') == 1
+        assert lru.get('c') == 3
+        assert len(lru) == 2
+
+    def test_entries_expire(self):
+        lru = LRUCache(max_entries=2)
+        with patch('news.tiered_cache.time.monotonic', return_value=100.0):
+            lru.set('a', 1, 10)
+        with patch('news.tiered_cache.time.monotonic', return_value=109.0):
+            assert lru.get('a') == 1
+        with patch('news.tiered_cache.time.monotonic', return_value=110.0):
+            assert lru.get('a', 'missing') == 'missing'
+        assert len(lru) == 0
+
+class TestTieredCache:
+    def test_hit_tiers(self):
+        cache = TieredCache(l1_max_entries=8, l1_timeout=30)
+        assert cache.get('key') is None
+        cache.set('key', 'value', timeout=300)
+        assert cache.get('key') == 'value'
+
+        assert counters() == {'cache.misses': 1, 'cache.l1.hits': 1}
+
+    def test_workers_share_l2(self):
+        # Two workers: separate L1s over the same shared backend
+        worker1 = TieredCache(l1_max_entries=8, l1_timeout=30)
+        worker2 = TieredCache(l1_max_entries=8, l1_timeout=30)
+        worker1.set('key', {'articles': []}, timeout=300)
+
+        assert worker2.get('key') == {'articles': []}
+        assert worker2.get('key') == {'articles': []}
+        assert counters() == {'cache.l2.hits': 1, 'cache.l1.hits': 1}
+
+    def test_tier_stats(self):
+        worker1 = TieredCache(l1_max_entries=8, l1_timeout=30)
+        worker2 = TieredCache(l1_max_entries=8, l1_timeout=30)
+        assert worker2.tier_stats()['hit_ratio'] is None
+        worker1.set('key', 'value', timeout=300)
+        worker2.get('missing')
+        worker2.get('key')
+        worker2.get('key')
+        worker2.get('key')
+        assert worker2.tier_stats() == {
+            'l1_hits': 2, 'l2_hits': 1, 'misses': 1, 'l1_hit_ratio': 0.5, 'hit_ratio': 0.75,
+            'l1_entries': 1, 'l1_max_entries': 8,
+        }
+
+    def test_l1_is_bounded(self):
+        cache = TieredCache(l1_max_entries=2, l1_timeout=30)
+        for i in range(5):
+            cache.set(f'key{i}', i, timeout=300)
+        assert len(cache.l1) == 2
+        # Evicted from L1, still in L2
+        assert cache.get('key0') == 0
+        assert counters() == {'cache.l2.hits': 1}
+
+    def test_falsy_values_are_hits(self):
+        cache = TieredCache(l1_max_entries=8, l1_timeout=30)
+        cache.set('empty', [], timeout=300)
+        assert cache.get('empty', 'default') == []
+
+    def test_delete_and_zero_timeout(self):
+        cache = TieredCache(l1_max_entries=8, l1_timeout=30)
+        cache.set('key', 'value', timeout=300)
+        cache.delete('key')
+        assert cache.get('key') is None
+
+        cache.set('key', 'value', timeout=0)
+        assert cache.get('key') is None
+
+    def test_invalidate_tags(self):
+        cache = TieredCache(l1_max_entries=8, l1_timeout=30)
+        cache.set('cnn_feed', 'a', timeout=300, tags=['bias_source_1'])
+        cache.set('mixed_feed', 'b', timeout=300, tags=['bias_source_1', 'bias_source_2'])
+        cache.set('bbc_feed', 'c', timeout=300, tags=['bias_source_2'])
+        cache.set('untagged', 'd', timeout=300)
+
+        # Both tagged entries are dropped from this worker's L1
+        assert cache.invalidate_tags(['bias_source_1']) == 2
+        assert cache.get('cnn_feed') is None
+        assert cache.get('mixed_feed') is None
+        assert cache.get('bbc_feed') == 'c'
+        assert cache.get('untagged') == 'd'
+        assert cache.invalidate_tags(['bias_source_1']) == 0
+
+    def test_invalidation_reaches_other_workers_l2_entries(self):
+        worker = TieredCache(l1_max_entries=8, l1_timeout=30)
+        other = TieredCache(l1_max_entries=8, l1_timeout=30)
+        # Entries with different lifetimes share a tag
+        worker.set('public_feed', 'a', timeout=300, tags=['bias_source_1'])
+        worker.set('personal_feed', 'b', timeout=3600, tags=['bias_source_1'])
+        other.set('other_feed', 'c', timeout=3600, tags=['bias_source_1', 'bias_source_2'])
+
+        other.invalidate_tags(['bias_source_1'])
+        worker.l1.clear()  # as after the L1 timeout
+        assert worker.get('public_feed') is None
+        assert worker.get('personal_feed') is None
+        assert worker.get('other_feed') is None
+
+        # Entries stored after the invalidation are current again
+        worker.set('public_feed', 'new', timeout=300, tags=['bias_source_1'])
+        worker.l1.clear()
+        assert worker.get('public_feed') == 'new'
+
+    def test_evicted_tag_version_is_a_miss(self):
+        cache = TieredCache(l1_max_entries=8, l1_timeout=30)
+        cache.set('feed', 'a', timeout=300, tags=['bias_source_1'])
+        cache.l2.delete(f'{TAG_VERSION_PREFIX}bias_source_1')
+        cache.l1.clear()
+        assert cache.get('feed') is None
+
+        cache.set('feed', 'b', timeout=300, tags=['bias_source_1'])
+        cache.l1.clear()
+        assert cache.get('feed') == 'b'
+
+def test_tests_do_not_share_the_development_cache():
+    from django.core.cache import caches
+    from django.core.cache.backends.locmem import LocMemCache
+    # conftest clears the cache around every test
+    assert isinstance(caches['default'], LocMemCache)
@@ -0,0 +1,117 @@
+import pytest
+from datetime import datetime, timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news import trending
+from news.models import Article, TrendingBucket
+from news.services import UserPreferenceService
+from news.trending import RingCounter, TrendingEngine
+
+WEIGHTS = {'5m': 0.5, '1h': 0.3, '24h': 0.2}
+INTERACTION_WEIGHTS = {'view': 1.0, 'share': 3.0, 'dislike': 0.0}
+START = datetime(2025, 3, 15, 12, tzinfo=timezone.utc).timestamp()
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+def make_engine(clock, **kwargs):
+    return TrendingEngine(WEIGHTS, INTERACTION_WEIGHTS, clock=clock, **{'checkpoint_interval': 60, **kwargs})
+
+class TestRingCounter:
+    def test_sliding_window(self):
+        ring = RingCounter(60, 60)
+        ring.add(START, 1)
+        ring.add(START + 120, 2)
+        assert ring.total(START + 120, 300) == 3
+        assert ring.total(START + 400, 300) == 2
+        # Slots are reused an hour later
+        ring.add(START + 3600, 5)
+        assert ring.total(START + 3600, 3600) == 7
+        # Too old for the ring
+        ring.add(START - 3600, 1)
+        assert ring.total(START + 3600, 3600) == 7
+
+@pytest.mark.django_db
+class TestTrendingEngine:
+    def test_recent_burst_outranks_steady_interest(self):
+        clock = Clock()
+        engine = make_engine(clock, checkpoint_interval=10 ** 9)
+        engine._loaded = True
+        for minute in range(0, 600, 30):
+            clock.now = START + minute * 60
+            engine.record(1, 'view')
+        for _ in range(5):
+            engine.record(2, 'view')
+        engine.record(3, 'dislike')
+
+        top = engine.top(10)
+        assert [article_id for article_id, _, _ in top] == [2, 1]
+        assert top[1][1] == {'5m': 1.0, '1h': 2.0, '24h': 20.0}
+        # Ranking by a single window
+        assert [article_id for article_id, _, _ in engine.top(10, window='24h')] == [1, 2]
+
+    def test_checkpoint_restores_and_merges_workers(self, django_assert_num_queries):
+        clock = Clock()
+        worker1, worker2 = make_engine(clock), make_engine(clock)
+        worker1.record(1, 'share')
+        worker2.record(1, 'view')
+        worker2.record(2, 'view')
+        # Insert, delete expired rows, then the hourly and per-minute loads
+        with django_assert_num_queries(4):
+            worker1.checkpoint()
+        worker2.checkpoint()
+        assert TrendingBucket.objects.count() == 3
+
+        restarted = make_engine(clock)
+        clock.now += 30
+        top = restarted.top(10)
+        assert [(article_id, counts['1h']) for article_id, counts, _ in top] == [(1, 4.0), (2, 1.0)]
+
+    def test_checkpoints_are_periodic(self):
+        clock = Clock()
+        engine = make_engine(clock)
+        engine.record(1, 'view')
+        assert TrendingBucket.objects.count() == 0
+        clock.now += 61
+        engine.record(1, 'view')
+        # One row per minute
+        assert TrendingBucket.objects.count() == 2
+
+    def test_max_articles(self):
+        clock = Clock()
+        engine = make_engine(clock, max_articles=2)
+        for article_id, views in [(1, 3), (2, 1), (3, 2)]:
+            for _ in range(views):
+                engine.record(article_id, 'view')
+        engine.checkpoint()
+        assert sorted(article_id for article_id, _, _ in engine.top(10)) == [1, 3]
+
+@pytest.mark.django_db
+class TestTrendingView:
+    def test_interactions_feed_trending(self):
+        published_at = datetime(2025, 3, 15, tzinfo=timezone.utc)
+        articles = [
+            Article.objects.create(
+                title=f'Article {i}', url=f'https://example.com/{i}', published_at=published_at, source='CNN'
+            )
+            for i in range(3)
+        ]
+        service = UserPreferenceService()
+        for article, count in zip(articles, [1, 3, 2]):
+            for _ in range(count):
+                service.record_interaction(article.id, 'view', session_id='visitor')
+        trending.engine.checkpoint()
+
+        response = APIClient().get(reverse('trending'), {'limit': 2})
+        assert response.status_code == 200
+        assert [article['id'] for article in response.data['articles']] == [articles[1].id, articles[2].id]
+        assert response.data['articles'][0]['title'] == 'Article 1'
+        assert response.data['articles'][0]['trending']['counts']['5m'] == 3.0
+
+    @pytest.mark.parametrize('params', [{'limit': 0}, {'limit': 'ten'}, {'window': '1w'}])
+    def test_invalid_parameters(self, params):
+        assert APIClient().get(reverse('trending'), params).status_code == 400
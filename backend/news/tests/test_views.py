@@ -1,4 +1,5 @@
 import pytest
+import time
 from unittest.mock import patch, MagicMock
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -138,3 +139,118 @@ class TestArticlesView:
 
             # Verify that the service was called
             assert mock_service.get_articles.call_count > 0
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def setup_method(self):
+        ArticlesView.mediastack_service = None
+
+    def test_articles_etag_round_trip(self, api_client, mock_api_response):
+        mock_service = MagicMock(spec=MediastackService)
+        mock_service.get_articles.return_value = mock_api_response
+        mock_service.format_article_data.return_value = mock_api_response['data'][0]
+        ArticlesView.mediastack_service = mock_service
+
+        url = reverse('articles')
+        response1 = api_client.get(url)
+        assert response1.status_code == status.HTTP_200_OK
+        etag = response1['ETag']
+        assert etag.startswith('"')
+
+        # Cache hit with a matching validator: no body
+        response2 = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response2.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response2.content == b''
+        assert response2['ETag'] == etag
+
+        # Stale validator gets the full body
+        response3 = api_client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        assert response3.status_code == status.HTTP_200_OK
+        assert response3['ETag'] == etag
+        assert mock_service.get_articles.call_count == 1
+
+    def test_bias_sources_etag_tracks_content(self, api_client):
+        from news.models import BiasSource
+        source = BiasSource.objects.create(source_name='BBC', bias_rating='center', reliability_score=0.9)
+
+        url = reverse('bias-sources')
+        response1 = api_client.get(url)
+        assert response1.status_code == status.HTTP_200_OK
+        assert 'max-age=' in response1['Cache-Control']
+
+        response2 = api_client.get(url, HTTP_IF_NONE_MATCH=f"W/{response1['ETag']}")
+        assert response2.status_code == status.HTTP_304_NOT_MODIFIED
+
+        source.reliability_score = 0.8
+        source.save()
+        response3 = api_client.get(url, HTTP_IF_NONE_MATCH=response1['ETag'])
+        assert response3.status_code == status.HTTP_200_OK
+        assert response3['ETag'] != response1['ETag']
+
+@pytest.mark.django_db
+class TestPersonalizedFeedInvalidation:
+    @pytest.fixture
+    def personalized(self):
+        from news.views import PersonalizedNewsView
+        result = {'articles': [], 'pagination': {'offset': 0, 'limit': 25, 'total': 0}}
+        with patch.object(
+            PersonalizedNewsView.preference_service, 'get_personalized_articles', return_value=result
+        ) as mock_get:
+            yield mock_get
+
+    def test_feed_is_cached(self, api_client, personalized):
+        api_client.get(reverse('personalized'))
+        api_client.get(reverse('personalized'))
+        assert personalized.call_count == 1
+
+    def test_preference_update_invalidates_feed(self, api_client, personalized):
+        api_client.get(reverse('personalized'))
+        api_client.post(reverse('preferences'), {'preferred_categories': ['sports']}, format='json')
+        api_client.get(reverse('personalized'))
+        assert personalized.call_count == 2
+
+    def test_interaction_invalidates_feed(self, api_client, personalized):
+        from datetime import datetime, timezone
+        from news.models import Article
+        article = Article.objects.create(
+            title='Test', url='https://example.com/a', source='BBC',
+            published_at=datetime(2025, 3, 15, tzinfo=timezone.utc)
+        )
+
+        api_client.get(reverse('personalized'))
+        api_client.post(reverse('interaction'), {'article_id': article.id, 'interaction_type': 'like'}, format='json')
+        api_client.get(reverse('personalized'))
+        assert personalized.call_count == 2
+
+    def test_other_visitors_keep_their_feed(self, personalized):
+        first, second = APIClient(), APIClient()
+        first.get(reverse('personalized'))
+        second.get(reverse('personalized'))
+        second.post(reverse('preferences'), {'preferred_categories': ['sports']}, format='json')
+        first.get(reverse('personalized'))
+        assert personalized.call_count == 2
+
+    def test_lost_generation_does_not_revive_old_feeds(self):
+        from django.core.cache import cache
+        from news.services import UserPreferenceService
+
+        service = UserPreferenceService()
+        before = service.feed_generation(session_id='visitor')
+        service.bump_feed_generation(session_id='visitor')
+        bumped = service.feed_generation(session_id='visitor')
+        assert bumped > before
+
+        cache.clear()
+        assert service.feed_generation(session_id='visitor') > bumped
+
+    def test_generations_expire_with_the_feeds(self, settings):
+        from django.core.cache import cache
+        from news.services import UserPreferenceService
+
+        service = UserPreferenceService()
+        service.feed_generation(session_id='reader')
+        service.bump_feed_generation(session_id='visitor')
+        for session_id in ('reader', 'visitor'):
+            key = cache.make_and_validate_key(service._feed_generation_key(session_id=session_id))
+            expires_in = cache._expire_info[key] - time.time()
+            assert settings.PERSONALIZED_CACHE_TIMEOUT - 60 < expires_in <= settings.PERSONALIZED_CACHE_TIMEOUT
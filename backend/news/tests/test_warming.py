@@ -0,0 +1,91 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from django.urls import reverse
+from rest_framework.test import APIClient
+from news.benchmarks.upstream import StubUpstream
+from news.models import Article, UserInteraction
+from news.views import ArticlesView
+from news.warming import hot_combinations, warm_cache
+
+@pytest.fixture
+def upstream(settings):
+    settings.MEDIASTACK_API_KEY = 'test'
+    ArticlesView.mediastack_service = None
+    with StubUpstream() as stub:
+        yield stub
+    ArticlesView.mediastack_service = None
+
+@pytest.fixture
+def interactions():
+    published_at = datetime(2025, 3, 15, tzinfo=timezone.utc)
+    def article(i, category, country):
+        return Article.objects.create(
+            title=f'Article {i}', url=f'https://example.com/{i}', published_at=published_at,
+            source='BBC', category=category, country=country
+        )
+    sports_us = article(1, 'sports', 'US')
+    sports_gb = article(2, 'sports', 'GB')
+    business_us = article(3, 'business', 'US')
+    for target, count in [(sports_us, 5), (sports_gb, 2), (business_us, 3)]:
+        UserInteraction.objects.bulk_create([
+            UserInteraction(session_id=f'visitor{i}', article=target, interaction_type='view')
+            for i in range(count)
+        ])
+
+@pytest.mark.django_db
+class TestHotCombinations:
+    def test_ranking(self, interactions):
+        assert hot_combinations(top_n=4, window_hours=24) == [
+            (None, None),
+            ('sports', None),
+            ('sports', 'us'),
+            ('business', None),
+        ]
+
+    def test_without_interactions(self):
+        assert hot_combinations(top_n=10, window_hours=24) == [(None, None)]
+
+@pytest.mark.django_db
+class TestWarmCache:
+    def test_warmed_pages_are_cache_hits(self, upstream):
+        stats = warm_cache([(None, None), ('sports', 'us')], sleep=lambda seconds: None)
+        assert stats == {'warmed': 2, 'skipped': 0, 'failed': 0}
+        assert upstream.calls == 2
+
+        client = APIClient()
+        assert client.get(reverse('articles')).status_code == 200
+        # Filter case and order don't change the cache key
+        assert client.get(reverse('articles'), {'categories': 'sports', 'countries': 'US'}).status_code == 200
+        assert upstream.calls == 2
+
+    def test_cached_combinations_are_skipped(self, upstream):
+        APIClient().get(reverse('articles'))
+        stats = warm_cache([(None, None)], sleep=lambda seconds: None)
+        assert stats == {'warmed': 0, 'skipped': 1, 'failed': 0}
+        assert upstream.calls == 1
+
+    def test_upstream_calls_are_paced(self, upstream, settings):
+        settings.CACHE_WARMING = dict(settings.CACHE_WARMING, MAX_REQUESTS_PER_MINUTE=6)
+        sleep = MagicMock()
+        warm_cache([(None, None), ('sports', None), ('business', None)], sleep=sleep)
+
+        assert sleep.call_count == 2
+        for call in sleep.call_args_list:
+            assert 9 < call.args[0] <= 10
+
+    def test_stops_at_first_failure(self, upstream):
+        with patch('news.services.requests.get', side_effect=Exception('quota exhausted')) as mock_get:
+            stats = warm_cache([(None, None), ('sports', None)], sleep=lambda seconds: None)
+        assert stats == {'warmed': 0, 'skipped': 0, 'failed': 1}
+        assert mock_get.call_count == 1
+
+    def test_runs_after_ingest(self, upstream, settings, tmp_path):
+        from news.services import ArticleIngestService
+        settings.ARTICLE_SNAPSHOT_PATH = tmp_path / 'snapshot.bin'
+
+        ArticleIngestService().ingest(limit=10)
+        # One call to ingest, one to warm the unfiltered feed
+        assert upstream.calls == 2
+        APIClient().get(reverse('articles'))
+        assert upstream.calls == 2
@@ -0,0 +1,199 @@
+"""
+Two-tier response cache.
+
+L1 is a small, bounded LRU inside each worker process; L2 is the shared Django
+cache configured in ``CACHES`` (file-based by default, Redis when
+``REDIS_URL`` is set), so workers share each other's misses. L1 entries expire
+after ``TIERED_CACHE['L1_TIMEOUT']`` seconds at most, which bounds how long a
+worker can serve an entry another worker has replaced or deleted in L2.
+
+Hits and misses per tier are counted in ``news.metrics`` as
+``cache.l1.hits``, ``cache.l2.hits`` and ``cache.misses``; ``/api/metrics/``
+reports them with hit ratios (``tier_stats``).
+
+Entries can be tagged (e.g. with the bias sources a feed contains) so that a
+change invalidates only the entries it affects. Each tag has a version in L2
+(a ``time.time_ns()`` value stored without expiry), and a tagged entry keeps
+the versions of its tags from when it was stored. ``invalidate_tags`` writes
+new versions, and an L2 read whose versions no longer match (or whose tag
+version was evicted) is a miss. Nothing is read-modify-written, so concurrent
+writers can't lose each other's tags, and entries of any lifetime stay
+covered. The worker that invalidates also drops its affected L1 entries.
+"""
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from typing import Any, Callable, Dict, Iterable, Optional
+import threading
+import time
+
+from . import metrics
+
+_MISSING = object()
+TAG_VERSION_PREFIX = 'cache_tag_version_'
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_matching(self, predicate: Callable[[Any], bool]) -> int:
+        """Delete every entry whose value satisfies ``predicate``; returns how many"""
+        with self._lock:
+            keys = [key for key, (value, _) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TaggedEntry:
+    """A cached value with the versions its tags had when it was stored"""
+    __slots__ = ('value', 'versions')
+
+    def __init__(self, value: Any, versions: Dict[str, int]):
+        self.value = value
+        self.versions = versions
+
+
+def _tag_version_key(tag: str) -> str:
+    return f"{TAG_VERSION_PREFIX}{tag}"
+
+
+class TieredCache:
+    """In-process LRU (L1) in front of a shared Django cache backend (L2)"""
+
+    def __init__(self, l1_max_entries: int, l1_timeout: float, alias: str = 'default'):
+        self.l1 = LRUCache(l1_max_entries)
+        self.l1_timeout = l1_timeout
+        self.alias = alias
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.TIERED_CACHE
+        return cls(config['L1_MAX_ENTRIES'], config['L1_TIMEOUT'], config.get('ALIAS', 'default'))
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self.l1.get(key, _MISSING)
+        if entry is not _MISSING:
+            metrics.increment('cache.l1.hits')
+            return entry.value if type(entry) is TaggedEntry else entry
+
+        entry = self.l2.get(key, _MISSING)
+        if entry is _MISSING or (type(entry) is TaggedEntry and not self._is_current(entry)):
+            metrics.increment('cache.misses')
+            return default
+
+        metrics.increment('cache.l2.hits')
+        # The L2 entry's remaining lifetime is unknown, so keep it no longer than the L1 timeout
+        self.l1.set(key, entry, self.l1_timeout)
+        return entry.value if type(entry) is TaggedEntry else entry
+
+    def set(self, key: str, value: Any, timeout: Optional[float], tags: Iterable[str] = ()) -> None:
+        """Store ``value``; ``invalidate_tags`` with any of ``tags`` makes it a miss"""
+        tags = set(tags)
+        entry = TaggedEntry(value, self._tag_versions(tags)) if tags else value
+        self.l2.set(key, entry, timeout=timeout)
+        l1_timeout = self.l1_timeout if timeout is None else min(timeout, self.l1_timeout)
+        if l1_timeout > 0:
+            self.l1.set(key, entry, l1_timeout)
+        else:
+            self.l1.delete(key)
+
+    def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        self.l2.delete(key)
+
+    def _tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        keys = {tag: _tag_version_key(tag) for tag in tags}
+        stored = self.l2.get_many(list(keys.values()))
+        versions = {}
+        for tag, version_key in keys.items():
+            version = stored.get(version_key)
+            if version is None:
+                # First use, or evicted: start at a value no earlier version can have had
+                self.l2.add(version_key, time.time_ns(), timeout=None)
+                version = self.l2.get(version_key)
+            versions[tag] = version
+        return versions
+
+    def _is_current(self, entry: TaggedEntry) -> bool:
+        stored = self.l2.get_many([_tag_version_key(tag) for tag in entry.versions])
+        return all(stored.get(_tag_version_key(tag)) == version for tag, version in entry.versions.items())
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Make every entry stored with any of ``tags`` a miss; returns how many
+        of this worker's L1 entries were dropped
+
+        Other workers may keep serving their L1 copy for up to the L1 timeout.
+        """
+        tags = set(tags)
+        if not tags:
+            return 0
+        version = time.time_ns()
+        self.l2.set_many({_tag_version_key(tag): version for tag in tags}, timeout=None)
+        return self.l1.delete_matching(
+            lambda entry: type(entry) is TaggedEntry and not tags.isdisjoint(entry.versions)
+        )
+
+    def clear(self) -> None:
+        self.l1.clear()
+        self.l2.clear()
+
+    def tier_stats(self) -> Dict[str, Any]:
+        """This worker's hits per tier and hit ratios, from ``news.metrics``"""
+        counters = metrics.snapshot()['counters']
+        l1_hits, l2_hits, misses = (
+            int(counters.get(name, 0)) for name in ('cache.l1.hits', 'cache.l2.hits', 'cache.misses')
+        )
+        lookups = l1_hits + l2_hits + misses
+        return {
+            'l1_hits': l1_hits,
+            'l2_hits': l2_hits,
+            'misses': misses,
+            'l1_hit_ratio': round(l1_hits / lookups, 4) if lookups else None,
+            'hit_ratio': round((l1_hits + l2_hits) / lookups, 4) if lookups else None,
+            'l1_entries': len(self.l1),
+            'l1_max_entries': self.l1.max_entries,
+        }
+
+
+tiered_cache = TieredCache.from_settings()
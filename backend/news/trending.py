@@ -0,0 +1,238 @@
+"""
+In-process trending-articles engine.
+
+``record_interaction`` feeds each interaction, weighted by type
+(``TRENDING['INTERACTION_WEIGHTS']``), into per-article ring buffers: 60
+one-minute slots (for the 5 minute and 1 hour windows) and 24 one-hour slots
+(for the 24 hour window). Windows slide by whole slots, so the 24 hour count
+covers the current hour and the 23 before it. An article's score is the
+weighted sum of its per-hour rates in each window (``TRENDING['WEIGHTS']``),
+so a recent burst outranks the same number of interactions spread over a day.
+
+Every ``CHECKPOINT_INTERVAL`` seconds a worker inserts the weight it recorded
+per article and minute into ``TrendingBucket`` and reloads the last 24 hours
+from there, which merges what the other workers recorded and lets a
+restarted worker recover its state with two grouped queries. Each reload
+keeps the ``MAX_ARTICLES`` most active articles of the last 24 hours.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.functions import TruncHour
+from typing import Callable, Dict, List, Optional, Tuple
+import heapq
+import logging
+import threading
+import time
+
+from .models import TrendingBucket
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {'5m': 300, '1h': 3600, '24h': 86400}
+
+
+class RingCounter:
+    """Counts in ``slots`` fixed-width time slots; a slot is reused once it falls out of range"""
+    __slots__ = ('slot_seconds', 'counts', 'epochs')
+
+    def __init__(self, slots: int, slot_seconds: int):
+        self.slot_seconds = slot_seconds
+        self.counts = [0.0] * slots
+        self.epochs = [-1] * slots
+
+    def add(self, timestamp: float, amount: float) -> None:
+        epoch = int(timestamp // self.slot_seconds)
+        i = epoch % len(self.counts)
+        if self.epochs[i] != epoch:
+            if self.epochs[i] > epoch:
+                # Older than anything the ring still holds
+                return
+            self.epochs[i] = epoch
+            self.counts[i] = 0.0
+        self.counts[i] += amount
+
+    def total(self, now: float, seconds: int) -> float:
+        """Sum of the slots within ``seconds`` of ``now``, including the current one"""
+        current = int(now // self.slot_seconds)
+        oldest = current - seconds // self.slot_seconds
+        return sum(count for count, epoch in zip(self.counts, self.epochs) if oldest < epoch <= current)
+
+
+class ArticleCounts:
+    __slots__ = ('minutes', 'hours')
+
+    def __init__(self):
+        self.minutes = RingCounter(60, 60)
+        self.hours = RingCounter(24, 3600)
+
+    def add(self, timestamp: float, amount: float) -> None:
+        self.minutes.add(timestamp, amount)
+        self.hours.add(timestamp, amount)
+
+    def window_counts(self, now: float) -> Dict[str, float]:
+        return {
+            '5m': self.minutes.total(now, WINDOWS['5m']),
+            '1h': self.minutes.total(now, WINDOWS['1h']),
+            '24h': self.hours.total(now, WINDOWS['24h']),
+        }
+
+
+class TrendingEngine:
+    def __init__(
+        self,
+        weights: Dict[str, float],
+        interaction_weights: Dict[str, float],
+        checkpoint_interval: float = 60.0,
+        max_articles: int = 10000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.weights = weights
+        self.interaction_weights = interaction_weights
+        self.checkpoint_interval = checkpoint_interval
+        self.max_articles = max_articles
+        self.clock = clock
+        self._articles: Dict[int, ArticleCounts] = {}
+        # Weight recorded here per (article id, minute epoch) and not yet checkpointed
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._loaded = False
+        self._checkpointed_at = clock()
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.TRENDING
+        return cls(
+            config['WEIGHTS'],
+            config['INTERACTION_WEIGHTS'],
+            checkpoint_interval=config['CHECKPOINT_INTERVAL'],
+            max_articles=config['MAX_ARTICLES'],
+        )
+
+    def record(self, article_id: int, interaction_type: str) -> None:
+        amount = self.interaction_weights.get(interaction_type, 1.0)
+        if amount <= 0:
+            return
+        now = self.clock()
+        with self._lock:
+            counts = self._articles.get(article_id)
+            if counts is None:
+                counts = self._articles[article_id] = ArticleCounts()
+            counts.add(now, amount)
+            self._pending[(article_id, int(now // 60))] += amount
+        self._maybe_checkpoint(now)
+
+    def score(self, counts: Dict[str, float]) -> float:
+        """Weighted sum of the per-hour interaction rates in each window"""
+        return sum(self.weights[window] * counts[window] * 3600 / WINDOWS[window] for window in WINDOWS)
+
+    def top(self, limit: int, window: Optional[str] = None) -> List[Tuple[int, Dict[str, float], float]]:
+        """
+        The ``limit`` hottest articles as (article id, window counts, score)
+
+        Ranked by score, or by the count in ``window`` when given.
+        """
+        if not self._loaded:
+            self.checkpoint()
+        now = self.clock()
+        self._maybe_checkpoint(now)
+        with self._lock:
+            rows = []
+            for article_id, article_counts in self._articles.items():
+                counts = article_counts.window_counts(now)
+                if counts['24h'] > 0:
+                    rows.append((article_id, counts, round(self.score(counts), 4)))
+        if window is None:
+            return heapq.nlargest(limit, rows, key=lambda row: (row[2], row[0]))
+        return heapq.nlargest(limit, rows, key=lambda row: (row[1][window], row[2], row[0]))
+
+    def _maybe_checkpoint(self, now: float) -> None:
+        if now - self._checkpointed_at >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Write the weight recorded since the last checkpoint and reload the merged state"""
+        if not self._checkpoint_lock.acquire(blocking=False):
+            return
+        try:
+            now = self.clock()
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+            try:
+                TrendingBucket.objects.bulk_create([
+                    TrendingBucket(
+                        article_id=article_id,
+                        minute=datetime.fromtimestamp(epoch * 60, timezone.utc),
+                        count=amount
+                    )
+                    for (article_id, epoch), amount in pending.items()
+                ])
+            except Exception as e:
+                logger.error(f"Error checkpointing trending counts: {str(e)}")
+                with self._lock:
+                    self._pending.update(pending)
+                return
+
+            try:
+                since = datetime.fromtimestamp(now, timezone.utc) - timedelta(seconds=WINDOWS['24h'])
+                TrendingBucket.objects.filter(minute__lt=since - timedelta(hours=1)).delete()
+                articles = self._load(now, since)
+            except Exception as e:
+                # Keep serving the in-memory counts, which include what was just written
+                logger.error(f"Error reloading trending counts: {str(e)}")
+                self._checkpointed_at = now
+                return
+
+            with self._lock:
+                # Interactions recorded while the checkpoint ran are not in the database yet
+                for (article_id, epoch), amount in self._pending.items():
+                    if article_id not in articles:
+                        articles[article_id] = ArticleCounts()
+                    articles[article_id].add(epoch * 60, amount)
+                self._articles = articles
+                self._loaded = True
+                self._checkpointed_at = now
+        finally:
+            self._checkpoint_lock.release()
+
+    def _load(self, now: float, since: datetime) -> Dict[int, ArticleCounts]:
+        buckets = TrendingBucket.objects.filter(minute__gte=since)
+        hourly = (
+            buckets.annotate(hour=TruncHour('minute'))
+            .values('article_id', 'hour')
+            .annotate(total=Sum('count'))
+            .order_by()
+        )
+        totals = Counter()
+        for row in hourly:
+            totals[row['article_id']] += row['total']
+        # Keep the most active articles when over the limit
+        keep = {article_id for article_id, _ in totals.most_common(self.max_articles)}
+
+        articles = {article_id: ArticleCounts() for article_id in keep}
+        for row in hourly:
+            if row['article_id'] in keep:
+                articles[row['article_id']].hours.add(row['hour'].timestamp(), row['total'])
+        recent = (
+            buckets.filter(minute__gte=datetime.fromtimestamp(now, timezone.utc) - timedelta(seconds=WINDOWS['1h']))
+            .values('article_id', 'minute')
+            .annotate(total=Sum('count'))
+            .order_by()
+        )
+        for row in recent:
+            if row['article_id'] in keep:
+                articles[row['article_id']].minutes.add(row['minute'].timestamp(), row['total'])
+        return articles
+
+    def reset(self) -> None:
+        """Forget all in-memory state (the next ``top`` reloads from the database)"""
+        with self._lock:
+            self._articles = {}
+            self._pending = Counter()
+            self._loaded = False
+            self._checkpointed_at = self.clock()
+
+
+engine = TrendingEngine.from_settings()
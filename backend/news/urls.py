@@ -1,14 +1,26 @@
 from django.urls import path
 from .views import (
     ArticlesView, UserPreferenceView, PersonalizedNewsView, 
-    UserInteractionView, BiasSourceView
+    UserInteractionView, BiasSourceView, BiasAnalyticsView, MapSummaryView,
+    TrendingView, RelatedArticlesView, HomeView, ArticleStreamView,
+    ImageProxyView, ProfileView, MetricsView
 )
 
 urlpatterns = [
     path('articles/', ArticlesView.as_view(), name='articles'),
+    path('articles/<int:article_id>/related/', RelatedArticlesView.as_view(), name='related-articles'),
     path('preferences/', UserPreferenceView.as_view(), name='preferences'),
     path('personalized/', PersonalizedNewsView.as_view(), name='personalized'),
     path('interaction/', UserInteractionView.as_view(), name='interaction'),
     path('bias-sources/', BiasSourceView.as_view(), name='bias-sources'),
     path('bias-sources/<str:source_name>/', BiasSourceView.as_view(), name='bias-source-detail'),
+    path('analytics/bias/', BiasAnalyticsView.as_view(), name='bias-analytics'),
+    path('map/summary/', MapSummaryView.as_view(), name='map-summary'),
+    path('trending/', TrendingView.as_view(), name='trending'),
+    path('home/', HomeView.as_view(), name='home'),
+    path('stream/articles/', ArticleStreamView.as_view(), name='article-stream'),
+    path('img/', ImageProxyView.as_view(), name='image-proxy'),
+    path('profiles/', ProfileView.as_view(), name='profiles'),
+    path('profiles/<str:request_id>/', ProfileView.as_view(), name='profile-detail'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
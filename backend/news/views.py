@@ -2,14 +2,41 @@ from django.shortcuts import render, get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
 from django.core.cache import cache
 from django.conf import settings
-from django.http import Http404
+from django.http import FileResponse, Http404, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from asgiref.sync import sync_to_async
+import asyncio
 import logging
-import uuid
+import os
 from .services import MediastackService, UserPreferenceService
-from .serializers import ArticleSerializer, UserPreferenceSerializer, UserInteractionSerializer, BiasSourceSerializer
-from .models import Article, UserPreference, UserInteraction, BiasSource
+from .analytics import DIMENSIONS, GRANULARITIES, query_rollups
+from .country_summary import get_summary
+from .etags import conditional_response, etag_matches
+from .home import run_sections
+from .images import FORMATS, ImageNotAllowedError, ImageProxyError, ImageURLError, get_variant
+from .identity import get_anonymous_id
+from .profiling import ProfileStore
+from . import metrics
+from .records import ArticleRecord
+from .rescoring import feed_tags
+from .response_cache import build_payload, payload_data, payload_response
+from .sources import get_resolver
+from .streaming import StreamFull, broker, event_stream
+from .tiered_cache import tiered_cache
+from . import trending
+from .serializers import (
+    ArticleSerializer, UserPreferenceSerializer, UserInteractionSerializer, BiasSourceSerializer,
+    StoredArticleSerializer
+)
+from .models import Article, UserPreference, UserInteraction, BiasSource, RelatedArticle
 from typing import Optional, List, Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -17,11 +44,19 @@ logger = logging.getLogger(__name__)
 # Helper functions
 def get_session_id(request):
     """Get or create a session ID for anonymous users"""
-    session_id = request.session.get('session_id')
-    if not session_id:
-        session_id = str(uuid.uuid4())
-        request.session['session_id'] = session_id
-    return session_id
+    return get_anonymous_id(request)
+
+def articles_cache_key(keywords, categories, countries, limit, offset):
+    """Cache key for one ArticlesView page; filter order and case don't matter"""
+    if categories:
+        categories = sorted({c.strip().lower() for c in categories})
+    if countries:
+        countries = sorted({c.strip().lower() for c in countries})
+    return f"articles_{keywords}_{categories}_{countries}_{limit}_{offset}"
+
+def personalized_cache_key(session_id, generation, limit, offset):
+    """Cache key for one PersonalizedNewsView page of a visitor's current feed generation"""
+    return f"personalized_{session_id}_{generation}_{limit}_{offset}"
 
 class ArticlesView(APIView):
     mediastack_service = None
@@ -64,53 +99,16 @@ class ArticlesView(APIView):
                 )
 
             # Generate cache key based on query parameters
-            cache_key = f"articles_{keywords}_{categories}_{countries}_{limit}_{offset}"
-            cached_response = cache.get(cache_key)
+            cache_key = articles_cache_key(keywords, categories, countries, limit, offset)
+            cached_response = tiered_cache.get(cache_key)
 
             if cached_response:
                 logger.info("Returning cached response")
-                return Response(cached_response, content_type='application/json')
+                return payload_response(request, cached_response)
 
             try:
-                # Fetch articles from Mediastack
-                logger.info("Fetching articles from Mediastack")
-                response_data = self.mediastack_service.get_articles(
-                    keywords=keywords,
-                    categories=categories,
-                    countries=countries,
-                    limit=limit,
-                    offset=offset
-                )
-                
-                # Log raw response for debugging
-                logger.info(f"Raw Mediastack response: {response_data}")
-                logger.info(f"Received {len(response_data.get('data', []))} articles from Mediastack")
-
-                # Format articles
-                articles = []
-                for article_data in response_data.get('data', []):
-                    formatted_article = self.mediastack_service.format_article_data(article_data)
-                    serializer = ArticleSerializer(data=formatted_article)
-                    if serializer.is_valid():
-                        articles.append(serializer.validated_data)
-                    else:
-                        logger.warning(f"Invalid article data: {serializer.errors}")
-                        logger.warning(f"Raw article data: {article_data}")
-
-                result = {
-                    'articles': articles,
-                    'pagination': {
-                        'offset': offset,
-                        'limit': limit,
-                        'total': response_data.get('pagination', {}).get('total', 0)
-                    }
-                }
-
-                # Cache the response for 5 minutes
-                cache.set(cache_key, result, timeout=300)
-                logger.info("Response cached successfully")
-
-                return Response(result, content_type='application/json')
+                result, payload = self.load_articles(keywords, categories, countries, limit, offset)
+                return payload_response(request, payload, data=result)
 
             except Exception as e:
                 logger.error(f"Error fetching articles from Mediastack: {str(e)}")
@@ -129,6 +127,62 @@ class ArticlesView(APIView):
             )
 
 
+    def load_articles(self, keywords, categories, countries, limit, offset):
+        """
+        Fetch and format one page of articles from Mediastack and cache the encoded response
+
+        Shared by ``get`` and the cache warmer (``news.warming``).
+
+        Returns:
+            (result dict, CachedPayload)
+        """
+        # Fetch articles from Mediastack
+        logger.info("Fetching articles from Mediastack")
+        response_data = self.mediastack_service.get_articles(
+            keywords=keywords,
+            categories=categories,
+            countries=countries,
+            limit=limit,
+            offset=offset
+        )
+        
+        # Log raw response for debugging
+        logger.info(f"Raw Mediastack response: {response_data}")
+        logger.info(f"Received {len(response_data.get('data', []))} articles from Mediastack")
+
+        # Format articles, loading their bias sources in one query
+        articles_data = response_data.get('data', [])
+        bias_lookup = self.mediastack_service.get_bias_lookup([a.get('source') for a in articles_data])
+        articles = []
+        for article_data in articles_data:
+            formatted_article = self.mediastack_service.format_article_data(article_data, bias_lookup=bias_lookup)
+            serializer = ArticleSerializer(data=formatted_article)
+            if serializer.is_valid():
+                articles.append(ArticleRecord.from_mapping(serializer.validated_data))
+            else:
+                logger.warning(f"Invalid article data: {serializer.errors}")
+                logger.warning(f"Raw article data: {article_data}")
+
+        result = {
+            'articles': articles,
+            'pagination': {
+                'offset': offset,
+                'limit': limit,
+                'total': response_data.get('pagination', {}).get('total', 0)
+            }
+        }
+
+        # Cache the encoded response for 5 minutes, tagged so bias rating changes invalidate it
+        payload = build_payload(result)
+        tiered_cache.set(
+            articles_cache_key(keywords, categories, countries, limit, offset),
+            payload,
+            timeout=300,
+            tags=feed_tags(articles)
+        )
+        logger.info("Response cached successfully")
+        return result, payload
+
 class UserPreferenceView(APIView):
     """API endpoint for managing user preferences"""
     preference_service = UserPreferenceService()
@@ -200,25 +254,18 @@ class PersonalizedNewsView(APIView):
                     content_type='application/json'
                 )
             
-            # Generate cache key based on session and parameters
-            cache_key = f"personalized_{session_id}_{limit}_{offset}"
-            cached_response = cache.get(cache_key)
+            # Generate cache key based on session and parameters. Preference updates and
+            # interactions bump the generation, so stale feeds are never served.
+            generation = self.preference_service.feed_generation(session_id=session_id)
+            cache_key = personalized_cache_key(session_id, generation, limit, offset)
+            cached_response = tiered_cache.get(cache_key)
             
             if cached_response:
                 logger.info("Returning cached personalized response")
-                return Response(cached_response, content_type='application/json')
+                return payload_response(request, cached_response, cache_control='private')
             
-            # Get personalized articles
-            result = self.preference_service.get_personalized_articles(
-                session_id=session_id,
-                limit=limit,
-                offset=offset
-            )
-            
-            # Cache the response for 5 minutes
-            cache.set(cache_key, result, timeout=300)
-            
-            return Response(result, content_type='application/json')
+            result, payload = self.load_feed(session_id, generation, limit, offset)
+            return payload_response(request, payload, data=result, cache_control='private')
         except Exception as e:
             logger.error(f"Error getting personalized news: {str(e)}")
             return Response(
@@ -227,6 +274,31 @@ class PersonalizedNewsView(APIView):
                 content_type='application/json'
             )
 
+    def load_feed(self, session_id, generation, limit, offset):
+        """
+        Build one page of a visitor's personalized feed and cache the encoded response
+
+        Shared by ``get`` and the composite home feed (``HomeView``).
+
+        Returns:
+            (result dict, CachedPayload)
+        """
+        result = self.preference_service.get_personalized_articles(
+            session_id=session_id,
+            limit=limit,
+            offset=offset
+        )
+        
+        # Cache the encoded response, tagged so bias rating changes invalidate it
+        payload = build_payload(result)
+        tiered_cache.set(
+            personalized_cache_key(session_id, generation, limit, offset),
+            payload,
+            timeout=settings.PERSONALIZED_CACHE_TIMEOUT,
+            tags=feed_tags(result['articles'])
+        )
+        return result, payload
+
 
 class UserInteractionView(APIView):
     """API endpoint for recording user interactions with articles"""
@@ -287,17 +359,19 @@ class BiasSourceView(APIView):
     
     def get(self, request, source_name=None):
         """Get bias information for news sources"""
+        # The bias catalog rarely changes, so let clients reuse it for a while
+        cache_control = f"public, max-age={settings.BIAS_SOURCES_MAX_AGE}"
         try:
             if source_name:
                 # Get bias information for a specific source
                 bias_source = get_object_or_404(BiasSource, source_name__iexact=source_name)
                 serializer = BiasSourceSerializer(bias_source)
-                return Response(serializer.data, content_type='application/json')
+                return conditional_response(request, serializer.data, cache_control=cache_control)
             else:
                 # Get all bias sources
                 bias_sources = BiasSource.objects.all()
                 serializer = BiasSourceSerializer(bias_sources, many=True)
-                return Response(serializer.data, content_type='application/json')
+                return conditional_response(request, serializer.data, cache_control=cache_control)
         except Http404:
             return Response(
                 {'error': f"Bias information for source '{source_name}' not found"},
@@ -311,3 +385,496 @@ class BiasSourceView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content_type='application/json'
             )
+
+
+def parse_range_bound(value: str) -> Optional[datetime]:
+    """Parse an ISO date or datetime query parameter; dates mean midnight UTC"""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            parsed = datetime.combine(day, time.min)
+    except ValueError:
+        # Well formatted but not a valid date, e.g. 2025-02-30
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+class BiasAnalyticsView(APIView):
+    """API endpoint for bias distribution and reliability over time, answered from the rollup tables"""
+    
+    def get(self, request):
+        """
+        Get bias counts and average reliability per time bucket
+        Query parameters:
+        - start, end: ISO dates or datetimes, end exclusive (default: the last 7 days)
+        - granularity: hour or day (default: day)
+        - group_by: Comma-separated dimensions out of category, country, source
+        - categories, countries, sources: Comma-separated filters
+        """
+        try:
+            params = request.query_params
+            end = parse_range_bound(params['end']) if params.get('end') else timezone.now()
+            if params.get('start'):
+                start = parse_range_bound(params['start'])
+            else:
+                start = end - timedelta(days=7) if end else None
+            granularity = params.get('granularity', 'day')
+            group_by = params.get('group_by', '').split(',') if params.get('group_by') else []
+
+            error = None
+            if start is None or end is None:
+                error = 'Invalid start or end parameter'
+            elif start >= end:
+                error = 'start must be before end'
+            elif end - start > timedelta(days=settings.ANALYTICS_MAX_RANGE_DAYS):
+                error = f"The range cannot exceed {settings.ANALYTICS_MAX_RANGE_DAYS} days"
+            elif granularity not in GRANULARITIES:
+                error = f"granularity must be one of {', '.join(GRANULARITIES)}"
+            elif any(dimension not in DIMENSIONS for dimension in group_by):
+                error = f"group_by dimensions must be among {', '.join(DIMENSIONS)}"
+            if error:
+                return Response(
+                    {'error': error},
+                    status=status.HTTP_400_BAD_REQUEST,
+                    content_type='application/json'
+                )
+
+            buckets = query_rollups(
+                start,
+                end,
+                granularity=granularity,
+                group_by=group_by,
+                categories=params['categories'].split(',') if params.get('categories') else None,
+                countries=params['countries'].split(',') if params.get('countries') else None,
+                sources=params['sources'].split(',') if params.get('sources') else None
+            )
+            data = {
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'granularity': granularity,
+                'group_by': group_by,
+                'buckets': buckets,
+            }
+            return conditional_response(request, data)
+        except Exception as e:
+            logger.error(f"Error getting bias analytics: {str(e)}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content_type='application/json'
+            )
+
+
+class MapSummaryView(APIView):
+    """API endpoint for the news map: every country's article count, average bias and top headlines"""
+    
+    def get(self, request):
+        """
+        Get the precomputed per-country summary
+        Query parameters:
+        - window: Hours, one of MAP_SUMMARY['WINDOWS'] (default: the first)
+        """
+        windows = settings.MAP_SUMMARY['WINDOWS']
+        try:
+            try:
+                window_hours = int(request.query_params.get('window', windows[0]))
+            except ValueError:
+                window_hours = None
+            if window_hours not in windows:
+                return Response(
+                    {'error': f"window must be one of {', '.join(str(window) for window in windows)}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                    content_type='application/json'
+                )
+
+            cache_control = f"public, max-age={settings.MAP_SUMMARY['MAX_AGE']}"
+            return conditional_response(request, get_summary(window_hours), cache_control=cache_control)
+        except Exception as e:
+            logger.error(f"Error getting map summary: {str(e)}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content_type='application/json'
+            )
+
+
+class TrendingView(APIView):
+    """API endpoint for the articles getting the most interactions right now"""
+    
+    def get(self, request):
+        """
+        Get trending articles
+        Query parameters:
+        - window: Rank by the interaction count in 5m, 1h or 24h instead of the combined score
+        - limit: Number of results (default: 10, at most 50)
+        """
+        try:
+            window = request.query_params.get('window')
+            try:
+                limit = int(request.query_params.get('limit', 10))
+            except ValueError:
+                limit = None
+            if limit is None or not 1 <= limit <= 50:
+                error = 'limit must be between 1 and 50'
+            elif window is not None and window not in trending.WINDOWS:
+                error = f"window must be one of {', '.join(trending.WINDOWS)}"
+            else:
+                error = None
+            if error:
+                return Response(
+                    {'error': error},
+                    status=status.HTTP_400_BAD_REQUEST,
+                    content_type='application/json'
+                )
+
+            top = trending.engine.top(limit, window=window)
+            articles = Article.objects.in_bulk([article_id for article_id, _, _ in top])
+            results = []
+            for article_id, counts, score in top:
+                article = articles.get(article_id)
+                if article is None:
+                    continue
+                data = StoredArticleSerializer(article).data
+                data['trending'] = {'score': score, 'counts': counts}
+                results.append(data)
+            return Response({'articles': results}, content_type='application/json')
+        except Exception as e:
+            logger.error(f"Error getting trending articles: {str(e)}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content_type='application/json'
+            )
+
+
+class RelatedArticlesView(APIView):
+    """API endpoint for "readers also viewed" recommendations of a stored article"""
+    
+    def get(self, request, article_id):
+        """
+        Get the articles most often viewed by the readers of this one
+        Query parameters:
+        - limit: Number of results (default and maximum: RELATED_ARTICLES['TOP_K'])
+        """
+        top_k = settings.RELATED_ARTICLES['TOP_K']
+        try:
+            try:
+                limit = int(request.query_params.get('limit', top_k))
+            except ValueError:
+                limit = None
+            if limit is None or limit < 1:
+                return Response(
+                    {'error': 'limit must be a positive integer'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                    content_type='application/json'
+                )
+            limit = min(limit, top_k)
+
+            neighbors = list(
+                RelatedArticle.objects.filter(article_id=article_id).select_related('related').order_by('rank')[:limit]
+            )
+            if not neighbors and not Article.objects.filter(id=article_id).exists():
+                return Response(
+                    {'error': f"Article {article_id} not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                    content_type='application/json'
+                )
+
+            related = []
+            for neighbor in neighbors:
+                data = StoredArticleSerializer(neighbor.related).data
+                data['score'] = neighbor.score
+                related.append(data)
+            cache_control = f"public, max-age={settings.RELATED_ARTICLES['MAX_AGE']}"
+            return conditional_response(
+                request, {'article_id': article_id, 'related': related}, cache_control=cache_control
+            )
+        except Exception as e:
+            logger.error(f"Error getting related articles: {str(e)}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content_type='application/json'
+            )
+
+
+class HomeView(APIView):
+    """API endpoint for everything the home page needs in one response"""
+    preference_service = UserPreferenceService()
+    
+    def get(self, request):
+        """
+        Get the visitor's preferences, personalized feed, category rails and
+        the bias entries of every source in them
+
+        The feed and the rails are fetched concurrently (``news.home``). A
+        section that fails or misses its ``HOME['TIMEOUTS']`` deadline is null
+        and listed in ``errors``; a missing feed is replaced by the cached
+        unfiltered articles page when there is one.
+
+        Query parameters:
+        - limit: Number of personalized articles (default: 25)
+        - rail_limit: Number of articles per rail (default: HOME['RAIL_LIMIT'])
+        """
+        config = settings.HOME
+        try:
+            session_id = get_session_id(request)
+            
+            try:
+                limit = int(request.query_params.get('limit', 25))
+                rail_limit = int(request.query_params.get('rail_limit', config['RAIL_LIMIT']))
+            except ValueError:
+                logger.error("Invalid limit or rail_limit parameter")
+                return Response(
+                    {'error': 'Invalid limit or rail_limit parameter'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                    content_type='application/json'
+                )
+            
+            preference = self.preference_service.get_or_create_preference(session_id=session_id)
+            generation = self.preference_service.feed_generation(session_id=session_id)
+            categories = (preference.preferred_categories or config['RAIL_CATEGORIES'])[:config['MAX_RAILS']]
+            articles_view = ArticlesView()
+            
+            def load_personalized():
+                cached = tiered_cache.get(personalized_cache_key(session_id, generation, limit, 0))
+                if cached is not None:
+                    return payload_data(cached)
+                result, _ = PersonalizedNewsView().load_feed(session_id, generation, limit, 0)
+                return result
+            
+            def rail_loader(category):
+                def load_rail():
+                    cached = tiered_cache.get(articles_cache_key(None, [category], None, rail_limit, 0))
+                    if cached is not None:
+                        return payload_data(cached)['articles']
+                    result, _ = articles_view.load_articles(None, [category], None, rail_limit, 0)
+                    return result['articles']
+                return load_rail
+            
+            timeouts = config['TIMEOUTS']
+            sections = {'personalized': (load_personalized, timeouts['personalized'])}
+            for category in categories:
+                sections[f'rail:{category}'] = (rail_loader(category), timeouts['rail'])
+            results, errors = run_sections(sections)
+            
+            # Stands in for the client's retry against /api/articles/, without another upstream call
+            personalized = results['personalized']
+            personalized_fallback = False
+            if personalized is None:
+                cached = tiered_cache.get(articles_cache_key(None, None, None, limit, 0))
+                if cached is not None:
+                    personalized = payload_data(cached)
+                    personalized_fallback = True
+            
+            rails = [
+                {'category': category, 'articles': results[f'rail:{category}']}
+                for category in categories
+            ]
+            
+            # Bias entries keyed by the source names the articles carry
+            resolver = get_resolver()
+            bias_sources = {}
+            for articles in [personalized['articles'] if personalized else None] + [rail['articles'] for rail in rails]:
+                for article in articles or ():
+                    name = article.get('source')
+                    if name and name not in bias_sources:
+                        bias_source = resolver.resolve(name)
+                        if bias_source is not None:
+                            bias_sources[name] = BiasSourceSerializer(bias_source).data
+            
+            data = {
+                'preferences': UserPreferenceSerializer(preference).data,
+                'personalized': personalized,
+                'personalized_fallback': personalized_fallback,
+                'rails': rails,
+                'bias_sources': bias_sources,
+                'partial': bool(errors),
+                'errors': errors,
+            }
+            return conditional_response(request, data, cache_control='private')
+        except Exception as e:
+            logger.error(f"Error building home feed: {str(e)}")
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content_type='application/json'
+            )
+
+
+class ArticleStreamView(View):
+    """Server-Sent Events stream of newly ingested articles (served by an ASGI server)"""
+    
+    async def get(self, request):
+        """
+        Subscribe to new articles
+        Query parameters:
+        - categories: Comma-separated list of categories
+        - countries: Comma-separated list of country codes
+        - keywords: Words or phrases (comma-separated) one of which must be in the title or description
+        - last_event_id: Resume after this article id (browsers send Last-Event-ID when reconnecting)
+        """
+        try:
+            categories = request.GET.get('categories', '').split(',')
+            countries = request.GET.get('countries', '').split(',')
+            keywords = request.GET.get('keywords', '').split(',')
+            last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+            if last_event_id is not None:
+                try:
+                    last_event_id = int(last_event_id)
+                except ValueError:
+                    last_event_id = -1
+                if last_event_id < 0:
+                    return JsonResponse({'error': 'Invalid Last-Event-ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                subscription = await sync_to_async(broker.subscribe)(
+                    categories, countries, keywords, loop=asyncio.get_running_loop()
+                )
+            except StreamFull as e:
+                logger.warning(f"Refusing article stream subscriber: {str(e)}")
+                return JsonResponse(
+                    {'error': 'Too many stream subscribers, retry later'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={'Retry-After': str(settings.STREAM['RETRY_MS'] // 1000)}
+                )
+
+            response = StreamingHttpResponse(
+                event_stream(subscription, last_event_id), content_type='text/event-stream'
+            )
+            response['Cache-Control'] = 'no-cache'
+            # Stop nginx from buffering the stream
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        except Exception as e:
+            logger.error(f"Error opening article stream: {str(e)}")
+            return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ImageProxyView(View):
+    """Resized copies of article images, cached on disk"""
+    
+    def get(self, request):
+        """
+        Get an image resized to one of the configured sizes
+        Query parameters:
+        - url: The original image URL
+        - sig: sign_url(url), required unless url is an article's image
+        - size: One of IMAGE_PROXY['SIZES'] (default: card)
+        - format: webp or jpeg (default: webp when the Accept header allows it)
+        """
+        config = settings.IMAGE_PROXY
+        url = request.GET.get('url')
+        signature = request.GET.get('sig')
+        size = request.GET.get('size', 'card')
+        fmt = request.GET.get('format')
+        if not url:
+            error = 'url is required'
+        elif size not in config['SIZES']:
+            error = f"size must be one of {', '.join(config['SIZES'])}"
+        elif fmt is not None and fmt not in FORMATS:
+            error = f"format must be one of {', '.join(FORMATS)}"
+        else:
+            error = None
+        if error:
+            return JsonResponse({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        negotiated = fmt is None
+        if negotiated:
+            fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+
+        try:
+            digest, path = get_variant(url, size, fmt, signature=signature)
+            etag = f'"{digest}"'
+            if etag_matches(request, etag):
+                response = HttpResponseNotModified()
+            else:
+                try:
+                    image = open(path, 'rb')
+                except FileNotFoundError:
+                    # Evicted since the lookup
+                    digest, path = get_variant(url, size, fmt, signature=signature)
+                    etag = f'"{digest}"'
+                    image = open(path, 'rb')
+                response = FileResponse(image, content_type=FORMATS[fmt][1])
+        except ImageNotAllowedError as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ImageURLError as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ImageProxyError as e:
+            logger.warning(f"Error proxying image {url}: {str(e)}")
+            return JsonResponse({'error': str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+        except Exception as e:
+            logger.error(f"Unexpected error in ImageProxyView: {str(e)}")
+            return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        response['ETag'] = etag
+        # A URL's variants never change, so clients and CDNs can keep them for good
+        response['Cache-Control'] = f"public, max-age={config['MAX_AGE']}, immutable"
+        if negotiated:
+            patch_vary_headers(response, ('Accept',))
+        return response
+
+
+class ProfileView(APIView):
+    """Admin-only access to request profiles captured by SamplingProfilerMiddleware"""
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, request_id=None):
+        """List stored profiles, or download one in collapsed-stack format"""
+        store = ProfileStore()
+        if request_id is None:
+            return Response(store.list(), content_type='application/json')
+
+        try:
+            path = store.folded_path(request_id)
+        except ValueError:
+            path = None
+        if path is None:
+            return Response(
+                {'error': f"Profile '{request_id}' not found"},
+                status=status.HTTP_404_NOT_FOUND,
+                content_type='application/json'
+            )
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=f"{request_id}.folded",
+            content_type='text/plain; charset=utf-8'
+        )
+
+
+class MetricsView(APIView):
+    """Admin-only view of this worker's in-process metrics (``news.metrics``)"""
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """
+        Counters and summaries recorded since this worker started
+
+        Each worker process keeps its own metrics, so ``pid`` says which one
+        answered. Summaries (e.g. ``db.queries.<url name>`` from
+        QueryCountMiddleware) include their mean, and ``cache`` breaks down
+        the tiered cache's lookups per tier.
+        """
+        snapshot = metrics.snapshot()
+        summaries = {
+            name: {**summary, 'mean': summary['sum'] / summary['count']}
+            for name, summary in sorted(snapshot['summaries'].items())
+        }
+        return Response(
+            {
+                'pid': os.getpid(),
+                'counters': dict(sorted(snapshot['counters'].items())),
+                'summaries': summaries,
+                'cache': tiered_cache.tier_stats(),
+            },
+            content_type='application/json'
+        )
@@ -0,0 +1,97 @@
+"""
+Article cache warming.
+
+After each ingest cycle (and on demand through ``warm_article_cache``) the
+first page of the most popular category/country combinations is fetched
+through ``ArticlesView.load_articles`` and cached, so the first visitors after
+a deploy or cache flush don't pay the upstream latency. Popularity comes from
+recent ``UserInteraction`` rows. The unfiltered feed is always warmed first.
+
+Upstream calls are paced to ``CACHE_WARMING['MAX_REQUESTS_PER_MINUTE']``,
+combinations that are already cached are skipped, and warming stops at the
+first upstream error so a failing or exhausted quota is not hammered.
+"""
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.utils import timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import time
+
+from .models import UserInteraction
+from .tiered_cache import tiered_cache
+from .views import ArticlesView, articles_cache_key
+
+logger = logging.getLogger(__name__)
+
+Combination = Tuple[Optional[str], Optional[str]]
+
+
+def hot_combinations(top_n: int, window_hours: int) -> List[Combination]:
+    """
+    Most interacted-with (category, country) combinations, including
+    category-only ones (country None), starting with the unfiltered feed
+    """
+    since = timezone.now() - timedelta(hours=window_hours)
+    rows = (
+        UserInteraction.objects
+        .filter(timestamp__gte=since, article__category__isnull=False)
+        .values(category=Lower('article__category'), country=Lower('article__country'))
+        .annotate(count=Count('id'))
+    )
+
+    counts = Counter()
+    for row in rows:
+        counts[(row['category'], None)] += row['count']
+        if row['country']:
+            counts[(row['category'], row['country'])] += row['count']
+
+    ranked = sorted(counts, key=lambda combination: (-counts[combination], combination[0], combination[1] or ''))
+    return [(None, None)] + ranked[:max(top_n - 1, 0)]
+
+
+def warm_cache(
+    combinations: Optional[List[Combination]] = None,
+    sleep: Callable[[float], None] = time.sleep
+) -> Dict[str, int]:
+    """
+    Fetch and cache the first page of each combination that isn't cached yet
+
+    Returns:
+        Counts of 'warmed', 'skipped' (already cached) and 'failed' combinations
+    """
+    config = settings.CACHE_WARMING
+    if combinations is None:
+        combinations = hot_combinations(config['TOP_N'], config['WINDOW_HOURS'])
+    limit = config['LIMIT']
+    min_interval = 60.0 / config['MAX_REQUESTS_PER_MINUTE']
+
+    stats = {'warmed': 0, 'skipped': 0, 'failed': 0}
+    view = ArticlesView()
+    last_request = None
+    for category, country in combinations:
+        categories = [category] if category else None
+        countries = [country] if country else None
+        if tiered_cache.get(articles_cache_key(None, categories, countries, limit, 0)) is not None:
+            stats['skipped'] += 1
+            continue
+
+        if last_request is not None:
+            wait = min_interval - (time.monotonic() - last_request)
+            if wait > 0:
+                sleep(wait)
+        last_request = time.monotonic()
+
+        try:
+            view.load_articles(None, categories, countries, limit, 0)
+            stats['warmed'] += 1
+        except Exception as e:
+            logger.error(f"Error warming articles for category={category} country={country}: {str(e)}")
+            stats['failed'] += 1
+            break
+
+    logger.info(f"Cache warming finished: {stats}")
+    return stats